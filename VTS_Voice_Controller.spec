@@ -1,5 +1,10 @@
 # -*- mode: python ; coding: utf-8 -*-
 
+# One-folder build: a one-file EXE unpacks every DLL (Qt, ONNX Runtime, NumPy)
+# to a temp dir on each launch, which dominates time-to-window. Target for this
+# build is a window within 1.5 s of launch; measure it with
+#   python -m tests.benchmarks.bench_startup --exe dist/VTS_Voice_Controller/VTS_Voice_Controller.exe
+
 
 a = Analysis(
     ['vts_main.py'],
@@ -10,7 +15,7 @@ a = Analysis(
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    excludes=['tkinter', 'matplotlib', 'IPython', 'pytest'],
     noarchive=False,
     optimize=0,
 )
@@ -19,16 +24,13 @@ pyz = PYZ(a.pure)
 exe = EXE(
     pyz,
     a.scripts,
-    a.binaries,
-    a.datas,
     [],
+    exclude_binaries=True,
     name='VTS_Voice_Controller',
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
-    upx_exclude=[],
-    runtime_tmpdir=None,
+    upx=False,
     console=False,
     disable_windowed_traceback=False,
     argv_emulation=False,
@@ -36,3 +38,13 @@ exe = EXE(
     codesign_identity=None,
     entitlements_file=None,
 )
+
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    strip=False,
+    upx=False,
+    upx_exclude=[],
+    name='VTS_Voice_Controller',
+)
@@ -0,0 +1,169 @@
+import asyncio
+import threading
+import time
+import numpy as np
+from loguru import logger
+
+DEFAULT_RATE_HZ = 30
+MAX_RATE_HZ = 60
+# VTS hands an injected parameter back to face tracking after about a second
+# without values, so unchanged frames are still re-sent this often.
+KEEPALIVE_S = 0.5
+FEATURE_WINDOW_S = 0.064
+# Loudness is mapped linearly between these levels (dBFS).
+SILENCE_DB = -50.0
+LOUD_DB = -10.0
+PITCH_MIN_HZ = 80.0
+PITCH_MAX_HZ = 400.0
+# Normalized autocorrelation peak above which a window counts as voiced.
+VOICING_THRESHOLD = 0.4
+
+def loudness(window: np.ndarray) -> float:
+    """RMS level of `window`, mapped from SILENCE_DB..LOUD_DB to 0..1."""
+    rms = float(np.sqrt(np.mean(np.square(window)))) if window.size else 0.0
+    level_db = 20 * np.log10(max(rms, 1e-10))
+    return float(np.clip((level_db - SILENCE_DB) / (LOUD_DB - SILENCE_DB), 0.0, 1.0))
+
+def pitch_hz(window: np.ndarray, sample_rate: int) -> float:
+    """Fundamental frequency of `window` by FFT autocorrelation, or None when it is unvoiced."""
+    n = window.size
+    min_lag = int(sample_rate / PITCH_MAX_HZ)
+    max_lag = min(int(sample_rate / PITCH_MIN_HZ), n - 1)
+    if max_lag <= min_lag:
+        return None
+    spectrum = np.fft.rfft((window - window.mean()) * np.hanning(n), n=2 * n)
+    acf = np.fft.irfft(spectrum.real ** 2 + spectrum.imag ** 2)[:max_lag + 1]
+    if acf[0] <= 0:
+        return None
+    lags = acf[min_lag:max_lag + 1] / acf[0]
+    peak = int(np.argmax(lags))
+    if lags[peak] < VOICING_THRESHOLD:
+        return None
+    return sample_rate / (min_lag + peak)
+
+def pitch(window: np.ndarray, sample_rate: int):
+    """Pitch mapped logarithmically from PITCH_MIN_HZ..PITCH_MAX_HZ to 0..1, or None when unvoiced."""
+    frequency = pitch_hz(window, sample_rate)
+    if frequency is None:
+        return None
+    return float(np.clip(np.log2(frequency / PITCH_MIN_HZ) / np.log2(PITCH_MAX_HZ / PITCH_MIN_HZ), 0.0, 1.0))
+
+class ParameterStream:
+    """
+    Drives VTS model parameters from the voice. The audio thread pushes
+    captured samples into a small ring; at `rate_hz` the newest window is
+    reduced to features (loudness, pitch), smoothed, mapped onto the configured
+    parameters and sent as one InjectParameterDataRequest. Frames are
+    coalesced rather than queued: a frame that can't go out because a hotkey
+    trigger is waiting or in flight is dropped, and unchanged frames are only
+    re-sent as keepalives.
+
+    `parameters` maps a VTS parameter ID to {"feature": "loudness" | "pitch",
+    "min": value at feature 0, "max": value at feature 1}.
+    """
+
+    FEATURES = ("loudness", "pitch")
+
+    def __init__(
+        self,
+        vts_agent,
+        parameters: dict,
+        rate_hz: float = DEFAULT_RATE_HZ,
+        smoothing: float = 0.5,
+        min_change: float = 0.01,
+        sample_rate: int = 16000,
+    ) -> None:
+        self.vts_agent = vts_agent
+        self.parameters = {}
+        for parameter_id, mapping in parameters.items():
+            feature = mapping.get("feature", "loudness")
+            if feature not in self.FEATURES:
+                logger.warning(f"Parameter {parameter_id}: unknown feature '{feature}', skipping it.")
+                continue
+            self.parameters[parameter_id] = (feature, float(mapping.get("min", 0.0)), float(mapping.get("max", 1.0)))
+        self.rate_hz = min(max(float(rate_hz), 1.0), MAX_RATE_HZ)
+        self.smoothing = smoothing
+        self.min_change = min_change
+        self.SAMPLE_RATE = sample_rate
+
+        self.window_size = int(FEATURE_WINDOW_S * sample_rate)
+        self._ring = np.zeros(self.window_size, dtype=np.float32)
+        self._ring_pos = 0
+        self._ring_lock = threading.Lock()
+        self.features = {feature: 0.0 for feature in self.FEATURES}
+        self.last_sent = None
+        self.last_sent_at = 0.0
+        self.frames_sent = 0
+        self.frames_unchanged = 0
+        self.frames_yielded = 0
+
+    def push(self, samples: np.ndarray):
+        """Appends captured 16 kHz mono samples. Called from the audio thread."""
+        samples = samples[-self.window_size:]
+        with self._ring_lock:
+            end = self._ring_pos + samples.size
+            if end <= self.window_size:
+                self._ring[self._ring_pos:end] = samples
+            else:
+                split = self.window_size - self._ring_pos
+                self._ring[self._ring_pos:] = samples[:split]
+                self._ring[:end - self.window_size] = samples[split:]
+            self._ring_pos = end % self.window_size
+
+    def _window(self) -> np.ndarray:
+        with self._ring_lock:
+            return np.roll(self._ring, -self._ring_pos)
+
+    def compute_frame(self) -> dict:
+        """Updates the smoothed features from the newest audio and returns the parameter values."""
+        window = self._window()
+        current = {"loudness": loudness(window), "pitch": pitch(window, self.SAMPLE_RATE)}
+        for feature, value in current.items():
+            if value is not None:  # Unvoiced audio keeps the last pitch.
+                self.features[feature] += (1 - self.smoothing) * (value - self.features[feature])
+        return {parameter_id: low + (high - low) * self.features[feature]
+                for parameter_id, (feature, low, high) in self.parameters.items()}
+
+    def _changed(self, frame: dict) -> bool:
+        if self.last_sent is None:
+            return True
+        return any(abs(value - self.last_sent[parameter_id]) >= self.min_change for parameter_id, value in frame.items())
+
+    async def send_frame(self) -> bool:
+        """Computes and, if it's worth sending, injects one frame. Returns whether it was sent."""
+        frame = self.compute_frame()
+        now = time.monotonic()
+        if not self._changed(frame) and now - self.last_sent_at < KEEPALIVE_S:
+            self.frames_unchanged += 1
+            return False
+        if not await self.vts_agent.inject_parameters(frame):
+            self.frames_yielded += 1
+            return False
+        self.last_sent, self.last_sent_at = frame, now
+        self.frames_sent += 1
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "rate_hz": self.rate_hz,
+            "frames_sent": self.frames_sent,
+            "frames_unchanged": self.frames_unchanged,
+            "frames_yielded": self.frames_yielded,
+        }
+
+    async def run(self):
+        if not self.parameters:
+            logger.warning("Parameter stream has no parameters to drive.")
+            return
+        logger.info(f"Streaming {', '.join(self.parameters)} at up to {self.rate_hz:g} Hz.")
+        interval = 1.0 / self.rate_hz
+        next_tick = time.monotonic()
+        while True:
+            next_tick += interval
+            await self.send_frame()
+            delay = next_tick - time.monotonic()
+            if delay < 0:
+                # Behind schedule (slow VTS, busy loop): skip the missed ticks instead of bursting.
+                next_tick = time.monotonic()
+                delay = 0
+            await asyncio.sleep(delay)
@@ -0,0 +1,229 @@
+import asyncio
+import itertools
+import json
+import os
+import time
+from loguru import logger
+
+from core.latency import FAST_BUCKETS_MS, LatencyHistogram
+
+try:
+    import orjson
+except ImportError:  # Optional: the standard library codec does the same, a little slower.
+    orjson = None
+
+API_NAME = "VTubeStudioPublicAPI"
+API_VERSION = "1.0"
+PLUGIN_NAME = "VTS Voice Controller"
+PLUGIN_DEVELOPER = "Gemini"
+DEFAULT_REQUEST_TIMEOUT_S = 5.0
+DEFAULT_PING_INTERVAL_S = 10.0
+# The token request waits for the user to allow the plugin in VTube Studio.
+TOKEN_REQUEST_TIMEOUT_S = 120.0
+_REQUEST_ID_SLOT = "__request_id__"
+
+if orjson is not None:
+    def encode(message) -> str:
+        return orjson.dumps(message).decode("utf-8")
+    decode = orjson.loads
+else:
+    def encode(message) -> str:
+        return json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+    decode = json.loads
+
+class RequestTemplate:
+    """
+    A request encoded once, up to its requestID. Sending it joins three
+    strings, so a hotkey trigger skips building and encoding a message.
+    """
+    __slots__ = ("message_type", "_head", "_tail")
+
+    def __init__(self, message_type: str, data: dict = None):
+        self.message_type = message_type
+        encoded = encode({"apiName": API_NAME, "apiVersion": API_VERSION, "requestID": _REQUEST_ID_SLOT, "messageType": message_type, "data": data})
+        self._head, self._tail = encoded.split(f'"{_REQUEST_ID_SLOT}"', 1)
+
+    def render(self, request_id: str) -> str:
+        return f'{self._head}"{request_id}"{self._tail}'
+
+class VTSClient:
+    """
+    asyncio client of the VTube Studio public API on one websocket.
+
+    Responses are matched to requests by requestID, so requests never wait
+    for each other: a hotkey trigger goes out while a parameter frame is still
+    unanswered. A reader task receives every message, resolving the request
+    it answers or handing events to `on_event`. websockets' keepalive pings
+    notice a dead connection, which fails the requests still in flight.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        token_file: str,
+        on_event=None,
+        plugin_name: str = PLUGIN_NAME,
+        plugin_developer: str = PLUGIN_DEVELOPER,
+        request_timeout_s: float = DEFAULT_REQUEST_TIMEOUT_S,
+        ping_interval_s: float = DEFAULT_PING_INTERVAL_S,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.token_file = token_file
+        self.on_event = on_event  # async callable taking the event message
+        self.plugin_name = plugin_name
+        self.plugin_developer = plugin_developer
+        self.request_timeout_s = request_timeout_s
+        self.ping_interval_s = ping_interval_s
+        self.websocket = None
+        self._reader = None
+        self._pending = {}  # requestID -> future of the response
+        self._request_ids = itertools.count(1)
+
+        self.connected_at = None
+        self.requests_sent = 0
+        self.responses = 0
+        self.events = 0
+        self.api_errors = 0
+        self.timeouts = 0
+        self.malformed = 0
+        self.max_in_flight = 0
+        self.round_trip = LatencyHistogram(buckets_ms=FAST_BUCKETS_MS)
+
+    @property
+    def connected(self) -> bool:
+        return self._reader is not None and not self._reader.done()
+
+    async def connect(self):
+        from websockets.asyncio.client import connect
+        self.websocket = await connect(
+            f"ws://{self.host}:{self.port}",
+            ping_interval=self.ping_interval_s,
+            ping_timeout=self.ping_interval_s,
+            compression=None,
+        )
+        self.connected_at = time.monotonic()
+        self._reader = asyncio.create_task(self._read_loop())
+
+    async def _read_loop(self):
+        from websockets.exceptions import ConnectionClosed
+        try:
+            async for raw in self.websocket:
+                # A malformed frame is skipped; raising here would stop every response for the session.
+                try:
+                    message = decode(raw)
+                    future = self._pending.pop(message.get("requestID"), None)
+                    is_event = future is None and message.get("messageType", "").endswith("Event")
+                except (ValueError, TypeError, AttributeError) as e:
+                    self.malformed += 1
+                    logger.warning(f"Ignoring a malformed VTS message ({e}): {str(raw)[:200]!r}")
+                    continue
+                if future is not None:
+                    self.responses += 1
+                    if not future.done():
+                        future.set_result(message)
+                elif is_event:
+                    self.events += 1
+                    if self.on_event is not None:
+                        try:
+                            await self.on_event(message)
+                        except Exception as e:
+                            logger.error(f"Handling VTS event {message.get('messageType')} failed: {e}")
+                else:
+                    logger.debug(f"Dropped a VTS response nobody waits for: {message.get('messageType')}")
+        except ConnectionClosed as e:
+            logger.warning(f"VTube Studio connection lost: {e}")
+        finally:
+            error = ConnectionError("The VTube Studio connection closed.")
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(error)
+            self._pending.clear()
+
+    async def request(self, message_type: str, data: dict = None, timeout_s: float = None) -> dict:
+        request_id = format(next(self._request_ids), "x")
+        message = encode({"apiName": API_NAME, "apiVersion": API_VERSION, "requestID": request_id, "messageType": message_type, "data": data})
+        return await self._exchange(request_id, message, timeout_s)
+
+    async def send_template(self, template: RequestTemplate) -> dict:
+        request_id = format(next(self._request_ids), "x")
+        return await self._exchange(request_id, template.render(request_id))
+
+    async def _exchange(self, request_id: str, message: str, timeout_s: float = None) -> dict:
+        if not self.connected:
+            raise ConnectionError("Not connected to VTube Studio.")
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        self.max_in_flight = max(self.max_in_flight, len(self._pending))
+        sent_at = time.monotonic()
+        try:
+            await self.websocket.send(message)
+            self.requests_sent += 1
+            response = await asyncio.wait_for(future, timeout_s or self.request_timeout_s)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise TimeoutError(f"VTube Studio did not answer request {request_id} within {timeout_s or self.request_timeout_s} s.")
+        finally:
+            self._pending.pop(request_id, None)
+        self.round_trip.record(time.monotonic() - sent_at)
+        if response.get("messageType") == "APIError":
+            self.api_errors += 1
+        return response
+
+    def _read_token(self) -> str:
+        if not os.path.exists(self.token_file):
+            return None
+        with open(self.token_file, "r", encoding="utf-8") as f:
+            return f.read().strip() or None
+
+    def _write_token(self, token: str):
+        with open(self.token_file, "w", encoding="utf-8") as f:
+            f.write(token)
+
+    async def authenticate(self) -> bool:
+        """
+        Authenticates with the token saved in `token_file`, asking VTube Studio
+        for a new one (which the user has to allow) if there is none or VTS
+        no longer accepts it.
+        """
+        plugin = {"pluginName": self.plugin_name, "pluginDeveloper": self.plugin_developer}
+        token = self._read_token()
+        for _ in range(2):
+            if token is None:
+                response = await self.request("AuthenticationTokenRequest", plugin, timeout_s=TOKEN_REQUEST_TIMEOUT_S)
+                token = (response.get("data") or {}).get("authenticationToken")
+                if not token:
+                    logger.warning(f"VTube Studio gave no authentication token: {(response.get('data') or {}).get('message')}")
+                    return False
+                self._write_token(token)
+            response = await self.request("AuthenticationRequest", {**plugin, "authenticationToken": token})
+            if (response.get("data") or {}).get("authenticated"):
+                return True
+            token = None  # Revoked or from another VTS install: ask for a new one once.
+        return False
+
+    async def close(self):
+        if self.websocket is not None:
+            await self.websocket.close()
+        if self._reader is not None:
+            await self._reader
+        self.websocket = None
+        self._reader = None
+
+    def stats(self) -> dict:
+        return {
+            "connected": self.connected,
+            "connected_s": round(time.monotonic() - self.connected_at, 1) if self.connected else 0,
+            "requests": self.requests_sent,
+            "responses": self.responses,
+            "events": self.events,
+            "api_errors": self.api_errors,
+            "timeouts": self.timeouts,
+            "malformed": self.malformed,
+            "in_flight": len(self._pending),
+            "max_in_flight": self.max_in_flight,
+            "round_trip": self.round_trip.summary(),
+            "ping_ms": round(self.websocket.latency * 1000, 2) if self.connected else None,
+            "codec": "orjson" if orjson is not None else "json",
+        }
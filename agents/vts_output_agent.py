@@ -1,9 +1,21 @@
 
 import asyncio
+import time
 from loguru import logger
-import pyvts
+from agents.vts_client import RequestTemplate, VTSClient
 from core.interfaces import VTSOutputAgent
 from core.event_bus import EventBus
+from core.latency import LatencyHistogram
+from core.logging_setup import category_logger
+
+# Events that change which hotkeys the current model has.
+MODEL_EVENTS = ("ModelLoadedEvent", "ModelConfigChangedEvent")
+# Fade used when an expression is set on or off explicitly (VTS's own default).
+EXPRESSION_FADE_S = 0.25
+
+trigger_log = category_logger("trigger")
+latency_log = category_logger("latency")
+vts_event_log = category_logger("vts_event")
 
 class VTSWebSocketAgent(VTSOutputAgent):
     """Agent to interact with the VTube Studio API via WebSocket."""
@@ -13,12 +25,23 @@ class VTSWebSocketAgent(VTSOutputAgent):
         self.port = port
         self.token_file = token_file
         self.event_bus = event_bus
-        self.vts = pyvts.vts(plugin_info={
-            "plugin_name": "VTS Voice Controller",
-            "developer": "Gemini",
-            "authentication_token_path": self.token_file,
-        })
-        self.request_lock = asyncio.Lock()  # For serializing sensitive requests
+        self.vts = VTSClient(self.host, self.port, self.token_file, on_event=self._dispatch_event)
+        # Requests sent on every trigger, encoded once: hotkey ID -> template,
+        # (expression file, active) -> template.
+        self.hotkey_requests = {}
+        self.expression_requests = {}
+        self.parameters_in_flight = False
+        self.current_model_id = None
+        self.last_request_sent_at = None
+        # Time from the end of a spoken keyword to its HotkeyTriggerRequest leaving for VTS.
+        self.trigger_latency = LatencyHistogram()
+        # Expression file -> active, as last read from VTS and updated by our own
+        # requests. Files missing here are in an unknown state.
+        self.expression_states = {}
+        self.auto_off_tasks = {}
+        self.requests_skipped = 0
+        # Subscribe right away so triggers resolved before run() starts are not dropped.
+        self.trigger_queue = event_bus.get_queue("hotkey_triggered", bounded=False)
 
     async def connect(self, max_retries=5, retry_delay=5):
         """Connect to VTube Studio with a retry mechanism."""
@@ -44,10 +67,7 @@ class VTSWebSocketAgent(VTSOutputAgent):
     async def authenticate(self):
         """Authenticate with VTube Studio."""
         try:
-            async with self.request_lock:
-                await self.vts.request_authenticate_token()
-                authenticated = await self.vts.request_authenticate()
-            if authenticated:
+            if await self.vts.authenticate():
                 logger.info("Authenticated successfully with VTube Studio.")
                 await self.event_bus.publish("vts_status_update", "Authenticated")
             else:
@@ -58,44 +78,225 @@ class VTSWebSocketAgent(VTSOutputAgent):
             await self.event_bus.publish("vts_status_update", "Authentication Error")
             raise
 
-    async def trigger_hotkey(self, hotkey_id: str):
-        """Trigger a hotkey in VTube Studio."""
-        request = self.vts.vts_request.requestTriggerHotKey(hotkey_id)
+    async def _request(self, message_type: str, data: dict = None) -> dict:
+        """Send a request and return its response. Other requests may be in flight meanwhile."""
+        self.last_request_sent_at = time.monotonic()
+        return await self.vts.request(message_type, data)
+
+    async def _send(self, template: RequestTemplate) -> dict:
+        self.last_request_sent_at = time.monotonic()
+        return await self.vts.send_template(template)
+
+    async def _dispatch_event(self, message: dict):
+        event_type = message.get("messageType")
+        vts_event_log.debug("VTS event received: {event_type}", event_type=event_type)
+        if event_type in MODEL_EVENTS:
+            await self.event_bus.publish("vts_model_changed", message.get("data", {}))
+
+    async def trigger_hotkey(self, hotkey_id: str, spoken_end: float = None):
+        """
+        Trigger a hotkey in VTube Studio. `spoken_end` is the time.monotonic() at
+        which the keyword that caused it finished in the captured audio.
+        """
+        template = self.hotkey_requests.get(hotkey_id)
+        if template is None:
+            template = self.hotkey_requests[hotkey_id] = RequestTemplate("HotkeyTriggerRequest", {"hotkeyID": hotkey_id})
         try:
-            # No lock here for expression triggers to allow concurrent requests
-            response = await self.vts.request(request)
+            sent_at = time.monotonic()
+            response = await self._send(template)
+            self._record_latency(hotkey_id, spoken_end, sent_at)
             if "hotkeyID" in response.get("data", {}):
-                logger.info(f"Triggered hotkey: {hotkey_id}")
-            else:
-                logger.warning(f"Failed to trigger hotkey {hotkey_id}. Response: {response}")
+                trigger_log.info("Triggered hotkey: {hotkey}", hotkey=hotkey_id)
+                return True
+            logger.warning(f"Failed to trigger hotkey {hotkey_id}. Response: {response}")
         except Exception as e:
             logger.error(f"Failed to trigger hotkey '{hotkey_id}': {e}")
+        return False
+
+    def _record_latency(self, what: str, spoken_end: float = None, sent_at: float = None):
+        if spoken_end is not None:
+            latency_s = sent_at - spoken_end
+            self.trigger_latency.record(latency_s)
+            latency_log.info("{what} sent {latency_ms:.0f} ms after the keyword was spoken.", what=what, latency_ms=latency_s * 1000)
+
+    async def sync_expression_states(self):
+        """Reads which expressions of the current model are active, dropping any pending auto-offs."""
+        for task in self.auto_off_tasks.values():
+            task.cancel()
+        self.auto_off_tasks = {}
+        try:
+            response = await self._request("ExpressionStateRequest", {"details": False})
+        except Exception as e:
+            logger.warning(f"Failed to read expression states: {e}")
+            self.expression_states = {}
+            return
+        expressions = response.get("data", {}).get("expressions")
+        if expressions is None:
+            logger.warning(f"VTS did not report expression states; every trigger will be sent. Response: {response}")
+            self.expression_states = {}
+            return
+        self.expression_states = {exp["file"]: bool(exp.get("active")) for exp in expressions if exp.get("file")}
+        active = [file for file, is_active in self.expression_states.items() if is_active]
+        logger.info(f"Tracking {len(self.expression_states)} expressions ({len(active)} active).")
+
+    async def set_expression(self, expression_file: str, active: bool, spoken_end: float = None) -> bool:
+        """
+        Sets an expression on or off with an ExpressionActivationRequest, unless
+        it is already known to be in that state. Returns whether a request was sent.
+        """
+        state = "on" if active else "off"
+        if self.expression_states.get(expression_file) == active:
+            self.requests_skipped += 1
+            trigger_log.info("Expression {expression} is already {state}; nothing to send.", expression=expression_file, state=state)
+            return False
+        template = self.expression_requests.get((expression_file, active))
+        if template is None:
+            template = self.expression_requests[(expression_file, active)] = RequestTemplate("ExpressionActivationRequest", {
+                "expressionFile": expression_file,
+                "fadeTime": EXPRESSION_FADE_S,
+                "active": active,
+            })
+        try:
+            sent_at = time.monotonic()
+            response = await self._send(template)
+        except Exception as e:
+            logger.error(f"Failed to set expression {expression_file} {state}: {e}")
+            return False
+        self._record_latency(f"Expression {expression_file} {state}", spoken_end, sent_at)
+        if response.get("messageType") == "APIError":
+            logger.warning(f"VTS refused to set expression {expression_file} {state}: {response.get('data', {}).get('message')}")
+            self.expression_states.pop(expression_file, None)
+            return False
+        trigger_log.info("Set expression {expression} {state}.", expression=expression_file, state=state)
+        self.expression_states[expression_file] = active
+        return True
+
+    def _schedule_auto_off(self, expression_file: str, delay_s: float):
+        """(Re)starts the timer that turns an expression off; saying the keyword again extends it."""
+        previous = self.auto_off_tasks.pop(expression_file, None)
+        if previous:
+            previous.cancel()
+
+        async def auto_off():
+            await asyncio.sleep(delay_s)
+            del self.auto_off_tasks[expression_file]
+            await self.set_expression(expression_file, False)
+
+        self.auto_off_tasks[expression_file] = asyncio.create_task(auto_off())
+
+    async def apply_trigger(self, hotkey_id: str, meta: dict = None):
+        """
+        Carries out a resolved trigger. meta["action"] is "on" or "off" for
+        expressions driven by state, or "toggle" (the default) to press the
+        hotkey as is; meta["expression"] names the expression file and
+        meta["auto_off_s"] turns an "on" back off after that many seconds.
+        """
+        meta = meta or {}
+        expression_file = meta.get("expression")
+        action = meta.get("action", "toggle")
+        spoken_end = meta.get("spoken_end")
+
+        if action == "toggle" or not expression_file:
+            if await self.trigger_hotkey(hotkey_id, spoken_end) and expression_file in self.expression_states:
+                self.expression_states[expression_file] = not self.expression_states[expression_file]
+            return
+
+        await self.set_expression(expression_file, action == "on", spoken_end)
+        if action == "on" and meta.get("auto_off_s"):
+            self._schedule_auto_off(expression_file, meta["auto_off_s"])
+        elif action == "off" and expression_file in self.auto_off_tasks:
+            self.auto_off_tasks.pop(expression_file).cancel()
+
+    async def inject_parameters(self, values: dict) -> bool:
+        """
+        Sends one InjectParameterDataRequest setting each parameter ID in
+        `values`. Parameter frames are expendable: if a hotkey trigger is queued
+        or the previous frame is still unanswered, nothing is sent and False is
+        returned, so frames never pile up on the socket ahead of a trigger.
+        """
+        if self.parameters_in_flight or not self.trigger_queue.empty():
+            return False
+        self.parameters_in_flight = True
+        try:
+            response = await self._request("InjectParameterDataRequest", {
+                "faceFound": False,
+                "mode": "set",
+                "parameterValues": [{"id": parameter_id, "weight": 1, "value": value} for parameter_id, value in values.items()],
+            })
+        except Exception as e:
+            logger.warning(f"Failed to inject parameters: {e}")
+            return False
+        finally:
+            self.parameters_in_flight = False
+        if response.get("messageType") == "APIError":
+            logger.warning(f"VTS rejected injected parameters: {response.get('data', {}).get('message')}")
+            return False
+        return True
 
     async def get_hotkey_list(self):
         """Get a list of all hotkeys for the current model."""
         logger.info("Requesting hotkey list from VTube Studio...")
-        request = self.vts.vts_request.requestHotKeyList()
         try:
-            async with self.request_lock:  # Lock for this request
-                response = await self.vts.request(request)
+            response = await self._request("HotkeysInCurrentModelRequest")
+            data = response.get("data") or {}
+            self.current_model_id = data.get("modelID", self.current_model_id)
+            # Encode the trigger of every hotkey of the model now, ahead of the first keyword.
+            self.hotkey_requests = {hotkey["hotkeyID"]: RequestTemplate("HotkeyTriggerRequest", {"hotkeyID": hotkey["hotkeyID"]})
+                                    for hotkey in data.get("availableHotkeys", []) if hotkey.get("hotkeyID")}
             return response
         except Exception as e:
             logger.error(f"Failed to get hotkey list: {e}")
             raise
 
+    async def subscribe_model_events(self):
+        """Subscribe to the VTS events that signal a change of the model's hotkeys."""
+        for event_name in MODEL_EVENTS:
+            try:
+                response = await self._request("EventSubscriptionRequest", {"eventName": event_name, "subscribe": True, "config": {}})
+                if response.get("messageType") == "APIError":
+                    logger.warning(f"VTS refused subscription to {event_name}: {response.get('data', {}).get('message')}")
+            except Exception as e:
+                logger.warning(f"Failed to subscribe to {event_name}: {e}")
+
+    async def watch_model(self, poll_interval_s: float = 2.0):
+        """
+        Notice model switches in the background. Subscribed events arrive as
+        they happen; a cheap CurrentModelRequest is also polled, whose modelID
+        catches switches on VTS versions without event support.
+        """
+        await self.subscribe_model_events()
+        while True:
+            await asyncio.sleep(poll_interval_s)
+            try:
+                data = (await self._request("CurrentModelRequest")).get("data", {})
+            except Exception as e:
+                logger.warning(f"Failed to poll current VTS model: {e}")
+                continue
+            model_id = data.get("modelID")
+            if model_id and model_id != self.current_model_id:
+                logger.info(f"VTS model changed to '{data.get('modelName')}'.")
+                self.current_model_id = model_id
+                await self.event_bus.publish("vts_model_changed", data)
+
+    def stats(self) -> dict:
+        return {**self.vts.stats(), "hotkey_templates": len(self.hotkey_requests)}
+
     async def disconnect(self):
         """Disconnect from VTube Studio."""
-        if self.vts.get_connection_status() == 1:
+        for task in self.auto_off_tasks.values():
+            task.cancel()
+        self.auto_off_tasks = {}
+        if self.vts.connected:
             await self.vts.close()
             logger.info("Disconnected from VTube Studio.")
             await self.event_bus.publish("vts_status_update", "Disconnected")
 
     async def run(self):
         """Listen for hotkey trigger events on the event bus."""
-        trigger_queue = await self.event_bus.subscribe("hotkey_triggered")
+        trigger_queue = self.trigger_queue
         logger.info("VTS agent is listening for hotkey triggers.")
         while True:
             event = await trigger_queue.get()
-            logger.debug(f"VTS agent received trigger event for hotkey: {event.payload}")
-            await self.trigger_hotkey(event.payload)
+            trigger_log.debug("VTS agent received trigger event for hotkey: {hotkey}", hotkey=event.payload)
+            await self.apply_trigger(event.payload, event.meta)
             trigger_queue.task_done()
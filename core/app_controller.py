@@ -0,0 +1,148 @@
+import asyncio
+import time
+from loguru import logger
+
+from core import diagnostics, process_stats
+from core.logging_setup import logging_stats
+from core.application_core import ApplicationCore
+from core.event_bus import put_drop_oldest
+
+# Events mirrored into the controller's status and forwarded to event stream watchers.
+STATUS_EVENTS = {
+    "vts_status_update": "vts",
+    "asr_status_update": "asr",
+    "asr_quality_tier": "asr_quality",
+}
+STREAMED_EVENTS = ("transcription_received", "hotkey_triggered", "vts_status_update", "asr_status_update", "asr_quality_tier", "asr_ready")
+
+class AppController:
+    """
+    Owns the lifecycle of ApplicationCore runs for front ends other than the Qt
+    UI, such as the headless control API.
+    """
+
+    def __init__(self, config_path: str, recognition_mode: str = "fast", language: str = "en", test_mode: bool = False):
+        self.config_path = config_path
+        self.recognition_mode = recognition_mode
+        self.language = language
+        self.test_mode = test_mode
+        self.app_core = None
+        self.app_core_task = None
+        self.started_at = None
+        self.status = {"app": "Stopped", "vts": "Disconnected", "asr": "Idle"}
+        self.watchers = set()
+        self._listener_tasks = []
+
+    @property
+    def running(self) -> bool:
+        return self.app_core_task is not None and not self.app_core_task.done()
+
+    async def start(self, recognition_mode: str = None, language: str = None) -> bool:
+        if self.running:
+            return False
+        if language and not self.supports_language(language):
+            raise ValueError(f"Language '{language}' is not supported in models.yaml.")
+        self.recognition_mode = recognition_mode or self.recognition_mode
+        self.language = language or self.language
+        self.app_core = ApplicationCore(
+            config_path=self.config_path,
+            test_mode=self.test_mode,
+            recognition_mode=self.recognition_mode,
+            language=self.language,
+        )
+        self._listener_tasks = [
+            asyncio.create_task(self._forward_events(event_type, await self.app_core.event_bus.subscribe(event_type)))
+            for event_type in STREAMED_EVENTS
+        ]
+        self.status["app"] = "Starting..."
+        self.started_at = time.monotonic()
+        self.app_core_task = asyncio.create_task(self._run_core())
+        return True
+
+    async def _run_core(self):
+        try:
+            await self.app_core.run()
+            self.status["app"] = "Stopped"
+        except asyncio.CancelledError:
+            logger.info("Application core task was cancelled by the controller.")
+            self.status["app"] = "Stopped"
+        except Exception as e:
+            logger.error(f"An error occurred in the application core: {e}")
+            self.status["app"] = f"Error: {e}"
+        finally:
+            for task in self._listener_tasks:
+                task.cancel()
+            self.status.update(vts="Disconnected", asr="Idle")
+            self.status.pop("asr_quality", None)
+
+    async def stop(self) -> bool:
+        if not self.running:
+            return False
+        self.app_core_task.cancel()
+        try:
+            await self.app_core_task
+        except asyncio.CancelledError:
+            pass
+        return True
+
+    @staticmethod
+    def supports_language(language: str) -> bool:
+        """Whether models.yaml has a model for `language`."""
+        return language.lower() in (ApplicationCore.load_models_config() or {})
+
+    async def set_language(self, language: str):
+        if not self.supports_language(language):
+            raise ValueError(f"Language '{language}' is not supported in models.yaml.")
+        self.language = language
+        if self.running:
+            await self.app_core.switch_language(language)
+
+    async def _forward_events(self, event_type: str, queue: asyncio.Queue):
+        while True:
+            event = await queue.get()
+            if event_type in STATUS_EVENTS:
+                self.status[STATUS_EVENTS[event_type]] = event.payload
+            elif event_type == "asr_ready":
+                self.status["app"] = "Running"
+            for watcher in list(self.watchers):
+                put_drop_oldest(watcher, event)
+            queue.task_done()
+
+    async def profile(self, duration_s: float = diagnostics.DEFAULT_PROFILE_S) -> dict:
+        """Samples every thread for `duration_s`, running or not, and returns where the profile was written."""
+        return await asyncio.to_thread(diagnostics.capture_profile, duration_s)
+
+    def describe(self) -> dict:
+        return {
+            "running": self.running,
+            "recognition_mode": self.recognition_mode,
+            "language": self.language,
+            "status": dict(self.status),
+        }
+
+    def metrics(self) -> dict:
+        metrics = {
+            "process": process_stats.snapshot(),
+            "uptime_s": round(time.monotonic() - self.started_at, 3) if self.running else 0,
+            "logging": logging_stats(),
+        }
+        if self.app_core:
+            metrics["event_bus"] = self.app_core.event_bus.stats()
+            if self.app_core.startup_timeline:
+                metrics["startup"] = self.app_core.startup_timeline.to_dict()
+            if self.app_core.vts_agent:
+                metrics["trigger_latency"] = self.app_core.vts_agent.trigger_latency.summary()
+                metrics["vts_connection"] = self.app_core.vts_agent.stats()
+            if self.app_core.parameter_stream:
+                metrics["parameter_stream"] = self.app_core.parameter_stream.stats()
+            if self.app_core.loop_watchdog:
+                metrics["loop_lag"] = self.app_core.loop_watchdog.stats()
+            if self.app_core.journal:
+                metrics["journal"] = self.app_core.journal.stats()
+            # Only the in-process multi-language recognizer reports its languages.
+            if hasattr(self.app_core.input_processor, "stats"):
+                metrics["asr_languages"] = self.app_core.input_processor.stats()
+            # In-process recognizers only; isolated ones report tier changes on the bus.
+            if getattr(self.app_core.input_processor, "governor", None):
+                metrics["asr_quality"] = self.app_core.input_processor.governor.stats()
+        return metrics
@@ -3,14 +3,23 @@ import asyncio
 import yaml
 from loguru import logger
 import os
-import sys
+import time
 
+from core.config_loader import ConfigLoader
+from core.config_store import ConfigStore
+from core.config_watcher import ConfigWatcher
+from core.diagnostics import LoopWatchdog
 from core.event_bus import EventBus
+from core.expression_map import ENTRIES_VERSION, ExpressionMapBuilder
+from core.hotkey_cache import HotkeyCache
+from core.journal import EXPRESSION_MAP_EVENT_TYPE, RATE_LIMITS_EVENT_TYPE, EventJournal, journal_path
+from core.startup import StartupTimeline, startup_phase
 from agents.vts_output_agent import VTSWebSocketAgent
 from core.intent_resolver import KeywordIntentResolver
 from inputs.test_input_processor import TestInputProcessor
-from inputs.asr_processor import ASRProcessor
-from inputs.utils.utils import ensure_model_downloaded_and_extracted
+
+# Keys of the asr_settings config section that are passed through to the ASR processor.
+ASR_PROCESSOR_SETTINGS = ('decode_chunk_ms', 'idle_after_s', 'input_device', 'input_channels', 'preprocess', 'quality_governor')
 
 class ApplicationCore:
     def __init__(self, config_path: str, test_mode: bool = False, recognition_mode: str = "fast", language: str = "en"):
@@ -18,20 +27,33 @@ class ApplicationCore:
         self.test_mode = test_mode
         self.recognition_mode = recognition_mode
         self.event_bus = EventBus()
+        self.config_store = ConfigStore(os.path.join(ConfigLoader.get_base_path(), self.config_path))
         self.config = self._load_config()
-        self.models_config = self._load_models_config()
+        self.models_config = self.load_models_config()
         self.vts_agent = None
         self.intent_resolver = None
         self.input_processor = None
+        self.parameter_stream = None
+        self.chat_inputs = []
+        self.loop_watchdog = None
+        self.journal = None
         self.current_language = language
+        self.expression_builder = None
+        self.hotkey_cache = HotkeyCache(os.path.join(ConfigLoader.get_base_path(), 'hotkey_cache.json'))
+        self.background_tasks = []
+        self.input_task = None
+        self.tasks = []
+        self.startup_timeline = None
+        self.session_hotkeys = None
+        self.config_watcher = ConfigWatcher(
+            self.config_store.path,
+            self._on_config_file_changed,
+        )
 
     def _load_config(self):
-        if getattr(sys, 'frozen', False):
-            base_path = os.path.dirname(sys.executable)
-        else:
-            base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        base_path = ConfigLoader.get_base_path()
 
-        config_path = os.path.join(base_path, self.config_path)
+        config_path = self.config_store.path
 
         if not os.path.exists(config_path):
             logger.warning(f"Configuration file not found at {config_path}. Creating a default one.")
@@ -50,8 +72,7 @@ class ApplicationCore:
                 }
             }
             try:
-                with open(config_path, 'w') as f:
-                    yaml.safe_dump(default_config, f, default_flow_style=False, allow_unicode=True)
+                self.config_store.save_blocking(default_config)
                 logger.info("Default configuration created.")
                 return default_config
             except Exception as e:
@@ -59,17 +80,14 @@ class ApplicationCore:
                 return None
         else:
             try:
-                with open(config_path, 'r') as f:
-                    return yaml.safe_load(f)
+                return self.config_store.load()
             except Exception as e:
                 logger.error(f"Error loading configuration from {config_path}: {e}")
                 return None
 
-    def _load_models_config(self):
-        if getattr(sys, 'frozen', False):
-            base_path = os.path.dirname(sys.executable)
-        else:
-            base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    @staticmethod
+    def load_models_config():
+        base_path = ConfigLoader.get_base_path()
         models_config_path = os.path.join(base_path, 'config', 'models.yaml')
         try:
             with open(models_config_path, 'r') as f:
@@ -78,7 +96,7 @@ class ApplicationCore:
             logger.error(f"Error loading models configuration from {models_config_path}: {e}")
             return None
 
-    async def set_language(self, language: str):
+    async def set_language(self, language: str, timeline: StartupTimeline = None):
         if not self.models_config:
             logger.error("Models configuration not loaded. Cannot switch language.")
             return
@@ -91,37 +109,113 @@ class ApplicationCore:
             logger.error(f"Language '{language}' not supported in models.yaml. Please check the config.")
             return
 
-        model_url = selected_model["url"]
-        if getattr(sys, 'frozen', False):
-            base_path = os.path.dirname(sys.executable)
-        else:
-            base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        asr_settings = self.config.get('asr_settings', {})
+        extra_languages = [extra for extra in asr_settings.get('extra_languages') or [] if extra.lower() != language.lower()]
+        inference_host = asr_settings.get('inference_host') or {}
+        if inference_host.get('enabled', False) and extra_languages:
+            logger.warning("The inference host decodes one language per controller. Ignoring extra_languages.")
+            extra_languages = []
+        base_path = ConfigLoader.get_base_path()
         model_base_dir = os.path.join(base_path, "models")
-        
-        try:
-            actual_model_dir = ensure_model_downloaded_and_extracted(model_url, model_base_dir)
-        except Exception as e:
-            logger.error(f"Failed to prepare model for language {language}: {e}")
+        model_kwargs = await self._prepare_models(language, selected_model, model_base_dir, timeline)
+        if model_kwargs is None:
             return
 
+        # Extra languages are decoded next to the primary one on the same audio.
+        extra_models = {}
+        for extra_language in extra_languages:
+            extra_model = self.models_config.get(extra_language.lower())
+            if not extra_model:
+                logger.error(f"Extra language '{extra_language}' not supported in models.yaml. Skipping it.")
+                continue
+            extra_kwargs = await self._prepare_models(extra_language, extra_model, model_base_dir, timeline)
+            if extra_kwargs is not None:
+                extra_models[extra_language.lower()] = extra_kwargs
+
+        # Imported here so test mode and the UI don't pay for the audio/ONNX stack at startup.
+        processor_kwargs = {}
+        if extra_models:
+            from inputs.multi_language_processor import DEFAULT_CPU_BUDGET, MultiLanguageASRProcessor as processor_class
+            processor_kwargs = {
+                "language": language.lower(),
+                "extra_models": extra_models,
+                "cpu_budget": asr_settings.get('cpu_budget', DEFAULT_CPU_BUDGET),
+            }
+        else:
+            from inputs.asr_processor import ASRProcessor as processor_class
+        if inference_host.get('enabled', False):
+            # Models are loaded once by vts_inference_host.py and shared with other controllers.
+            from inputs.inference_host import HostedASRProcessor as processor_class
+            processor_kwargs = {f"host_{key}": inference_host[key] for key in ("address", "authkey") if key in inference_host}
+        elif asr_settings.get('process_isolation', False):
+            processor_kwargs["processor_class"] = processor_class
+            from inputs.isolated_asr_processor import IsolatedASRProcessor as processor_class
+
+        # Loading the ONNX model blocks for a while, so keep it off the event loop.
+        # The current processor keeps listening until the new one is ready.
+        with startup_phase(timeline, "asr model load"):
+            input_processor = await asyncio.to_thread(
+                processor_class,
+                event_bus=self.event_bus,
+                provider="cpu", # Defaulting to CPU
+                recognition_mode=self.recognition_mode,
+                **{key: asr_settings[key] for key in ASR_PROCESSOR_SETTINGS if key in asr_settings},
+                **model_kwargs,
+                **processor_kwargs,
+            )
+
         # Stop existing input processor if it's running
         if self.input_processor and hasattr(self.input_processor, 'stop'):
             await self.input_processor.stop()
-
-        self.input_processor = ASRProcessor(
-            event_bus=self.event_bus,
-            model_config=selected_model,
-            model_dir=actual_model_dir,
-            provider="cpu", # Defaulting to CPU
-            recognition_mode=self.recognition_mode,
-        )
+        self.input_processor = input_processor
+        if self.parameter_stream:
+            input_processor.audio_listeners.append(self.parameter_stream.push)
+        if self.journal and self.journal.include_audio:
+            input_processor.audio_listeners.append(self.journal.write_audio)
         logger.info(f"Successfully initialized ASR for language: {language}")
 
+    async def _prepare_models(self, language: str, selected_model: dict, model_base_dir: str, timeline: StartupTimeline = None):
+        """Downloads the recognizer of `language`, and its confirmation model in hybrid mode. Returns the processor's model arguments."""
+        from inputs.utils.utils import ensure_model_downloaded_and_extracted
+        try:
+            with startup_phase(timeline, "asr model download"):
+                actual_model_dir = await asyncio.to_thread(ensure_model_downloaded_and_extracted, selected_model["url"], model_base_dir)
+        except Exception as e:
+            logger.error(f"Failed to prepare model for language {language}: {e}")
+            return None
+
+        model_kwargs = {"model_config": selected_model, "model_dir": actual_model_dir}
+        confirm_model = selected_model.get("confirm")
+        if self.recognition_mode == "hybrid" and confirm_model:
+            try:
+                with startup_phase(timeline, "confirmation model download"):
+                    confirm_model_dir = await asyncio.to_thread(ensure_model_downloaded_and_extracted, confirm_model["url"], model_base_dir)
+                model_kwargs.update(confirm_model_config=confirm_model, confirm_model_dir=confirm_model_dir)
+            except Exception as e:
+                logger.error(f"Failed to prepare the confirmation model for language {language}: {e}")
+        return model_kwargs
+
+    async def switch_language(self, language: str):
+        """Swaps the recognizer of a running session, keeping the VTS connection and resolver up."""
+        previous_processor = self.input_processor
+        await self.set_language(language)
+        if self.input_processor is previous_processor or not self.tasks:
+            return
+        self.input_task = asyncio.create_task(self.input_processor.process_input())
+        self.input_task.add_done_callback(self._log_input_failure)
+        self.tasks.append(self.input_task)
+
+    @staticmethod
+    def _log_input_failure(task: asyncio.Task):
+        if not task.cancelled() and task.exception():
+            logger.error(f"Input processor stopped with an error: {task.exception()}")
+
     async def _initialize_components(self):
         if not self.config:
             logger.error("Initialization failed: Configuration is not loaded.")
             return
 
+        self.startup_timeline = StartupTimeline()
         vts_settings = self.config['vts_settings']
         self.vts_agent = VTSWebSocketAgent(
             host=vts_settings['host'],
@@ -129,20 +223,94 @@ class ApplicationCore:
             token_file=vts_settings['token_file'],
             event_bus=self.event_bus
         )
+        stream_settings = self.config.get('parameter_stream') or {}
+        if stream_settings.get('enabled', False) and not self.test_mode:
+            from agents.parameter_stream import ParameterStream  # Pulls in NumPy, so only when enabled.
+            self.parameter_stream = ParameterStream(
+                self.vts_agent,
+                stream_settings.get('parameters') or {},
+                **{key: stream_settings[key] for key in ('rate_hz', 'smoothing', 'min_change') if key in stream_settings},
+            )
+        diagnostics_settings = self.config.get('diagnostics') or {}
+        if diagnostics_settings.get('loop_watchdog', True):
+            self.loop_watchdog = LoopWatchdog(threshold_s=diagnostics_settings.get('loop_lag_threshold_ms', 100) / 1000)
+        journal_settings = self.config.get('journal') or {}
+        if journal_settings.get('enabled', False):
+            journal_dir = os.path.join(ConfigLoader.get_base_path(), journal_settings.get('directory', os.path.join('logs', 'journal')))
+            self.journal = EventJournal(journal_path(journal_dir), include_audio=journal_settings.get('include_audio', False)).open()
+            # Subscribed before any input starts, so the journal sees the first transcription.
+            self.background_tasks.append(asyncio.create_task(self.journal.record(self.event_bus)))
+        # The resolver subscribes on creation, so speech recognized while VTS is
+        # still connecting is queued and resolved once the expression map is ready.
+        self.intent_resolver = KeywordIntentResolver(self.event_bus, {})
+
+        # VTS and the ASR model are independent, so prepare them side by side.
+        vts_task = asyncio.create_task(self._prepare_vts())
+        input_task = asyncio.create_task(self._prepare_input())
+        try:
+            await asyncio.gather(vts_task, input_task)
+        except BaseException:
+            vts_task.cancel()
+            input_task.cancel()
+            if self.input_task:
+                self.input_task.cancel()
+            raise
+
+        self.startup_timeline.finish()
+        logger.info(self.startup_timeline.summary())
+        await self.event_bus.publish("startup_timeline", self.startup_timeline.to_dict())
+
+    async def _prepare_vts(self):
+        timeline = self.startup_timeline
+        with timeline.phase("cached expressions"):
+            expression_map = await self._load_cached_expressions()
+        if expression_map is not None:
+            self._set_expression_map(expression_map)
+
+        with timeline.phase("vts connect"):
+            await self.vts_agent.connect()
+        with timeline.phase("vts authenticate"):
+            await self.vts_agent.authenticate()
+
+        if expression_map is not None:
+            self.background_tasks.append(asyncio.create_task(self._refresh_expressions()))
+        else:
+            with timeline.phase("expression sync"):
+                expression_map = await self._synchronize_expressions() or {}
+            self._set_expression_map(expression_map)
 
-        await self.vts_agent.connect()
-        await self.vts_agent.authenticate()
-
-        expression_map = await self._synchronize_expressions() or {}
-
-        self.intent_resolver = KeywordIntentResolver(self.event_bus, expression_map)
-
+    async def _prepare_input(self):
         if self.test_mode:
             logger.info("--- RUNNING IN TEST MODE ---")
             self.input_processor = TestInputProcessor(self.event_bus)
         else:
             logger.info("--- RUNNING IN NORMAL MODE (MICROPHONE INPUT) ---")
-            await self.set_language(self.current_language) # Set default language
+            await self.set_language(self.current_language, self.startup_timeline) # Set default language
+
+        # Start capturing as soon as the recognizer is ready instead of waiting for VTS.
+        if self.input_processor:
+            self.input_task = asyncio.create_task(self.input_processor.process_input())
+        self._create_chat_inputs()
+
+    def _create_chat_inputs(self):
+        """Chat inputs run next to the microphone and feed the same resolver."""
+        for settings in self.config.get('chat_inputs') or []:
+            if not settings.get('enabled', True):
+                continue
+            from inputs.chat_input_processor import ChatInputProcessor
+            source = settings.get('name', 'chat')
+            self.chat_inputs.append(ChatInputProcessor(
+                self.event_bus,
+                host=settings['host'],
+                port=settings['port'],
+                channel=settings['channel'],
+                source=source,
+                **{key: settings[key] for key in ('nick', 'password', 'command_prefix') if settings.get(key) is not None},
+            ))
+            if settings.get('max_triggers_per_s'):
+                self.intent_resolver.set_rate_limit(source, settings['max_triggers_per_s'], settings.get('burst', 1))
+        if self.journal and self.intent_resolver.rate_limits:
+            self.journal.write_event(RATE_LIMITS_EVENT_TYPE, self.intent_resolver.rate_limit_settings())
 
     async def run(self):
         await self._initialize_components()
@@ -151,7 +319,7 @@ class ApplicationCore:
             return
 
         # If no input processor is available (i.e., not in test mode and ASR is disabled), exit gracefully.
-        if not self.input_processor:
+        if not self.input_processor and not self.chat_inputs:
             logger.error("No input processor available. The application will now exit.")
             logger.error("Run with the --test flag for testing, or resolve the onnxruntime issue to enable microphone input.")
             await self.vts_agent.disconnect()
@@ -159,10 +327,19 @@ class ApplicationCore:
 
         logger.info("Starting application components...")
         
-        tasks = [
+        self.tasks = tasks = [
             asyncio.create_task(self.intent_resolver.resolve_intent()),
-            asyncio.create_task(self.input_processor.process_input()),
+            *([self.input_task] if self.input_task else []),
+            *(asyncio.create_task(chat_input.process_input()) for chat_input in self.chat_inputs),
+            asyncio.create_task(self.vts_agent.run()),
+            asyncio.create_task(self.config_watcher.watch()),
+            asyncio.create_task(self._handle_model_changes()),
+            asyncio.create_task(self.vts_agent.watch_model()),
         ]
+        if self.parameter_stream:
+            tasks.append(asyncio.create_task(self.parameter_stream.run()))
+        if self.loop_watchdog:
+            tasks.append(asyncio.create_task(self.loop_watchdog.run()))
 
         # If in test mode, we need a way to stop the application
         if self.test_mode:
@@ -180,75 +357,160 @@ class ApplicationCore:
         except KeyboardInterrupt:
             logger.info("Stopping application...")
         finally:
-            for task in asyncio.all_tasks():
-                if task is not asyncio.current_task():
-                    task.cancel()
+            for task in self.tasks + self.background_tasks:
+                task.cancel()
+            self.tasks = []
             if self.vts_agent:
                 await self.vts_agent.disconnect()
+            if self.journal:
+                await asyncio.to_thread(self.journal.close)
+
+    def _set_expression_map(self, expression_map: dict):
+        self.intent_resolver.update_expression_map(expression_map)
+        if self.journal:
+            self.journal.write_event(EXPRESSION_MAP_EVENT_TYPE, expression_map)
+
+    async def apply_expression_config(self, expressions: dict) -> bool:
+        """
+        Applies an edited `expressions` section to the running session without
+        touching the VTS connection or the audio pipeline.
+        """
+        if not self.expression_builder or not self.intent_resolver:
+            if self.config is not None:
+                self.config['expressions'] = expressions
+            return False
+
+        started = time.perf_counter()
+        diff = self.expression_builder.update(expressions)
+        if not diff:
+            return False
+
+        self.config['expressions'] = expressions
+        self._set_expression_map(self.expression_builder.build())
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        logger.info(f"Expressions reloaded ({diff}) in {elapsed_ms:.2f} ms.")
+        await self.event_bus.publish("expressions_reloaded", expressions)
+        await self._save_expression_snapshot()
+        return True
+
+    @staticmethod
+    def _snapshot_key(expressions: dict, vts_expressions: list) -> str:
+        hotkeys = [(exp.get('file'), exp.get('name'), exp.get('hotkeyID')) for exp in vts_expressions]
+        return ConfigStore.snapshot_key(ENTRIES_VERSION, expressions, hotkeys)
+
+    async def _save_expression_snapshot(self):
+        if self.expression_builder is None or self.session_hotkeys is None:
+            return
+        key = self._snapshot_key(self.expression_builder.expressions, self.session_hotkeys)
+        await self.config_store.save_snapshot(key, self.expression_builder.to_snapshot())
+
+    async def _on_config_file_changed(self, config: dict):
+        await self.apply_expression_config(config.get('expressions') or {})
+
+    async def _load_cached_expressions(self):
+        cached_expressions = self.hotkey_cache.get_last()
+        if not cached_expressions:
+            return None
+        logger.info(f"Using {len(cached_expressions)} cached expressions of the last VTS model. Refreshing from VTube Studio in the background.")
+        snapshot = self.config_store.load_snapshot(self._snapshot_key(self.config.get('expressions'), cached_expressions))
+        if snapshot:
+            try:
+                builder = ExpressionMapBuilder.from_snapshot(snapshot)
+            except (KeyError, TypeError, ValueError, AttributeError) as e:
+                logger.warning(f"Ignoring malformed expression snapshot: {e}")
+            else:
+                logger.info("Restored the expression map from its snapshot.")
+                self.expression_builder = builder
+                self.session_hotkeys = cached_expressions
+                return builder.build()
+        return await self._apply_vts_expressions(cached_expressions)
 
     async def _synchronize_expressions(self):
+        expression_map = await self._refresh_expressions()
+        if expression_map is None:
+            logger.error("Expression synchronization failed. Returning empty map.")
+            return {}
+        return expression_map
+
+    async def _refresh_expressions(self):
         logger.info("Checking for expression updates from VTube Studio...")
         try:
             hotkey_list_response = await self.vts_agent.get_hotkey_list()
-            logger.debug(f"VTS hotkey response: {hotkey_list_response}")
+            # The full response is large; only render it when DEBUG is actually enabled.
+            logger.opt(lazy=True).debug("VTS hotkey response: {}", lambda: hotkey_list_response)
 
             if hotkey_list_response and 'data' in hotkey_list_response and 'availableHotkeys' in hotkey_list_response['data']:
-                vts_expressions = [h for h in hotkey_list_response['data']['availableHotkeys'] if h.get('type') == 'ToggleExpression']
+                data = hotkey_list_response['data']
+                vts_expressions = [h for h in data['availableHotkeys'] if h.get('type') == 'ToggleExpression']
                 logger.debug(f"Found {len(vts_expressions)} ToggleExpression hotkeys in VTS.")
 
-                yaml_expressions = self.config.get('expressions', {})
-                if not yaml_expressions:
-                    logger.warning("No expressions found in vts_config.yaml")
-                
-                new_yaml_expressions = {}
-                updated = False
-
-                file_to_hotkey_id_map = {exp.get('file'): exp.get('hotkeyID') for exp in vts_expressions}
-
-                for exp in vts_expressions:
-                    exp_file = exp.get('file')
-                    exp_name = exp.get('name')
-                    if not exp_file or not exp_name:
-                        continue
-
-                    if exp_file in yaml_expressions:
-                        new_yaml_expressions[exp_file] = yaml_expressions[exp_file]
-                    else:
-                        placeholder_keyword = f"NEW_KEYWORD_{exp_name.replace(' ', '_')}"
-                        new_yaml_expressions[exp_file] = {
-                            'name': exp_name,
-                            'keywords': [placeholder_keyword],
-                            'cooldown_s': 60
-                        }
-                        updated = True
-
-                if len(new_yaml_expressions) != len(yaml_expressions):
-                    updated = True
-
-                if updated:
-                    self.config['expressions'] = new_yaml_expressions
-                    with open(self.config_path, 'w') as f:
-                        yaml.dump(self.config, f, default_flow_style=False, allow_unicode=True)
-                    logger.info(f"Successfully updated '{self.config_path}' with the latest expressions.")
-
-                logger.debug(f"Building session map from expressions: {new_yaml_expressions}")
-                session_expression_map = {}
-                for exp_file, exp_data in new_yaml_expressions.items():
-                    hotkey_id = file_to_hotkey_id_map.get(exp_file)
-                    if hotkey_id:
-                        cooldown = exp_data.get('cooldown_s', 60)
-                        trigger_data = {"hotkeyID": hotkey_id, "cooldown_s": cooldown}
-                        for keyword in exp_data.get('keywords', []):
-                            session_expression_map[keyword] = trigger_data
-                        session_expression_map[exp_data['name']] = trigger_data
-                
-                logger.info(f"Expression map created with {len(session_expression_map)} keywords. Ready to detect keywords.")
-                return session_expression_map
+                if data.get('modelID') and self.hotkey_cache.put(data['modelID'], data.get('modelName'), vts_expressions):
+                    await self.hotkey_cache.save()
+                await self.vts_agent.sync_expression_states()
+                return await self._apply_vts_expressions(vts_expressions)
             else:
                 logger.warning("Received no or malformed hotkey data from VTube Studio.")
 
         except Exception as e:
             logger.error(f"Failed to auto-update expressions: {e}")
-        
-        logger.error("Expression synchronization failed. Returning empty map.")
-        return {}
+        return None
+
+    async def _apply_vts_expressions(self, vts_expressions: list):
+        """
+        Builds the session map from the current model's expressions. Entries of
+        expression files the model doesn't have are kept in vts_config.yaml, so
+        switching models never loses another model's keywords; they just have
+        no hotkey until that model is loaded again.
+        """
+        yaml_expressions = self.config.get('expressions') or {}
+        if not yaml_expressions:
+            logger.warning("No expressions found in vts_config.yaml")
+
+        new_yaml_expressions = dict(yaml_expressions)
+        updated = False
+
+        file_to_hotkey_id_map = {exp.get('file'): exp.get('hotkeyID') for exp in vts_expressions}
+
+        for exp in vts_expressions:
+            exp_file = exp.get('file')
+            exp_name = exp.get('name')
+            if not exp_file or not exp_name or exp_file in new_yaml_expressions:
+                continue
+            placeholder_keyword = f"NEW_KEYWORD_{exp_name.replace(' ', '_')}"
+            new_yaml_expressions[exp_file] = {
+                'name': exp_name,
+                'keywords': [placeholder_keyword],
+                'cooldown_s': 60
+            }
+            updated = True
+
+        if updated:
+            self.config['expressions'] = new_yaml_expressions
+            if await self.config_store.save(self.config):
+                logger.info(f"Successfully updated '{self.config_path}' with the latest expressions.")
+
+        logger.opt(lazy=True).debug("Building session map from expressions: {}", lambda: new_yaml_expressions)
+        if self.expression_builder is None:
+            self.expression_builder = ExpressionMapBuilder(file_to_hotkey_id_map)
+            diff = self.expression_builder.update(new_yaml_expressions)
+        else:
+            diff = self.expression_builder.update(new_yaml_expressions, file_to_hotkey_id_map)
+        session_expression_map = self.expression_builder.build()
+        self.session_hotkeys = vts_expressions
+
+        if diff:
+            if self.intent_resolver:
+                self._set_expression_map(session_expression_map)
+            await self.event_bus.publish("expressions_reloaded", new_yaml_expressions)
+            await self._save_expression_snapshot()
+
+        logger.info(f"Expression map created with {len(session_expression_map)} keywords. Ready to detect keywords.")
+        return session_expression_map
+
+    async def _handle_model_changes(self):
+        model_queue = await self.event_bus.subscribe("vts_model_changed")
+        while True:
+            event = await model_queue.get()
+            if event.payload.get('modelLoaded', True):
+                await self._refresh_expressions()
+            model_queue.task_done()
@@ -1,4 +1,6 @@
 
+import os
+import sys
 import yaml
 from typing import Any, Dict
 from loguru import logger
@@ -8,6 +10,16 @@ class ConfigLoader:
     A utility class for loading configurations from YAML files.
     """
 
+    @staticmethod
+    def get_base_path() -> str:
+        """
+        Returns the directory that relative config paths are resolved against:
+        the executable's directory for frozen builds, the project root otherwise.
+        """
+        if getattr(sys, 'frozen', False):
+            return os.path.dirname(sys.executable)
+        return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
     @staticmethod
     def load_yaml(file_path: str) -> Dict[str, Any]:
         """
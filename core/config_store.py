@@ -0,0 +1,105 @@
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+from typing import Any, Optional
+import yaml
+from loguru import logger
+
+SNAPSHOT_VERSION = 3
+
+def write_atomic(path: str, data: bytes):
+    """Writes to a temporary file next to `path` and renames it over `path`."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+class ConfigStore:
+    """
+    Reads and writes vts_config.yaml.
+
+    Saves only touch the disk when the serialized content differs from what is
+    already there, go through a temporary file and an atomic rename so a crash
+    never leaves a truncated config, and run off the event loop.
+
+    Next to the config, a pickled snapshot of the compiled expression map is
+    kept, keyed by a hash of everything it was built from.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.snapshot_path = os.path.splitext(path)[0] + '.snapshot'
+        self._last_text = None
+        self._save_lock = asyncio.Lock()
+
+    @staticmethod
+    def _serialize(config: dict) -> str:
+        return yaml.safe_dump(config, default_flow_style=False, allow_unicode=True)
+
+    def load(self) -> Optional[dict]:
+        with open(self.path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        self._last_text = text
+        return yaml.safe_load(text)
+
+    def save_blocking(self, config: dict) -> bool:
+        """Writes `config` if it differs from the file on disk. Returns whether it wrote."""
+        text = self._serialize(config)
+        if text == self._last_text:
+            return False
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                if f.read() == text:
+                    self._last_text = text
+                    return False
+        except FileNotFoundError:
+            pass
+        write_atomic(self.path, text.encode('utf-8'))
+        self._last_text = text
+        return True
+
+    async def save(self, config: dict) -> bool:
+        # Serialize on the loop so later mutations of `config` can't race the writer thread.
+        config = yaml.safe_load(self._serialize(config))
+        async with self._save_lock:
+            written = await asyncio.to_thread(self.save_blocking, config)
+        if written:
+            logger.info(f"Saved configuration to '{self.path}'.")
+        return written
+
+    @staticmethod
+    def snapshot_key(*sources: Any) -> str:
+        encoded = json.dumps(sources, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(f"{SNAPSHOT_VERSION}:{encoded}".encode('utf-8')).hexdigest()
+
+    def load_snapshot(self, key: str) -> Optional[Any]:
+        """Returns the value saved under `key`, or None if the snapshot is missing, unreadable or for another key."""
+        try:
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable expression snapshot at {self.snapshot_path}: {e}")
+            return None
+        if not isinstance(snapshot, dict) or snapshot.get('key') != key:
+            return None
+        return snapshot.get('value')
+
+    async def save_snapshot(self, key: str, value: Any):
+        """Saves `value`, which must be plain JSON data rather than objects, so the file never depends on class internals."""
+        data = json.dumps({'key': key, 'value': value}, ensure_ascii=False).encode('utf-8')
+        try:
+            await asyncio.to_thread(write_atomic, self.snapshot_path, data)
+        except Exception as e:
+            logger.error(f"Failed to save expression snapshot to {self.snapshot_path}: {e}")
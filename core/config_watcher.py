@@ -0,0 +1,47 @@
+import asyncio
+import os
+from typing import Awaitable, Callable
+from loguru import logger
+
+from core.config_loader import ConfigLoader
+
+class ConfigWatcher:
+    """
+    Polls a YAML file for modifications and hands the parsed content to a callback.
+
+    Polling the file's mtime and size is cheap enough to do every second and
+    avoids a platform-specific file notification dependency.
+    """
+
+    def __init__(self, path: str, on_change: Callable[[dict], Awaitable[None]], interval_s: float = 1.0):
+        self.path = path
+        self.on_change = on_change
+        self.interval_s = interval_s
+
+    def _signature(self):
+        try:
+            stat = os.stat(self.path)
+            return stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return None
+
+    async def watch(self):
+        last_signature = self._signature()
+        logger.info(f"Watching '{self.path}' for changes.")
+        while True:
+            await asyncio.sleep(self.interval_s)
+            signature = self._signature()
+            if signature is None or signature == last_signature:
+                continue
+            last_signature = signature
+
+            config = await asyncio.to_thread(ConfigLoader.load_yaml, self.path)
+            if not config:
+                # Most likely caught mid-write; the next write changes the signature again.
+                logger.warning(f"Ignoring unreadable update of '{self.path}'.")
+                continue
+
+            try:
+                await self.on_change(config)
+            except Exception as e:
+                logger.error(f"Failed to apply changes from '{self.path}': {e}")
@@ -0,0 +1,170 @@
+import asyncio
+import json
+from http import HTTPStatus
+from urllib.parse import urlsplit
+from loguru import logger
+
+from core import diagnostics
+from core.app_controller import AppController
+
+# Events an event stream client may fall behind by before it loses the oldest.
+WATCHER_QUEUE_SIZE = 256
+# Request bodies are small JSON objects.
+MAX_BODY_BYTES = 64 * 1024
+
+class ControlAPI:
+    """
+    Minimal HTTP/1.1 control API for headless mode, built on asyncio streams.
+    It has no authentication, so it binds to localhost by default.
+
+        GET  /status    running state, mode, language and component status
+        GET  /metrics   process, event bus and startup metrics
+        GET  /events    server-sent event stream of transcriptions, triggers and status changes
+        POST /start     optional JSON body {"recognition_mode": "fast", "language": "en"}
+        POST /stop
+        POST /language  JSON body {"language": "ja"}
+        POST /profile   optional JSON body {"duration_s": 10}; samples all threads and
+                        writes a flamegraph-compatible folded profile
+    """
+
+    def __init__(self, controller: AppController, host: str = "127.0.0.1", port: int = 8765):
+        self.controller = controller
+        self.host = host
+        self.port = port
+        self.server = None
+        self._streams = set()
+        self.routes = {
+            ("GET", "/status"): self._status,
+            ("GET", "/metrics"): self._metrics,
+            ("POST", "/start"): self._start,
+            ("POST", "/stop"): self._stop,
+            ("POST", "/language"): self._language,
+            ("POST", "/profile"): self._profile,
+        }
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        logger.info(f"Control API listening on http://{self.host}:{self.port}")
+
+    async def close(self):
+        if self.server:
+            self.server.close()
+            # Event streams never end on their own, and wait_closed() waits for every connection.
+            for task in list(self._streams):
+                task.cancel()
+            await asyncio.gather(*self._streams, return_exceptions=True)
+            await self.server.wait_closed()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = (await reader.readline()).decode("latin-1").split()
+            if len(request_line) < 2:
+                return
+            method, path = request_line[0].upper(), urlsplit(request_line[1]).path
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode("latin-1").strip()
+                if not line:
+                    break
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+            try:
+                content_length = int(headers.get("content-length", 0) or 0)
+            except ValueError:
+                content_length = -1
+            if not 0 <= content_length <= MAX_BODY_BYTES:
+                await self._send_json(writer, HTTPStatus.BAD_REQUEST, {"error": "Invalid Content-Length."})
+                return
+            body = await reader.readexactly(content_length)
+
+            if (method, path) == ("GET", "/events"):
+                await self._stream_events(writer)
+                return
+
+            handler = self.routes.get((method, path))
+            if handler is None:
+                await self._send_json(writer, HTTPStatus.NOT_FOUND, {"error": f"No route for {method} {path}"})
+                return
+            try:
+                payload = json.loads(body) if body else {}
+            except ValueError:
+                await self._send_json(writer, HTTPStatus.BAD_REQUEST, {"error": "Body must be JSON."})
+                return
+            status, response = await handler(payload)
+            await self._send_json(writer, status, response)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except Exception as e:
+            logger.error(f"Control API request failed: {e}")
+            await self._send_json(writer, HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)})
+        finally:
+            writer.close()
+
+    async def _send_json(self, writer: asyncio.StreamWriter, status: HTTPStatus, payload: dict):
+        body = json.dumps(payload, default=str).encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: close\r\n\r\n".encode("latin-1") + body
+        )
+        await writer.drain()
+
+    async def _stream_events(self, writer: asyncio.StreamWriter):
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-cache\r\n\r\n")
+        await writer.drain()
+        queue = asyncio.Queue(maxsize=WATCHER_QUEUE_SIZE)
+        task = asyncio.current_task()
+        self._streams.add(task)
+        self.controller.watchers.add(queue)
+        try:
+            while True:
+                event = await queue.get()
+                data = json.dumps(event.payload, default=str)
+                writer.write(f"event: {event.event_type}\ndata: {data}\n\n".encode("utf-8"))
+                await writer.drain()
+        finally:
+            self.controller.watchers.discard(queue)
+            self._streams.discard(task)
+
+    async def _status(self, payload: dict):
+        return HTTPStatus.OK, self.controller.describe()
+
+    async def _metrics(self, payload: dict):
+        return HTTPStatus.OK, self.controller.metrics()
+
+    def _unsupported_language(self, language: str):
+        if language is not None and not (isinstance(language, str) and self.controller.supports_language(language)):
+            return HTTPStatus.BAD_REQUEST, {"error": f"Language '{language}' is not supported in models.yaml."}
+        return None
+
+    async def _start(self, payload: dict):
+        rejected = self._unsupported_language(payload.get("language"))
+        if rejected:
+            return rejected
+        started = await self.controller.start(payload.get("recognition_mode"), payload.get("language"))
+        if not started:
+            return HTTPStatus.CONFLICT, {"error": "Already running."}
+        return HTTPStatus.ACCEPTED, self.controller.describe()
+
+    async def _stop(self, payload: dict):
+        if not await self.controller.stop():
+            return HTTPStatus.CONFLICT, {"error": "Not running."}
+        return HTTPStatus.OK, self.controller.describe()
+
+    async def _language(self, payload: dict):
+        language = payload.get("language")
+        if not language:
+            return HTTPStatus.BAD_REQUEST, {"error": "Missing 'language'."}
+        rejected = self._unsupported_language(language)
+        if rejected:
+            return rejected
+        await self.controller.set_language(language)
+        return HTTPStatus.OK, self.controller.describe()
+
+    async def _profile(self, payload: dict):
+        duration_s = payload.get("duration_s", diagnostics.DEFAULT_PROFILE_S)
+        if not isinstance(duration_s, (int, float)) or not 0 < duration_s <= diagnostics.MAX_PROFILE_S:
+            return HTTPStatus.BAD_REQUEST, {"error": f"'duration_s' must be between 0 and {diagnostics.MAX_PROFILE_S:.0f}."}
+        return HTTPStatus.OK, await self.controller.profile(duration_s)
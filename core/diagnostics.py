@@ -0,0 +1,115 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from loguru import logger
+
+from core.config_loader import ConfigLoader
+from core.latency import FAST_BUCKETS_MS, LatencyHistogram
+
+DEFAULT_PROFILE_S = 10.0
+MAX_PROFILE_S = 120.0
+STACK_LIMIT = 25  # Innermost frames logged for a stall
+
+class LoopWatchdog:
+    """
+    Measures event loop scheduling lag: how late a sleep of `interval_s` wakes
+    up. A helper thread watches the loop's heartbeat. When the loop has not come
+    back for `threshold_s`, the thread snapshots the loop thread's stack, so the
+    warning logged once the loop recovers names what blocked it (a decode on
+    the loop, YAML I/O, a Qt repaint under qasync).
+    """
+
+    def __init__(self, threshold_s: float = 0.1, interval_s: float = 0.05):
+        self.threshold_s = threshold_s
+        self.interval_s = interval_s
+        self.lag = LatencyHistogram(buckets_ms=FAST_BUCKETS_MS)
+        self.stalls = 0
+        self._beat = 0
+        self._beat_at = time.monotonic()
+        self._stall_stack = None
+        self._stall_beat = None
+        self._stopped = threading.Event()
+
+    def _watch(self, loop_thread_id: int):
+        while not self._stopped.wait(self.threshold_s / 4):
+            beat = self._beat
+            if beat == self._stall_beat or time.monotonic() - self._beat_at < self.interval_s + self.threshold_s:
+                continue
+            frame = sys._current_frames().get(loop_thread_id)
+            if frame is not None:
+                self._stall_stack = "".join(traceback.format_stack(frame, limit=STACK_LIMIT))
+                self._stall_beat = beat
+
+    async def run(self):
+        self._stopped.clear()
+        thread = threading.Thread(target=self._watch, args=(threading.get_ident(),), name="loop-watchdog", daemon=True)
+        thread.start()
+        try:
+            while True:
+                self._beat_at = time.monotonic()
+                await asyncio.sleep(self.interval_s)
+                lag = max(0.0, time.monotonic() - self._beat_at - self.interval_s)
+                self.lag.record(lag)
+                if lag >= self.threshold_s:
+                    self._report_stall(lag)
+                self._beat += 1
+        finally:
+            self._stopped.set()
+
+    def _report_stall(self, lag: float):
+        self.stalls += 1
+        if self._stall_beat == self._beat and self._stall_stack:
+            logger.warning(f"Event loop was blocked for {lag * 1000:.0f} ms. Loop thread stack while blocked:\n{self._stall_stack}")
+        else:
+            logger.warning(f"Event loop was blocked for {lag * 1000:.0f} ms (too briefly to capture its stack).")
+
+    def stats(self) -> dict:
+        return {"threshold_ms": round(self.threshold_s * 1000), "stalls": self.stalls, **self.lag.summary()}
+
+def _folded_stack(frame, thread_name: str) -> str:
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    stack.append(thread_name)
+    return ";".join(reversed(stack))
+
+def sample_stacks(duration_s: float, interval_s: float = 0.005) -> Counter:
+    """
+    Samples the stack of every other thread each `interval_s` for `duration_s`,
+    and counts the samples per stack in "thread;outer;...;inner" form.
+    """
+    own_thread_id = threading.get_ident()
+    counts = Counter()
+    deadline = time.monotonic() + duration_s
+    while time.monotonic() < deadline:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id != own_thread_id:
+                counts[_folded_stack(frame, names.get(thread_id, f"thread-{thread_id}"))] += 1
+        time.sleep(interval_s)
+    return counts
+
+def default_profile_dir() -> str:
+    return os.path.join(ConfigLoader.get_base_path(), "logs", "profiles")
+
+def capture_profile(duration_s: float = DEFAULT_PROFILE_S, directory: str = None, interval_s: float = 0.005) -> dict:
+    """
+    Samples all threads for `duration_s` and writes the stacks in the folded
+    format ("frame;frame;frame count" per line) read by flamegraph.pl,
+    speedscope and inferno. Blocks, so call it through asyncio.to_thread.
+    """
+    directory = directory or default_profile_dir()
+    os.makedirs(directory, exist_ok=True)
+    counts = sample_stacks(duration_s, interval_s)
+    path = os.path.join(directory, time.strftime("profile-%Y%m%d-%H%M%S.folded"))
+    with open(path, "w", encoding="utf-8") as f:
+        for stack, count in counts.most_common():
+            f.write(f"{stack} {count}\n")
+    logger.info(f"Wrote a {duration_s:.0f} s profile ({sum(counts.values())} samples) to {path}")
+    return {"path": path, "duration_s": duration_s, "samples": sum(counts.values()), "stacks": len(counts)}
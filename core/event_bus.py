@@ -1,26 +1,64 @@
-
 import asyncio
+from collections import Counter
 from dataclasses import dataclass, field
-from typing import Any
+from typing import Any, Optional
 
 @dataclass
 class Event:
     event_type: str
     payload: Any = field(default=None)
+    # Optional annotations, such as spoken-time offsets, that consumers may ignore.
+    meta: Optional[dict] = field(default=None)
+
+# Events a subscriber may fall behind by. A subscriber that may sit idle
+# (e.g. a UI or stream watcher) loses its oldest events rather than growing
+# without bound over a long session. Subscribers that always consume, such as
+# the resolver and the VTS agent, ask for an unbounded queue instead, so a
+# burst of chat can't evict the streamer's own speech.
+DEFAULT_MAX_QUEUE_SIZE = 1024
+
+def put_drop_oldest(queue: asyncio.Queue, item) -> bool:
+    """Puts `item` on a bounded queue, evicting the oldest item if it is full. Returns True if one was evicted."""
+    dropped = queue.full()
+    if dropped:
+        queue.get_nowait()
+        queue.task_done()
+    queue.put_nowait(item)
+    return dropped
 
 class EventBus:
-    def __init__(self):
+    def __init__(self, max_queue_size: int = DEFAULT_MAX_QUEUE_SIZE):
         self._queues = {}
+        self.max_queue_size = max_queue_size
+        self.published_counts = Counter()
+        self.dropped_counts = Counter()
+
+    def get_queue(self, event_type: str, bounded: bool = True) -> asyncio.Queue:
+        """Registers a new subscriber queue. Every subscriber receives every event."""
+        queue = asyncio.Queue(maxsize=self.max_queue_size if bounded else 0)
+        self._queues.setdefault(event_type, []).append(queue)
+        return queue
+
+    def unsubscribe(self, event_type: str, queue: asyncio.Queue):
+        queues = self._queues.get(event_type, [])
+        if queue in queues:
+            queues.remove(queue)
 
-    def get_queue(self, event_type: str) -> asyncio.Queue:
-        if event_type not in self._queues:
-            self._queues[event_type] = asyncio.Queue()
-        return self._queues[event_type]
+    async def publish(self, event_type: str, payload: Any, meta: dict = None):
+        event = Event(event_type=event_type, payload=payload, meta=meta)
+        self.published_counts[event_type] += 1
+        for queue in self._queues.get(event_type, ()):
+            if put_drop_oldest(queue, event):
+                self.dropped_counts[event_type] += 1
 
-    async def publish(self, event_type: str, payload: Any):
-        event = Event(event_type=event_type, payload=payload)
-        if event_type in self._queues:
-            await self._queues[event_type].put(event)
+    async def subscribe(self, event_type: str, bounded: bool = True) -> asyncio.Queue:
+        return self.get_queue(event_type, bounded)
 
-    async def subscribe(self, event_type: str) -> asyncio.Queue:
-        return self.get_queue(event_type)
+    def stats(self) -> dict:
+        """Events published per type and the backlog of every subscriber queue."""
+        return {
+            "published": dict(self.published_counts),
+            "dropped": dict(self.dropped_counts),
+            "queue_depths": {event_type: [queue.qsize() for queue in queues]
+                             for event_type, queues in self._queues.items() if queues},
+        }
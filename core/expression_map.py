@@ -0,0 +1,117 @@
+import copy
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+DEFAULT_COOLDOWN_S = 60
+# How an expression's keywords act on it: "toggle" presses its ToggleExpression
+# hotkey as is, "on" sets it active (a no-op if it already is). Entries without
+# a mode toggle, unless they set auto_off_s, which only an "on" can undo.
+DEFAULT_EXPRESSION_MODE = "toggle"
+EXPRESSION_MODES = ("on", "toggle")
+# Version of the trigger data _build_entries derives. Bump it with every change
+# to that data, so expression snapshots saved by older builds are rebuilt.
+ENTRIES_VERSION = 2
+
+@dataclass
+class ExpressionDiff:
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+    def __str__(self):
+        return f"{len(self.added)} added, {len(self.removed)} removed, {len(self.changed)} changed"
+
+def diff_expressions(old: dict, new: dict) -> ExpressionDiff:
+    """Compares two `expressions` sections of vts_config.yaml by expression file."""
+    old = old or {}
+    new = new or {}
+    return ExpressionDiff(
+        added=[exp_file for exp_file in new if exp_file not in old],
+        removed=[exp_file for exp_file in old if exp_file not in new],
+        changed=[exp_file for exp_file in new if exp_file in old and new[exp_file] != old[exp_file]],
+    )
+
+class ExpressionMapBuilder:
+    """
+    Builds the session keyword -> trigger data map from the `expressions` section
+    of vts_config.yaml and the hotkey IDs reported by VTube Studio.
+
+    Entries are cached per expression file, so an update only re-derives the
+    expressions that actually changed.
+    """
+
+    def __init__(self, hotkey_ids: Dict[str, str]):
+        self.hotkey_ids = dict(hotkey_ids)
+        self.expressions = {}
+        self._entries: Dict[str, List[Tuple[str, dict]]] = {}
+
+    def _build_entries(self, exp_file: str, exp_data: dict) -> List[Tuple[str, dict]]:
+        hotkey_id = self.hotkey_ids.get(exp_file)
+        if not hotkey_id:
+            return []
+        mode = exp_data.get('mode')
+        if mode is True:
+            mode = "on"  # YAML 1.1 reads an unquoted `mode: on` as a boolean.
+        if mode not in EXPRESSION_MODES:
+            mode = "on" if exp_data.get('auto_off_s') else DEFAULT_EXPRESSION_MODE
+        trigger_data = {
+            "hotkeyID": hotkey_id,
+            "cooldown_s": exp_data.get('cooldown_s', DEFAULT_COOLDOWN_S),
+            "expression": exp_file,
+            "action": mode,
+            "auto_off_s": exp_data.get('auto_off_s'),
+        }
+        off_data = {**trigger_data, "action": "off", "auto_off_s": None}
+        entries = [(keyword, trigger_data) for keyword in exp_data.get('keywords') or [] if keyword]
+        if exp_data.get('name'):
+            entries.append((exp_data['name'], trigger_data))
+        entries.extend((keyword, off_data) for keyword in exp_data.get('off_keywords') or [] if keyword)
+        return entries
+
+    def update(self, expressions: dict, hotkey_ids: Dict[str, str] = None) -> ExpressionDiff:
+        """Applies a new `expressions` section (and optionally new hotkey IDs), returning what changed."""
+        expressions = expressions or {}
+        diff = diff_expressions(self.expressions, expressions)
+
+        if hotkey_ids is not None:
+            for exp_file in expressions:
+                if exp_file in self.expressions and exp_file not in diff.changed \
+                        and self.hotkey_ids.get(exp_file) != hotkey_ids.get(exp_file):
+                    diff.changed.append(exp_file)
+            self.hotkey_ids = dict(hotkey_ids)
+
+        for exp_file in diff.removed:
+            self._entries.pop(exp_file, None)
+        for exp_file in diff.added + diff.changed:
+            self._entries[exp_file] = self._build_entries(exp_file, expressions[exp_file])
+
+        # Always take the new ordering, since it decides which expression wins a shared keyword.
+        self.expressions = copy.deepcopy(expressions)
+        return diff
+
+    def to_snapshot(self) -> dict:
+        """The builder's state as plain JSON data, for ConfigStore.save_snapshot."""
+        return {
+            "hotkey_ids": self.hotkey_ids,
+            "expressions": self.expressions,
+            "entries": {exp_file: [[keyword, trigger_data] for keyword, trigger_data in entries]
+                        for exp_file, entries in self._entries.items()},
+        }
+
+    @classmethod
+    def from_snapshot(cls, snapshot: dict) -> "ExpressionMapBuilder":
+        builder = cls(snapshot["hotkey_ids"])
+        builder.expressions = snapshot["expressions"]
+        builder._entries = {exp_file: [(keyword, trigger_data) for keyword, trigger_data in entries]
+                            for exp_file, entries in snapshot["entries"].items()}
+        return builder
+
+    def build(self) -> dict:
+        session_expression_map = {}
+        for exp_file in self.expressions:
+            for keyword, trigger_data in self._entries.get(exp_file, ()):
+                session_expression_map[keyword] = trigger_data
+        return session_expression_map
@@ -0,0 +1,56 @@
+import asyncio
+import json
+import os
+from typing import List, Optional
+from loguru import logger
+
+from core.config_store import write_atomic
+
+class HotkeyCache:
+    """
+    Remembers the ToggleExpression hotkeys of every VTS model seen so far, keyed
+    by modelID, so startup can build the expression map before VTS answers.
+    """
+
+    HOTKEY_FIELDS = ('name', 'type', 'file', 'hotkeyID')
+
+    def __init__(self, path: str):
+        self.path = path
+        self.last_model_id = None
+        self.models = {}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.last_model_id = data.get('last_model_id')
+            self.models = data.get('models', {})
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable hotkey cache at {self.path}: {e}")
+
+    def get(self, model_id: Optional[str]) -> Optional[List[dict]]:
+        entry = self.models.get(model_id) if model_id else None
+        return entry['hotkeys'] if entry else None
+
+    def get_last(self) -> Optional[List[dict]]:
+        return self.get(self.last_model_id)
+
+    def put(self, model_id: str, model_name: str, hotkeys: List[dict]) -> bool:
+        """Stores the hotkeys of a model and returns whether anything changed."""
+        hotkeys = [{key: h.get(key) for key in self.HOTKEY_FIELDS} for h in hotkeys]
+        entry = {'model_name': model_name, 'hotkeys': hotkeys}
+        changed = self.models.get(model_id) != entry or self.last_model_id != model_id
+        self.models[model_id] = entry
+        self.last_model_id = model_id
+        return changed
+
+    async def save(self):
+        # Serialize on the loop so later puts can't race the writer thread; the atomic rename keeps a crash from truncating the cache.
+        data = json.dumps({'last_model_id': self.last_model_id, 'models': self.models}, indent=2, ensure_ascii=False).encode('utf-8')
+        try:
+            await asyncio.to_thread(write_atomic, self.path, data)
+        except Exception as e:
+            logger.error(f"Failed to save hotkey cache to {self.path}: {e}")
@@ -5,48 +5,312 @@ from loguru import logger
 
 from core.interfaces import IntentResolver
 from core.event_bus import EventBus
+from core.expression_map import DEFAULT_COOLDOWN_S
+from core.logging_setup import category_logger
+from core.rate_limiter import TokenBucket
+
+# A keyword in a partial (not yet endpointed) result only triggers once the
+# recognizer has decoded this much audio past it, so the hypothesis has settled.
+PARTIAL_STABILITY_S = 0.2
+# Hybrid mode: provisional triggers kept waiting for their offline confirmation.
+MAX_UNCONFIRMED_UTTERANCES = 16
+# Most queued transcriptions resolved together in one pass.
+MAX_BATCH = 256
+# Multi-language recognition: a hotkey fired from one language's results is not
+# fired again from another language's results for words ending this close by.
+CROSS_LANGUAGE_DEDUP_S = 1.5
+
+transcription_log = category_logger("transcription")
+trigger_log = category_logger("trigger")
+chat_log = category_logger("chat")
+
+def keyword_end_times(meta: dict, lower_keyword: str) -> list:
+    """
+    Capture times of the last token of every occurrence of `lower_keyword` in
+    the token sequence of an ASR result, or [] if the result carries no token timing.
+    """
+    tokens, token_times = meta.get("tokens"), meta.get("token_times")
+    if not tokens or not token_times:
+        return []
+    # Rebuild the text from the tokens, remembering which token each character came from.
+    text, owners = [], []
+    for index, token in enumerate(tokens):
+        piece = token.replace("\u2581", " ").lower()
+        text.append(piece)
+        owners.extend([index] * len(piece))
+    text = "".join(text)
+
+    end_times, start = [], text.find(lower_keyword)
+    while start != -1 and lower_keyword:
+        end_time = token_times[owners[start + len(lower_keyword) - 1]]
+        if end_time is not None:
+            end_times.append(end_time)
+        start = text.find(lower_keyword, start + len(lower_keyword))
+    return end_times
+
+def trigger_meta(keyword: str, trigger_data: dict, spoken_end: float = None) -> dict:
+    """Meta of a hotkey_triggered event: what was said, when, and what it should do to its expression."""
+    meta = {"keyword": keyword, "spoken_end": spoken_end}
+    for key in ("expression", "action", "auto_off_s"):
+        if trigger_data.get(key) is not None:
+            meta[key] = trigger_data[key]
+    return meta
+
+class KeywordMatcher:
+    """Immutable, pre-lowercased snapshot of an expression map."""
+
+    def __init__(self, expression_map: dict):
+        entries = []
+        for keyword, trigger_data in expression_map.items():
+            if isinstance(trigger_data, str):
+                trigger_data = {"hotkeyID": trigger_data, "cooldown_s": DEFAULT_COOLDOWN_S}
+            entries.append((keyword, keyword.lower(), trigger_data))
+        self.entries = tuple(entries)
+
+    def match(self, lower_text: str) -> list:
+        return [(keyword, trigger_data) for keyword, lower_keyword, trigger_data in self.entries
+                if lower_keyword in lower_text]
 
 class KeywordIntentResolver(IntentResolver):
-    def __init__(self, event_bus: EventBus, expression_map: dict):
+    def __init__(self, event_bus: EventBus, expression_map: dict, clock=time.monotonic):
         self.event_bus = event_bus
+        # Time source for cooldowns and rate limits; a journal replay substitutes the recorded times.
+        self.clock = clock
         self.expression_map = expression_map
+        self.matcher = KeywordMatcher(expression_map)
         self.last_triggered_expression = None
         self.consecutive_trigger_count = 0
         self.expression_cooldowns = {}
+        # Keyword occurrences already acted on in the current utterance, per
+        # recognized language (meta["language"], None for a single recognizer).
+        # Streaming results repeat the utterance so far, so each occurrence fires only once.
+        self.utterances = {}
+        # Hotkey -> (language, spoken end) of its last trigger from a language-tagged result.
+        self.language_triggers = {}
+        # Hybrid mode: triggers fired from streaming results, by utterance, until
+        # the offline pass confirms them; and keywords it last overruled, whose
+        # detections now wait for confirmation instead of firing provisionally.
+        self.provisional_triggers = {}
+        self.unconfirmed_keywords = set()
+        # Inputs other than the microphone (chat) tag their events with meta["source"];
+        # each source may be limited to a number of triggers per second.
+        self.rate_limits = {}
+        self.source_counts = {}
+        # Subscribe right away so transcriptions published before resolve_intent starts are queued, not dropped.
+        # The resolver always consumes, so nothing is evicted from its queues.
+        self.transcription_queue = event_bus.get_queue("transcription_received", bounded=False)
+        self.partial_queue = event_bus.get_queue("transcription_partial", bounded=False)
 
-    async def _process_one_event(self, transcribed_text: str):
+    def _new_occurrences(self, keyword: str, lower_keyword: str, lower_text: str, meta: dict, partial: bool) -> list:
+        """
+        Returns the spoken end time (None if unknown) of every occurrence of the
+        keyword not yet acted on. Without an utterance in `meta` every event is independent.
+        """
+        end_times = keyword_end_times(meta, lower_keyword) if meta else []
+        if partial and not meta.get("provisional"):
+            # Only occurrences the recognizer has decoded well past are stable.
+            decoded_until = meta.get("decoded_until")
+            if decoded_until is None:
+                return []
+            end_times = [t for t in end_times if t <= decoded_until - PARTIAL_STABILITY_S]
+            count = len(end_times)
+        else:
+            count = max(lower_text.count(lower_keyword), len(end_times))
+
+        if not meta or meta.get("utterance") is None:
+            return [None] * count
+        language = meta.get("language")
+        utterance, fired_occurrences = self.utterances.get(language, (None, None))
+        if fired_occurrences is None or meta["utterance"] != utterance:
+            fired_occurrences = {}
+            self.utterances[language] = (meta["utterance"], fired_occurrences)
+        fired = fired_occurrences.get(keyword, 0)
+        if count <= fired:
+            return []
+        fired_occurrences[keyword] = count
+        end_times = end_times + [None] * (count - len(end_times))
+        return end_times[fired:count]
+
+    async def _process_one_event(self, transcribed_text: str, meta: dict = None, partial: bool = False):
+        if meta and meta.get("confirmation"):
+            await self._confirm(transcribed_text, meta)
+            return
         if not transcribed_text:
             return
 
-        logger.info(f"Transcribed: {transcribed_text}")
+        if not partial:
+            transcription_log.info("Transcribed: {text}", text=transcribed_text)
         lower_transcribed_text = transcribed_text.lower()
+        provisional = bool(meta and meta.get("provisional"))
+        language = meta.get("language") if meta else None
 
-        for keyword, trigger_data in self.expression_map.items():
-            if keyword.lower() in lower_transcribed_text:
-                hotkey_id = trigger_data["hotkeyID"]
-                cooldown_duration = trigger_data["cooldown_s"]
+        for keyword, trigger_data in self.matcher.match(lower_transcribed_text):
+            occurrences = self._new_occurrences(keyword, keyword.lower(), lower_transcribed_text, meta, partial)
+            if not occurrences:
+                continue
+            if not provisional:
+                await self._trigger(keyword, trigger_data, occurrences[-1], language)
+            elif keyword not in self.unconfirmed_keywords:
+                await self._trigger_provisionally(keyword, trigger_data, occurrences[-1], (language, meta["utterance"]), language)
 
-                if hotkey_id in self.expression_cooldowns and time.time() < self.expression_cooldowns[hotkey_id]:
-                    remaining = self.expression_cooldowns[hotkey_id] - time.time()
-                    logger.info(f"Keyword '{keyword}' detected, but expression {hotkey_id} is on cooldown for {remaining:.1f} more seconds.")
-                    continue
+    def _on_cooldown(self, keyword: str, hotkey_id: str) -> bool:
+        if hotkey_id in self.expression_cooldowns and self.clock() < self.expression_cooldowns[hotkey_id]:
+            remaining = self.expression_cooldowns[hotkey_id] - self.clock()
+            trigger_log.info("Keyword '{keyword}' detected, but expression {hotkey} is on cooldown for {remaining:.1f} more seconds.",
+                             keyword=keyword, hotkey=hotkey_id, remaining=remaining)
+            return True
+        return False
 
-                if hotkey_id == self.last_triggered_expression:
-                    self.consecutive_trigger_count += 1
-                else:
-                    self.last_triggered_expression = hotkey_id
-                    self.consecutive_trigger_count = 1
+    def _arm_cooldown(self, trigger_data: dict):
+        """
+        Counts a trigger towards the two-in-a-row cooldown, which keeps repeated
+        toggles from flickering an expression. Only toggles are put on cooldown:
+        the agent already skips set-on/set-off triggers that change nothing.
+        """
+        hotkey_id = trigger_data["hotkeyID"]
+        cooldown_duration = trigger_data["cooldown_s"]
 
-                if self.consecutive_trigger_count == 2:
-                    self.expression_cooldowns[hotkey_id] = time.time() + cooldown_duration
-                    logger.warning(f"Expression {hotkey_id} triggered twice consecutively. Placing on cooldown for {cooldown_duration} seconds.")
+        if hotkey_id == self.last_triggered_expression:
+            self.consecutive_trigger_count += 1
+        else:
+            self.last_triggered_expression = hotkey_id
+            self.consecutive_trigger_count = 1
 
-                logger.info(f"Keyword '{keyword}' detected. Triggering expression: {hotkey_id}")
-                await self.event_bus.publish("hotkey_triggered", hotkey_id)
+        if self.consecutive_trigger_count == 2 and trigger_data.get("action", "toggle") == "toggle":
+            self._prune_cooldowns()
+            self.expression_cooldowns[hotkey_id] = self.clock() + cooldown_duration
+            logger.warning(f"Expression {hotkey_id} triggered twice consecutively. Placing on cooldown for {cooldown_duration} seconds.")
 
-    async def resolve_intent(self):
-        transcription_queue = await self.event_bus.subscribe("transcription_received")
+    def _prune_cooldowns(self):
+        """Forgets expired cooldowns, so hotkeys of models used earlier in a long session don't pile up."""
+        now = self.clock()
+        self.expression_cooldowns = {hotkey_id: until for hotkey_id, until in self.expression_cooldowns.items() if until > now}
+
+    def _fired_in_other_language(self, keyword: str, hotkey_id: str, language: str, spoken_end: float = None) -> bool:
+        """
+        Multi-language recognition: whether another language's recognizer just
+        fired this hotkey for the same words. Otherwise records this trigger.
+        """
+        if language is None:
+            return False
+        at = self.clock() if spoken_end is None else spoken_end
+        previous = self.language_triggers.get(hotkey_id)
+        if previous and previous[0] != language and abs(at - previous[1]) < CROSS_LANGUAGE_DEDUP_S:
+            trigger_log.debug("Keyword '{keyword}' ({language}) already fired {hotkey} from {other} results.",
+                              keyword=keyword, language=language, hotkey=hotkey_id, other=previous[0])
+            return True
+        self.language_triggers[hotkey_id] = (language, at)
+        return False
+
+    async def _trigger(self, keyword: str, trigger_data: dict, spoken_end: float = None, language: str = None):
+        hotkey_id = trigger_data["hotkeyID"]
+        if self._on_cooldown(keyword, hotkey_id) or self._fired_in_other_language(keyword, hotkey_id, language, spoken_end):
+            return
+        self._arm_cooldown(trigger_data)
+
+        trigger_log.info("Keyword '{keyword}' detected. Triggering expression: {hotkey}", keyword=keyword, hotkey=hotkey_id)
+        await self.event_bus.publish("hotkey_triggered", hotkey_id, meta=trigger_meta(keyword, trigger_data, spoken_end))
+
+    async def _trigger_provisionally(self, keyword: str, trigger_data: dict, spoken_end: float, utterance, language: str = None):
+        """Fires on a streaming result now; cooldown arming waits for the offline confirmation."""
+        hotkey_id = trigger_data["hotkeyID"]
+        if self._on_cooldown(keyword, hotkey_id) or self._fired_in_other_language(keyword, hotkey_id, language, spoken_end):
+            return
+        self.provisional_triggers.setdefault(utterance, []).append((keyword, trigger_data))
+        while len(self.provisional_triggers) > MAX_UNCONFIRMED_UTTERANCES:
+            # Confirmations that never arrive (e.g. the recognizer was swapped) must not pile up.
+            del self.provisional_triggers[next(iter(self.provisional_triggers))]
+
+        trigger_log.info("Keyword '{keyword}' detected. Triggering expression: {hotkey} (provisional)", keyword=keyword, hotkey=hotkey_id)
+        await self.event_bus.publish("hotkey_triggered", hotkey_id, meta={**trigger_meta(keyword, trigger_data, spoken_end), "provisional": True})
+
+    async def _confirm(self, transcribed_text: str, meta: dict):
+        """
+        Settles the provisional triggers of a finished hybrid-mode utterance.
+        Confirmed ones arm cooldowns. Overruled keywords stop firing
+        provisionally until the offline pass hears them again. Keywords only
+        the offline pass heard fire now. A "skipped" confirmation carries the
+        streaming text, and the provisional triggers stand.
+        """
+        if transcribed_text:
+            transcription_log.info("Transcribed: {text}", text=transcribed_text)
+        offline = meta["confirmation"] == "offline"
+        language = meta.get("language")
+        provisional = self.provisional_triggers.pop((language, meta.get("utterance")), [])
+        matches = self.matcher.match(transcribed_text.lower()) if transcribed_text else []
+        matched = {keyword for keyword, _ in matches}
+
+        for keyword, trigger_data in provisional:
+            if keyword in matched or not offline:
+                self.unconfirmed_keywords.discard(keyword)
+                self._arm_cooldown(trigger_data)
+            else:
+                self.unconfirmed_keywords.add(keyword)
+                logger.info(f"Keyword '{keyword}' was not confirmed; its next detections wait for confirmation.")
+
+        fired = {keyword for keyword, _ in provisional}
+        for keyword, trigger_data in matches:
+            if keyword not in fired:
+                self.unconfirmed_keywords.discard(keyword)
+                await self._trigger(keyword, trigger_data, language=language)
+
+    def update_expression_map(self, expression_map: dict):
+        """Swaps in a rebuilt matcher. Safe to call while resolve_intent is running."""
+        matcher = KeywordMatcher(expression_map)
+        self.expression_map = expression_map
+        self.matcher = matcher
+
+    def set_rate_limit(self, source: str, triggers_per_s: float, burst: float = 1.0):
+        """Caps the triggers caused by events from `source`; further matches are dropped."""
+        self.rate_limits[source] = TokenBucket(triggers_per_s, burst, now=self.clock())
+
+    def rate_limit_settings(self) -> dict:
+        """Source -> {"triggers_per_s", "burst"} of every rate limit, as given to set_rate_limit."""
+        return {source: {"triggers_per_s": limit.rate_per_s, "burst": limit.burst} for source, limit in self.rate_limits.items()}
+
+    async def resolve_batch(self, events: list, partial: bool):
+        """
+        Resolves a batch of queued transcriptions. Speech results are handled
+        one by one, in order. Text from other sources is merged: during a chat
+        raid, hundreds of "!angry" in one batch trigger the expression once,
+        subject to that source's rate limit. Merging stops at each speech
+        result, so triggers still fire in the order their text arrived.
+        """
+        merged = {}
+        for event in events:
+            source = (event.meta or {}).get("source")
+            if source is None:
+                await self._trigger_merged(merged)
+                merged.clear()
+                await self._process_one_event(event.payload, event.meta, partial)
+                continue
+            self.source_counts[source] = self.source_counts.get(source, 0) + 1
+            if not event.payload:
+                continue
+            for keyword, trigger_data in self.matcher.match(event.payload.lower()):
+                merged.setdefault((trigger_data["hotkeyID"], trigger_data.get("action")), (keyword, trigger_data, source))
+        await self._trigger_merged(merged)
+
+    async def _trigger_merged(self, merged: dict):
+        for keyword, trigger_data, source in merged.values():
+            limit = self.rate_limits.get(source)
+            if limit is not None and not limit.try_acquire(self.clock()):
+                chat_log.debug("Keyword '{keyword}' from {source} dropped by its rate limit.", keyword=keyword, source=source)
+                continue
+            chat_log.info("Keyword '{keyword}' received from {source}.", keyword=keyword, source=source)
+            await self._trigger(keyword, trigger_data)
+
+    async def _consume(self, queue: asyncio.Queue, partial: bool):
         while True:
-            event = await transcription_queue.get()
-            await self._process_one_event(event.payload)
-            transcription_queue.task_done()
+            events = [await queue.get()]
+            while len(events) < MAX_BATCH and not queue.empty():
+                events.append(queue.get_nowait())
+            await self.resolve_batch(events, partial)
+            for _ in events:
+                queue.task_done()
+
+    async def resolve_intent(self):
+        await asyncio.gather(
+            self._consume(self.transcription_queue, partial=False),
+            self._consume(self.partial_queue, partial=True),
+        )
@@ -0,0 +1,158 @@
+import asyncio
+import json
+import os
+import queue
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+from loguru import logger
+
+from core.event_bus import EventBus
+
+MAGIC = b"VTSJ"
+VERSION = 1
+# kind, time.monotonic() of the record, payload length
+RECORD_HEADER = struct.Struct("<BdI")
+EVENT_RECORD = 1
+AUDIO_RECORD = 2
+AUDIO_EVENT_TYPE = "audio"
+# Journal-only record of the resolver's keyword map, so a replay resolves with the same map.
+EXPRESSION_MAP_EVENT_TYPE = "expression_map"
+# Journal-only record of the resolver's per-source rate limits, for the same reason.
+RATE_LIMITS_EVENT_TYPE = "rate_limits"
+
+JOURNALED_EVENTS = (
+    "transcription_received",
+    "transcription_partial",
+    "hotkey_triggered",
+    "vts_status_update",
+    "asr_status_update",
+    "asr_quality_tier",
+    "asr_ready",
+)
+
+@dataclass
+class JournalRecord:
+    at: float  # time.monotonic() when recorded
+    event_type: str
+    payload: Any = None  # Audio records carry 16-bit PCM bytes
+    meta: Optional[dict] = None
+
+class EventJournal:
+    """
+    Append-only binary journal of bus events and, optionally, the captured
+    audio. A record is a fixed header (kind, monotonic time, length) followed
+    by compact JSON for events or 16-bit PCM for audio. Records are encoded
+    where they happen and written by a background thread through a buffered
+    file, so neither the event loop nor the audio thread waits on disk.
+    """
+
+    def __init__(self, path: str, include_audio: bool = False, sample_rate: int = 16000, buffer_bytes: int = 1 << 16):
+        self.path = path
+        self.include_audio = include_audio
+        self.sample_rate = sample_rate
+        self.buffer_bytes = buffer_bytes
+        self.records_written = 0
+        self.bytes_written = 0
+        self._pending = queue.SimpleQueue()
+        self._thread = None
+
+    def open(self) -> "EventJournal":
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        header = json.dumps({
+            "version": VERSION,
+            "sample_rate": self.sample_rate,
+            "started_at": time.time(),
+            "started_monotonic": time.monotonic(),
+        }).encode("utf-8")
+        file = open(self.path, "wb", buffering=self.buffer_bytes)
+        file.write(MAGIC + struct.pack("<I", len(header)) + header)
+        self._thread = threading.Thread(target=self._write_loop, args=(file,), name="event-journal", daemon=True)
+        self._thread.start()
+        logger.info(f"Journaling events{' and audio' if self.include_audio else ''} to {self.path}")
+        return self
+
+    def _write_loop(self, file):
+        try:
+            while True:
+                record = self._pending.get()
+                if record is None:
+                    break
+                file.write(record)
+                self.records_written += 1
+                self.bytes_written += len(record)
+        finally:
+            file.close()
+
+    def _append(self, kind: int, at: float, payload: bytes):
+        self._pending.put(RECORD_HEADER.pack(kind, at, len(payload)) + payload)
+
+    def write_event(self, event_type: str, payload: Any, meta: dict = None, at: float = None):
+        data = json.dumps([event_type, payload, meta], separators=(",", ":"), default=str).encode("utf-8")
+        self._append(EVENT_RECORD, time.monotonic() if at is None else at, data)
+
+    def write_audio(self, samples, at: float = None):
+        """Records a captured float32 block as 16-bit PCM. Safe to call from the audio thread."""
+        if self.include_audio:
+            pcm = (samples.clip(-1.0, 1.0) * 32767).astype("<i2").tobytes()
+            self._append(AUDIO_RECORD, time.monotonic() if at is None else at, pcm)
+
+    async def record(self, event_bus: EventBus, event_types: tuple = JOURNALED_EVENTS):
+        """Journals every event of `event_types` published on the bus until cancelled."""
+        async def drain(event_queue: asyncio.Queue):
+            while True:
+                event = await event_queue.get()
+                self.write_event(event.event_type, event.payload, event.meta)
+                event_queue.task_done()
+
+        # The journal always drains, so its queues are exempt from drop-oldest eviction and it loses nothing.
+        queues = [await event_bus.subscribe(event_type, bounded=False) for event_type in event_types]
+        try:
+            await asyncio.gather(*(drain(event_queue) for event_queue in queues))
+        finally:
+            for event_type, event_queue in zip(event_types, queues):
+                event_bus.unsubscribe(event_type, event_queue)
+
+    def close(self):
+        if self._thread is not None:
+            self._pending.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def stats(self) -> dict:
+        return {"path": self.path, "records": self.records_written, "bytes": self.bytes_written}
+
+class JournalReader:
+    """Reads a journal back as JournalRecords. A record cut short by a crash ends the journal."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not an event journal.")
+            (header_length,) = struct.unpack("<I", f.read(4))
+            self.header = json.loads(f.read(header_length))
+            self._records_offset = f.tell()
+        self.sample_rate = self.header["sample_rate"]
+
+    def __iter__(self):
+        with open(self.path, "rb") as f:
+            f.seek(self._records_offset)
+            while True:
+                head = f.read(RECORD_HEADER.size)
+                if len(head) < RECORD_HEADER.size:
+                    return
+                kind, at, length = RECORD_HEADER.unpack(head)
+                payload = f.read(length)
+                if len(payload) < length:
+                    return
+                if kind == AUDIO_RECORD:
+                    yield JournalRecord(at, AUDIO_EVENT_TYPE, payload)
+                elif kind == EVENT_RECORD:
+                    event_type, event_payload, meta = json.loads(payload)
+                    yield JournalRecord(at, event_type, event_payload, meta)
+
+def journal_path(directory: str) -> str:
+    return os.path.join(directory, time.strftime("journal-%Y%m%d-%H%M%S.vtsj"))
@@ -0,0 +1,56 @@
+import bisect
+
+# Upper bounds, in milliseconds, of the histogram buckets. The last bucket is open-ended.
+DEFAULT_BUCKETS_MS = (25, 50, 75, 100, 150, 200, 300, 400, 500, 750, 1000, 1500, 2000, 3000)
+# For operations that usually take well under a millisecond, such as a local
+# VTS round trip or event loop lag.
+FAST_BUCKETS_MS = (0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with approximate percentiles. Cheap enough to update per trigger."""
+
+    def __init__(self, buckets_ms: tuple = DEFAULT_BUCKETS_MS):
+        self.buckets_ms = tuple(buckets_ms)
+        self.counts = [0] * (len(self.buckets_ms) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, latency_s: float):
+        latency_ms = max(0.0, latency_s * 1000)
+        self.counts[bisect.bisect_left(self.buckets_ms, latency_ms)] += 1
+        self.count += 1
+        self.total_ms += latency_ms
+        self.max_ms = max(self.max_ms, latency_ms)
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the given fraction of samples, capped at max_ms."""
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return min(float(self.buckets_ms[index]), self.max_ms) if index < len(self.buckets_ms) else self.max_ms
+        return self.max_ms
+
+    def summary(self) -> dict:
+        labels = [f"<={bound}" for bound in self.buckets_ms] + [f">{self.buckets_ms[-1]}"]
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 1) if self.count else 0.0,
+            "p50_ms": round(self.percentile(0.5), 1),
+            "p90_ms": round(self.percentile(0.9), 1),
+            "p99_ms": round(self.percentile(0.99), 1),
+            "max_ms": round(self.max_ms, 1),
+            "buckets_ms": dict(zip(labels, self.counts)),
+        }
+
+    def render(self, width: int = 40) -> str:
+        """Text bar chart of the buckets, for logs and the replay harness."""
+        peak = max(self.counts) or 1
+        lines = []
+        for label, bucket_count in self.summary()["buckets_ms"].items():
+            lines.append(f"{label:>7} ms | {'#' * round(width * bucket_count / peak):<{width}} {bucket_count}")
+        return "\n".join(lines)
@@ -0,0 +1,209 @@
+import atexit
+import json
+import os
+import queue
+import sys
+import threading
+import time
+import traceback
+from loguru import logger
+
+from core.rate_limiter import TokenBucket
+
+TEXT_FORMAT = "{time} | {level: <8} | {name}:{function}:{line} - {message}\n"
+MAX_LOG_BYTES = 10 * 2 ** 20
+RETENTION_DAYS = 7
+
+# Messages per second, and burst, allowed for each level of each category of
+# high-frequency messages. Messages past the rate are dropped before loguru
+# builds a record for them; the next one that passes says how many were dropped.
+DEFAULT_RATE_LIMITS = {
+    "transcription": (5.0, 20),
+    "trigger": (5.0, 20),
+    "chat": (2.0, 10),
+    "latency": (2.0, 10),
+    "vts_event": (2.0, 10),
+}
+
+_rate_limits = dict(DEFAULT_RATE_LIMITS)
+_category_loggers = {}
+_writer = None
+
+class CategoryLogger:
+    """
+    Logs one category of high-frequency messages (transcriptions, triggers,
+    chat commands) under a rate limit. Message fields are passed as keyword
+    arguments so they are kept in the record's `extra`, which the structured
+    log writes out as JSON fields. Warnings and errors are never dropped.
+    """
+
+    def __init__(self, category: str):
+        self.category = category
+        self.suppressed = 0
+        # depth=2: attribute records to the caller of info()/debug(), not to this class.
+        self._logger = logger.bind(category=category).opt(depth=2)
+        self._buckets = {}
+        self._pending = {}
+
+    def _allowed(self, level: str) -> bool:
+        limits = _rate_limits.get(self.category)
+        if limits is None:
+            return True
+        bucket = self._buckets.get(level)
+        if bucket is None:
+            bucket = self._buckets[level] = TokenBucket(*limits)
+        if bucket.try_acquire():
+            return True
+        self.suppressed += 1
+        self._pending[level] = self._pending.get(level, 0) + 1
+        return False
+
+    def _log(self, level: str, message: str, fields: dict, limited: bool = True):
+        if limited and not self._allowed(level):
+            return
+        dropped = self._pending.pop(level, 0)
+        if dropped:
+            message += " ({suppressed} similar messages suppressed)"
+            fields["suppressed"] = dropped
+        self._logger.log(level, message, **fields)
+
+    def debug(self, message: str, **fields):
+        self._log("DEBUG", message, fields)
+
+    def info(self, message: str, **fields):
+        self._log("INFO", message, fields)
+
+    def warning(self, message: str, **fields):
+        self._log("WARNING", message, fields, limited=False)
+
+def category_logger(category: str) -> CategoryLogger:
+    """The shared logger of `category`. Modules bind theirs once, at import time."""
+    if category not in _category_loggers:
+        _category_loggers[category] = CategoryLogger(category)
+    return _category_loggers[category]
+
+def render_text(record: dict) -> str:
+    text = TEXT_FORMAT.format(
+        time=record["time"].strftime("%Y-%m-%d %H:%M:%S.%f")[:-3],
+        level=record["level"].name,
+        name=record["name"],
+        function=record["function"],
+        line=record["line"],
+        message=record["message"],
+    )
+    exception = record["exception"]
+    if exception:
+        text += "".join(traceback.format_exception(exception.type, exception.value, exception.traceback))
+    return text
+
+def render_json(record: dict) -> str:
+    return json.dumps({
+        "time": record["time"].isoformat(),
+        "level": record["level"].name,
+        "name": record["name"],
+        "function": record["function"],
+        "line": record["line"],
+        "message": record["message"],
+        "thread": record["thread"].name,
+        **record["extra"],
+    }, default=str, ensure_ascii=False) + "\n"
+
+class RotatingFile:
+    """A log file that rolls over at `max_bytes`, deleting rolled files older than `retention_days`."""
+
+    def __init__(self, path: str, max_bytes: int = MAX_LOG_BYTES, retention_days: float = RETENTION_DAYS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.retention_days = retention_days
+        self._file = open(path, "a", encoding="utf-8")
+
+    def write(self, text: str):
+        if self._file.tell() + len(text) > self.max_bytes and self._file.tell() > 0:
+            self._rotate()
+        self._file.write(text)
+
+    def _rotate(self):
+        self._file.close()
+        stem, extension = os.path.splitext(self.path)
+        os.replace(self.path, f"{stem}.{time.strftime('%Y-%m-%d_%H-%M-%S')}{extension}")
+        directory, prefix = os.path.split(stem)
+        expired_before = time.time() - self.retention_days * 86400
+        for name in os.listdir(directory or "."):
+            rolled = os.path.join(directory, name)
+            if name.startswith(prefix + ".") and name.endswith(extension) and os.path.getmtime(rolled) < expired_before:
+                os.remove(rolled)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+class BackgroundLogWriter:
+    """
+    Loguru sink that hands each record to a background thread, which renders
+    it and writes it to every output. The logging call itself only builds
+    the record and queues it, and never waits on a console or a disk.
+    """
+
+    def __init__(self, outputs: list):
+        self.outputs = outputs  # (render, stream) pairs
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._write_loop, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def __call__(self, message):
+        self._queue.put(message.record)
+
+    def _write_loop(self):
+        while True:
+            record = self._queue.get()
+            if record is None:
+                break
+            for render, stream in self.outputs:
+                try:
+                    stream.write(render(record))
+                except Exception:
+                    pass  # A closed console or a full disk must not stop the other outputs.
+            if self._queue.empty():
+                for _, stream in self.outputs:
+                    stream.flush()
+        for _, stream in self.outputs:
+            stream.flush()
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        for _, stream in self.outputs:
+            if isinstance(stream, RotatingFile):
+                stream.close()
+
+def configure_logging(log_dir: str = "logs", level: str = "INFO", structured: bool = False, rate_limits: dict = None) -> BackgroundLogWriter:
+    """
+    Replaces loguru's default sink with a BackgroundLogWriter writing to the
+    console and `log_dir`/vts_controller.log, plus vts_controller.jsonl with
+    one JSON record per line when `structured`.
+    """
+    global _writer
+    os.makedirs(log_dir, exist_ok=True)
+    if rate_limits is not None:
+        _rate_limits.clear()
+        _rate_limits.update(rate_limits)
+    outputs = [(render_text, RotatingFile(os.path.join(log_dir, "vts_controller.log")))]
+    if structured:
+        outputs.append((render_json, RotatingFile(os.path.join(log_dir, "vts_controller.jsonl"))))
+    if sys.stderr:  # None in windowed builds
+        outputs.append((render_text, sys.stderr))
+
+    logger.remove()
+    if _writer:
+        _writer.close()
+    _writer = BackgroundLogWriter(outputs)
+    logger.add(_writer, level=level, format="{message}")
+    atexit.register(_writer.close)
+    return _writer
+
+def logging_stats() -> dict:
+    return {"suppressed": {category: category_log.suppressed for category, category_log in _category_loggers.items() if category_log.suppressed}}
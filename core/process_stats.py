@@ -0,0 +1,39 @@
+import os
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+def current_rss_bytes(pid: int = None) -> int:
+    """
+    Resident set size of this process, or its peak where the current value
+    isn't available. Another process's (`pid`) is only available on Linux, 0 elsewhere.
+    """
+    try:
+        with open(f"/proc/{pid or 'self'}/statm", "r") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        pass
+    if pid is not None:
+        return 0
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS.
+        return peak if os.uname().sysname == "Darwin" else peak * 1024
+    return 0
+
+def cpu_seconds() -> float:
+    """User plus system CPU time consumed by this process."""
+    times = os.times()
+    return times.user + times.system
+
+def snapshot() -> dict:
+    return {
+        "rss_mb": round(current_rss_bytes() / (1024 * 1024), 2),
+        "cpu_s": round(cpu_seconds(), 3),
+        "monotonic_s": round(time.monotonic(), 3),
+    }
@@ -0,0 +1,21 @@
+import time
+
+class TokenBucket:
+    """Allows `rate_per_s` actions per second on average, with bursts of up to `burst`."""
+
+    def __init__(self, rate_per_s: float, burst: float = 1.0, now: float = None):
+        self.rate_per_s = float(rate_per_s)
+        self.burst = max(1.0, float(burst))
+        self.tokens = self.burst
+        self.updated_at = time.monotonic() if now is None else now
+        self.rejected = 0
+
+    def try_acquire(self, now: float = None) -> bool:
+        now = time.monotonic() if now is None else now
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate_per_s)
+        self.updated_at = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        self.rejected += 1
+        return False
@@ -0,0 +1,47 @@
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Optional
+
+class StartupTimeline:
+    """
+    Records when each startup phase began and how long it took, relative to
+    the start of startup. Phases may overlap, since they run concurrently.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = []
+        self.finished = None
+
+    @contextmanager
+    def phase(self, name: str):
+        phase_started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append({
+                'name': name,
+                'start_s': round(phase_started - self.started, 4),
+                'duration_s': round(time.perf_counter() - phase_started, 4),
+            })
+
+    def finish(self):
+        self.finished = time.perf_counter()
+
+    @property
+    def total_s(self) -> float:
+        end = self.finished if self.finished is not None else time.perf_counter()
+        return round(end - self.started, 4)
+
+    def to_dict(self) -> dict:
+        return {'total_s': self.total_s, 'phases': sorted(self.phases, key=lambda p: p['start_s'])}
+
+    def summary(self) -> str:
+        phases = ", ".join(
+            f"{p['name']} {p['duration_s']:.2f} s (at {p['start_s']:.2f} s)" for p in self.to_dict()['phases']
+        )
+        return f"Startup finished in {self.total_s:.2f} s: {phases}"
+
+def startup_phase(timeline: Optional[StartupTimeline], name: str):
+    """Times a phase on `timeline`, or does nothing when there is no startup in progress."""
+    return timeline.phase(name) if timeline else nullcontext()
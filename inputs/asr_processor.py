@@ -1,14 +1,22 @@
 import asyncio
 import os
-import sounddevice as sd
+import time
 import numpy as np
-import sherpa_onnx
 from loguru import logger
-import onnxruntime
-import webrtcvad
 
 from core.interfaces import InputProcessor
 from core.event_bus import EventBus
+from inputs.utils.preprocess import SpeechPreprocessor
+from inputs.utils.speech_clock import SpeechClock
+
+# Streaming zipformer exports decode 32 feature frames (320 ms) at a time; feeding
+# less than that only queues audio inside the recognizer.
+DEFAULT_DECODE_CHUNK_MS = 320
+DEFAULT_IDLE_AFTER_S = 3.0
+# VAD at aggressiveness 3 flickers inside words; speech only ends after this much silence.
+SPEECH_END_HANGOVER_MS = 300
+# Longest utterance handed to the offline confirmation pass in hybrid mode.
+MAX_CONFIRM_S = 30
 
 class ASRProcessor(InputProcessor):
     def __init__(
@@ -23,6 +31,14 @@ class ASRProcessor(InputProcessor):
         vad_aggressiveness: int = 3,
         vad_frame_duration_ms: int = 30,
         recognition_mode: str = "fast",
+        decode_chunk_ms: int = None,
+        idle_after_s: float = DEFAULT_IDLE_AFTER_S,
+        input_device=None,
+        input_channels: list = None,
+        confirm_model_config: dict = None,
+        confirm_model_dir: str = None,
+        preprocess: dict = None,
+        quality_governor: dict = None,
     ) -> None:
         self.event_bus = event_bus
         self.model_config = model_config
@@ -32,9 +48,14 @@ class ASRProcessor(InputProcessor):
         self.SAMPLE_RATE = sample_rate
         self.provider = provider
         self.recognition_mode = recognition_mode
+        self.input_device = input_device
+        self.input_channels = input_channels
+        self.confirm_model_config = confirm_model_config
+        self.confirm_model_dir = confirm_model_dir
 
         if self.provider == "cuda":
             try:
+                import onnxruntime
                 if "CUDAExecutionProvider" not in onnxruntime.get_available_providers():
                     logger.warning("CUDA provider not available for ONNX. Falling back to CPU.")
                     self.provider = "cpu"
@@ -46,10 +67,29 @@ class ASRProcessor(InputProcessor):
         self.recognizer = self._create_recognizer()
         self.stream = self.recognizer.create_stream()
         self.audio_buffer = np.array([], dtype=np.float32)
-        self.buffer_lock = asyncio.Lock()
         self.last_text = "" # For tracking partial results
+        self.utterance_id = 0
+        self.speech_clock = SpeechClock(self.SAMPLE_RATE)
+        # Where self.stream starts on the speech clock, for a stream created after others
+        # sharing the clock (see MultiLanguageASRProcessor).
+        self.stream_origin_s = 0.0
+        self.last_captured_at = None
+
+        # Hybrid mode: streaming results are provisional, and every finished
+        # utterance is re-decoded offline to confirm or overrule them.
+        self.confirmer = self._create_confirmer() if self.recognition_mode == "hybrid" else None
+        self.utterance_audio = []
+        self.utterance_samples = 0
+        self.confirmations = [] # (future or None, streaming text, meta), oldest first
+        self._wake_decoder = None
+
+        # Optional clean-up ahead of VAD: high-pass, noise suppression, AGC (asr_settings.preprocess).
+        self.preprocessor = None
+        if preprocess and preprocess.get("enabled", True):
+            self.preprocessor = SpeechPreprocessor(self.SAMPLE_RATE, **{key: value for key, value in preprocess.items() if key != "enabled"})
 
         # VAD initialization
+        import webrtcvad
         self.vad = webrtcvad.Vad(vad_aggressiveness)
         self.vad_frame_duration_ms = vad_frame_duration_ms
         self.vad_frame_size = int(self.SAMPLE_RATE * self.vad_frame_duration_ms / 1000)
@@ -57,7 +97,36 @@ class ASRProcessor(InputProcessor):
         self.running = True
         self.audio_processing_task = None
 
+        # Decode scheduling: decode once a model chunk of speech is buffered or
+        # speech ends, and stop touching the recognizer after sustained silence.
+        chunk_ms = decode_chunk_ms or self.model_config.get("chunk_ms", DEFAULT_DECODE_CHUNK_MS)
+        # Speech arrives in whole VAD frames, so round the threshold to them.
+        self.base_decode_chunk_samples = max(1, round(chunk_ms / self.vad_frame_duration_ms)) * self.vad_frame_size
+        self.decode_chunk_samples = self.base_decode_chunk_samples
+        self.speech_end_samples = int(SPEECH_END_HANGOVER_MS * self.SAMPLE_RATE / 1000)
+        self.idle_after_samples = int(idle_after_s * self.SAMPLE_RATE)
+        self.in_speech = False
+        self.silence_samples = 0 # Consecutive non-speech samples seen by VAD
+        self.idle = False
+        self.finish_pending = False
+        self.status = "Listening"
+        self._reported_status = None
+        self.decode_ready = asyncio.Event()
+        self.decode_wakeups = 0
+        # Called with every captured block on the audio thread (e.g. ParameterStream.push).
+        self.audio_listeners = []
+
+        # Optional runtime trade of quality for latency under CPU load (asr_settings.quality_governor).
+        self.governor = None
+        if quality_governor and quality_governor.get("enabled", True):
+            from inputs.quality_governor import QualityGovernor
+            settings = {key: value for key, value in quality_governor.items() if key not in ("enabled", "target_latency_ms")}
+            if "target_latency_ms" in quality_governor:
+                settings["target_latency_s"] = quality_governor["target_latency_ms"] / 1000
+            self.governor = QualityGovernor(**settings)
+
     def _create_recognizer(self):
+        import sherpa_onnx
         model_type = self.model_config.get("model_type", "transducer")
         params = self.model_config["params"]
         logger.info(f"Creating recognizer of type '{model_type}'")
@@ -85,87 +154,311 @@ class ASRProcessor(InputProcessor):
         else:
             raise ValueError(f"Unsupported model_type: {model_type}")
 
-    def _transcribe_np(self, audio: np.ndarray) -> str:
+    def _create_confirmer(self):
+        if not self.confirm_model_config:
+            logger.warning("Hybrid mode without a confirmation model: streaming results will stand unconfirmed.")
+            return None
+        from inputs.offline_confirmer import OfflineConfirmer
+        return OfflineConfirmer(self.confirm_model_config, self.confirm_model_dir, sample_rate=self.SAMPLE_RATE, provider=self.provider)
+
+    def _transcribe_np(self, audio: np.ndarray) -> list:
+        """Decodes `audio` and returns the (event_type, text, meta) results to publish."""
         self.stream.accept_waveform(self.SAMPLE_RATE, audio)
         while self.recognizer.is_ready(self.stream):
             self.recognizer.decode_stream(self.stream)
 
+        results = []
         if self.recognition_mode == "fast":
             result = self.recognizer.get_result(self.stream)
             text = result.strip()
 
-            text_to_return = ""
             if text and text != self.last_text:
-                text_to_return = text
+                results.append(("transcription_received", text, self._result_meta()))
                 self.last_text = text
 
             if self.recognizer.is_endpoint(self.stream):
-                self.recognizer.reset(self.stream)
-                self.last_text = ""
-            
-            return text_to_return
-        
+                self._reset_stream()
+
+        elif self.recognition_mode == "hybrid":
+            if self.utterance_samples < MAX_CONFIRM_S * self.SAMPLE_RATE:
+                self.utterance_audio.append(audio)
+                self.utterance_samples += audio.size
+            text = self.recognizer.get_result(self.stream).strip()
+            if text and text != self.last_text:
+                # The resolver fires on these at once but only arms cooldowns
+                # once the offline pass agrees.
+                results.append(("transcription_partial", text, {**self._result_meta(), "provisional": True}))
+                self.last_text = text
+            if self.recognizer.is_endpoint(self.stream):
+                self._request_confirmation()
+                self._reset_stream()
+
         else: # Accurate mode
-            text_to_return = ""
+            text = self.recognizer.get_result(self.stream).strip()
             if self.recognizer.is_endpoint(self.stream):
-                result = self.recognizer.get_result(self.stream)
-                text_to_return = result.strip()
-                self.recognizer.reset(self.stream)
-            
-            return text_to_return
+                if text:
+                    results.append(("transcription_received", text, self._result_meta()))
+                self._reset_stream()
+            elif text and text != self.last_text:
+                # Partial hypotheses let the resolver fire on keywords that are
+                # already stable instead of waiting for the endpoint.
+                results.append(("transcription_partial", text, self._result_meta()))
+                self.last_text = text
 
-    async def _audio_callback(self, indata, frames, time, status):
-        if status:
-            logger.warning(status)
+        return results
+
+    def _reset_stream(self):
+        self.recognizer.reset(self.stream)
+        self.last_text = ""
+        self.utterance_id += 1
+        self.utterance_audio = []
+        self.utterance_samples = 0
+
+    def _new_stream(self, origin_s: float):
+        """Starts a fresh stream at `origin_s` on the speech clock, after audio was skipped."""
+        self.stream = self.recognizer.create_stream()
+        self.stream_origin_s = origin_s
+
+    def _request_confirmation(self):
+        """Hands the utterance that just ended to the offline pass (hybrid mode)."""
+        if not self.last_text:
+            return # Nothing was recognized, so nothing fired and nothing needs confirming.
+        meta = {"utterance": self.utterance_id, "decoded_until": self.last_captured_at}
+        future = None
+        if self.confirmer is not None and self.utterance_audio and (self.governor is None or self.governor.tier.confirm):
+            future = self.confirmer.submit(np.concatenate(self.utterance_audio))
+        self.confirmations.append((future, self.last_text, meta))
+        if future is not None and self._wake_decoder is not None:
+            future.add_done_callback(lambda _: self._wake_decoder())
+
+    def _take_confirmations(self) -> list:
+        """
+        Returns a transcription_received result for every finished confirmation,
+        in utterance order. meta["confirmation"] is "offline" when the text comes
+        from the offline model, or "skipped" when the streaming text had to stand.
+        """
+        results = []
+        while self.confirmations and (self.confirmations[0][0] is None or self.confirmations[0][0].done()):
+            future, streaming_text, meta = self.confirmations.pop(0)
+            text = None
+            if future is not None:
+                try:
+                    text = future.result()
+                except Exception as e:
+                    logger.error(f"Offline confirmation failed: {e}")
+            if text is None:
+                results.append(("transcription_received", streaming_text, {**meta, "confirmation": "skipped"}))
+            else:
+                results.append(("transcription_received", text, {**meta, "confirmation": "offline"}))
+        return results
+
+    def _result_meta(self) -> dict:
+        """
+        Timing of the current result: the capture time (time.monotonic) of every
+        token, and of the newest audio the recognizer has seen.
+        """
+        meta = {"utterance": self.utterance_id, "decoded_until": self.last_captured_at}
+        get_result_all = getattr(self.recognizer, "get_result_all", None)
+        if get_result_all is None:
+            return meta
+        try:
+            result = get_result_all(self.stream)
+            tokens = list(result.tokens)
+            timestamps = list(result.timestamps)
+            # Token timestamps are relative to the start of the current segment.
+            segment_start = float(getattr(result, "start_time", 0.0))
+        except Exception:
+            return meta
+        if tokens and len(tokens) == len(timestamps):
+            meta["tokens"] = tokens
+            meta["token_times"] = [self.speech_clock.capture_time(self.stream_origin_s + segment_start + t) for t in timestamps]
+        return meta
 
+    def _vad_filter(self, samples: np.ndarray, captured_at: float = None) -> np.ndarray:
+        """
+        Runs VAD over newly captured float32 samples and returns the speech
+        frames among them. `captured_at` is when the last sample was captured.
+        """
+        captured_at = time.monotonic() if captured_at is None else captured_at
         # Convert float32 to int16 for VAD
-        pcm_data = (indata * 32767).astype(np.int16).tobytes()
+        pcm_data = (samples * 32767).astype(np.int16).tobytes()
         self.vad_buffer += pcm_data
 
         # Process VAD frames
-        while len(self.vad_buffer) >= self.vad_frame_size * 2: # 2 bytes per int16 sample
-            frame = self.vad_buffer[:self.vad_frame_size * 2]
-            self.vad_buffer = self.vad_buffer[self.vad_frame_size * 2:]
+        frame_bytes = self.vad_frame_size * 2 # 2 bytes per int16 sample
+        speech_frames = []
+        while len(self.vad_buffer) >= frame_bytes:
+            frame = self.vad_buffer[:frame_bytes]
+            self.vad_buffer = self.vad_buffer[frame_bytes:]
 
-            is_speech = self.vad.is_speech(frame, self.SAMPLE_RATE)
+            if self.vad.is_speech(frame, self.SAMPLE_RATE):
+                # Sherpa-onnx expects float32, so convert back
+                speech_frames.append(np.frombuffer(frame, dtype=np.int16).astype(np.float32) / 32767.0)
+                self.speech_clock.add(self.vad_frame_size, captured_at - len(self.vad_buffer) / 2 / self.SAMPLE_RATE)
+                self.silence_samples = 0
+            else:
+                self.silence_samples += self.vad_frame_size
 
-            if is_speech:
-                # If speech is detected, append to the ASR buffer
-                async with self.buffer_lock:
-                    # Convert back to float32 for ASR if needed, or handle directly if ASR accepts int16
-                    # Sherpa-onnx expects float32, so convert back
-                    float_frame = np.frombuffer(frame, dtype=np.int16).astype(np.float32) / 32767.0
-                    self.audio_buffer = np.concatenate((self.audio_buffer, float_frame))
+        if not speech_frames:
+            return np.array([], dtype=np.float32)
+        return np.concatenate(speech_frames)
+
+    def _feed(self, samples: np.ndarray, captured_at: float = None) -> bool:
+        """
+        Buffers the speech in newly captured samples and tracks VAD state.
+        Returns True when a decode is due: a full model chunk of speech is
+        buffered, or speech just ended and the tail should be flushed.
+        """
+        self.last_captured_at = time.monotonic() if captured_at is None else captured_at
+        if self.preprocessor is not None:
+            samples = self.preprocessor.process(samples)
+            speech = self._vad_filter(samples, self.last_captured_at - self.preprocessor.pending_s)
+        else:
+            speech = self._vad_filter(samples, self.last_captured_at)
+        if speech.size > 0:
+            self.audio_buffer = np.concatenate((self.audio_buffer, speech))
+            self.in_speech = True
+            self.idle = False
+            self.status = "Transcribing"
+
+        if self.in_speech:
+            if self.silence_samples < self.speech_end_samples:
+                return self.audio_buffer.size >= self.decode_chunk_samples
+            # Speech ended. Pad the tail with a chunk of silence so the last
+            # words and the endpoint come out now rather than with the next utterance.
+            self.in_speech = False
+            self.audio_buffer = np.concatenate((self.audio_buffer, np.zeros(self.decode_chunk_samples, dtype=np.float32)))
+            self.speech_clock.add(self.decode_chunk_samples)
+            self.status = "Listening"
+            return True
+
+        if not self.idle and self.silence_samples >= self.idle_after_samples:
+            # Sustained silence: one last decode finishes the utterance, then
+            # the recognizer is left alone until speech returns.
+            self.idle = True
+            self.finish_pending = True
+            self.status = "Idle"
+            return True
+        return False
+
+    def _decode_pending(self) -> list:
+        """Decodes the buffered audio. Returns the (event_type, text, meta) results to publish."""
+        audio, self.audio_buffer = self.audio_buffer, np.array([], dtype=np.float32)
+        finish, self.finish_pending = self.finish_pending, False
+        audio, results = self._drop_backlog(audio)
+        started = time.perf_counter()
+        results.extend(self._decode_audio(audio, finish))
+        results.extend(self._take_confirmations())
+        results.extend(self._govern(audio.size, time.perf_counter() - started))
+        return results
+
+    def _drop_backlog(self, audio: np.ndarray) -> tuple:
+        """
+        Lowest quality tier: speech queued for longer than the latency target is
+        dropped, ending the utterance it cut into. Returns the audio left to
+        decode and the results of the ended utterance.
+        """
+        if self.governor is None or not self.governor.tier.drop_backlog:
+            return audio, []
+        keep = max(self.base_decode_chunk_samples, int(self.governor.backlog_limit_s() * self.SAMPLE_RATE))
+        if audio.size <= keep:
+            return audio, []
+        self.governor.dropped_s += (audio.size - keep) / self.SAMPLE_RATE
+        logger.warning(f"ASR is {audio.size / self.SAMPLE_RATE:.1f} s behind. Dropping {(audio.size - keep) / self.SAMPLE_RATE:.1f} s of speech.")
+        results = self._finish_utterance()
+        self._new_stream((self.speech_clock.total_samples - keep) / self.SAMPLE_RATE)
+        return audio[-keep:], results
+
+    def _govern(self, decoded_samples: int, decode_s: float) -> list:
+        """Reports a decode to the quality governor. Returns an asr_quality_tier result when the tier changed."""
+        if self.governor is None or decoded_samples == 0:
+            return []
+        lag_s = time.monotonic() - self.last_captured_at if self.last_captured_at is not None else 0.0
+        if not self.governor.record(decoded_samples / self.SAMPLE_RATE, decode_s, lag_s):
+            return []
+        self.decode_chunk_samples = self.base_decode_chunk_samples * self.governor.tier.chunk_scale
+        return [("asr_quality_tier", self.governor.tier.name, self.governor.stats())]
+
+    def _decode_audio(self, audio: np.ndarray, finish: bool) -> list:
+        """Decodes speech the front end buffered, then finishes the utterance if `finish`."""
+        results = self._transcribe_np(audio) if audio.size > 0 else []
+        if finish:
+            results.extend(self._finish_utterance())
+        return results
+
+    def _finish_utterance(self) -> list:
+        """Resets the recognizer, returning any accurate-mode text it still held."""
+        results = []
+        if self.recognition_mode == "accurate":
+            text = self.recognizer.get_result(self.stream).strip()
+            if text:
+                results.append(("transcription_received", text, self._result_meta()))
+        elif self.recognition_mode == "hybrid":
+            self._request_confirmation()
+        self._reset_stream()
+        return results
+
+    def _take_status_change(self):
+        """Returns the ASR status if it changed since the last call, else None."""
+        if self.status == self._reported_status:
+            return None
+        self._reported_status = self.status
+        return self.status
+
+    async def _publish_status_change(self):
+        status = self._take_status_change()
+        if status:
+            await self.event_bus.publish("asr_status_update", status)
+
+    async def _audio_callback(self, samples: np.ndarray, captured_at: float = None):
+        if self._feed(samples, captured_at):
+            self.decode_ready.set()
+        else:
+            await self._publish_status_change()
+
+    async def _decode_loop(self):
+        loop = asyncio.get_running_loop()
+
+        def wake():
+            # Called from a confirmation worker thread.
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(self.decode_ready.set)
+
+        self._wake_decoder = wake
+        while self.running:
+            await self.decode_ready.wait()
+            self.decode_ready.clear()
+            self.decode_wakeups += 1
+            for event_type, text, meta in self._decode_pending():
+                await self.event_bus.publish(event_type, text, meta=meta)
+            await self._publish_status_change()
+
+    async def stop(self):
+        """Ends process_input after the current decode, closing the microphone stream."""
+        self.running = False
+        self.decode_ready.set()
+        if self.confirmer is not None:
+            self.confirmer.close()
 
     async def process_input(self):
+        from inputs.audio_capture import open_input_stream
         logger.info("Starting microphone stream...")
-        await self.event_bus.publish("asr_status_update", "Listening")
         loop = asyncio.get_running_loop()
 
-        def sync_audio_callback(indata, frames, time, status):
-            asyncio.run_coroutine_threadsafe(self._audio_callback(indata, frames, time, status), loop)
-
-        async def process_audio_buffer_periodically():
-            while self.running:
-                await asyncio.sleep(0.05)  # Process buffer every 0.05 seconds (50ms)
-                async with self.buffer_lock:
-                    if self.audio_buffer.size > 0:
-                        await self.event_bus.publish("asr_status_update", "Transcribing")
-                        transcribed_text = self._transcribe_np(self.audio_buffer)
-                        if transcribed_text:
-                            await self.event_bus.publish("transcription_received", transcribed_text)
-                        self.audio_buffer = np.array([], dtype=np.float32)  # Clear the buffer
-                        await self.event_bus.publish("asr_status_update", "Listening")
+        def on_audio(samples):
+            for listener in self.audio_listeners:
+                listener(samples)
+            asyncio.run_coroutine_threadsafe(self._audio_callback(samples, time.monotonic()), loop)
 
-        self.audio_processing_task = asyncio.create_task(process_audio_buffer_periodically())
+        self.audio_processing_task = asyncio.create_task(self._decode_loop())
 
         try:
-            # blocksize should be a multiple of VAD frame size
-            blocksize = self.vad_frame_size * 2 # Process two VAD frames at a time, for example
-            with sd.InputStream(callback=sync_audio_callback,
-                                 channels=1, dtype='float32', samplerate=self.SAMPLE_RATE, blocksize=blocksize):
+            # Blocks of two VAD frames
+            with open_input_stream(on_audio, self.input_device, self.SAMPLE_RATE, self.vad_frame_duration_ms * 2,
+                                   self.input_channels):
                 logger.info("Microphone stream started. Say something!")
                 await self.event_bus.publish("asr_ready", True)
+                await self._publish_status_change()
                 await self.audio_processing_task
         except Exception as e:
             logger.error(f"An error occurred during audio streaming: {e}")
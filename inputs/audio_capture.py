@@ -0,0 +1,53 @@
+from loguru import logger
+
+from inputs.utils.resample import PolyphaseResampler, downmix
+
+def channel_indices(input_channels, max_channels: int) -> list:
+    """
+    Zero-based indices of the 1-based `input_channels` (None for the first
+    channel only). Averaging unused inputs of a multi-input interface would
+    attenuate the microphone by their number, so only the listed ones are mixed.
+    """
+    input_channels = input_channels or [1]
+    for channel in input_channels:
+        if not isinstance(channel, int) or not 1 <= channel <= max_channels:
+            raise ValueError(f"Input channel {channel!r} does not exist; the device has {max_channels} input channel(s).")
+    return sorted({channel - 1 for channel in input_channels})
+
+def open_input_stream(on_audio, device=None, sample_rate: int = 16000, block_ms: int = 60, input_channels=None):
+    """
+    Opens `device` (None for the default input, or a sounddevice index or name)
+    at its native sample rate instead of asking the host API to convert.
+    `input_channels` lists the 1-based device channels to record (default: the
+    first). Each captured block is downmixed over those channels and resampled
+    to mono float32 at `sample_rate` here, then passed to `on_audio` on the
+    audio thread. Returns the unstarted sounddevice InputStream, for use as a
+    context manager.
+    """
+    import sounddevice as sd
+
+    info = sd.query_devices(device, "input")
+    native_rate = int(info["default_samplerate"])
+    indices = channel_indices(input_channels, max(1, int(info["max_input_channels"])))
+    # sounddevice opens the first N channels; the unused ones below the last selected are ignored.
+    channels = indices[-1] + 1
+    resampler = PolyphaseResampler(native_rate, sample_rate) if native_rate != sample_rate else None
+    logger.info(f"Capturing channel(s) {', '.join(str(index + 1) for index in indices)} of '{info['name']}' at {native_rate} Hz"
+                f"{f', resampled to {sample_rate} Hz' if resampler else ''}.")
+
+    def device_callback(indata, frames, time, status):
+        if status:
+            logger.warning(status)
+        samples = downmix(indata[:, indices])
+        if resampler is not None:
+            samples = resampler.process(samples)
+        on_audio(samples)
+
+    return sd.InputStream(
+        device=device,
+        channels=channels,
+        samplerate=native_rate,
+        dtype="float32",
+        blocksize=int(native_rate * block_ms / 1000),
+        callback=device_callback,
+    )
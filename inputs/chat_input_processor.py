@@ -0,0 +1,122 @@
+import asyncio
+from loguru import logger
+
+from core.interfaces import InputProcessor
+from core.event_bus import EventBus
+
+RECONNECT_DELAYS_S = (1, 2, 5, 10, 30)
+
+def parse_privmsg(line: str):
+    """
+    Returns (user, channel, text) for an IRC PRIVMSG line, or None for any
+    other line. IRCv3 message tags (Twitch's "@badges=...;") are ignored.
+    """
+    if line.startswith("@"):
+        _, _, line = line.partition(" ")
+    if not line.startswith(":"):
+        return None
+    prefix, _, rest = line[1:].partition(" ")
+    command, _, rest = rest.partition(" ")
+    if command != "PRIVMSG":
+        return None
+    channel, _, text = rest.partition(" :")
+    return prefix.split("!", 1)[0], channel, text
+
+class ChatInputProcessor(InputProcessor):
+    """
+    Reads chat from an IRC-style server (e.g. Twitch chat) and publishes
+    commands as transcription_received events with meta {"source", "user"},
+    so the resolver matches them against the same keywords as speech. With a
+    `command_prefix`, only messages starting with it count and the prefix is
+    stripped; an empty prefix passes every message through.
+    """
+
+    def __init__(
+        self,
+        event_bus: EventBus,
+        host: str,
+        port: int,
+        channel: str,
+        nick: str = "justinfan12345",
+        password: str = None,
+        command_prefix: str = "!",
+        source: str = "chat",
+    ) -> None:
+        self.event_bus = event_bus
+        self.host = host
+        self.port = port
+        self.channel = channel if channel.startswith("#") else f"#{channel}"
+        self.nick = nick
+        self.password = password
+        self.command_prefix = command_prefix or ""
+        self.source = source
+        self.messages_received = 0
+        self.commands_published = 0
+        self.running = True
+        self._writer = None
+
+    async def _send(self, line: str):
+        self._writer.write(f"{line}\r\n".encode("utf-8"))
+        await self._writer.drain()
+
+    async def _session(self):
+        reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            if self.password:
+                await self._send(f"PASS {self.password}")
+            await self._send(f"NICK {self.nick}")
+            await self._send(f"USER {self.nick} 0 * :{self.nick}")
+            await self._send(f"JOIN {self.channel}")
+            logger.info(f"Chat input '{self.source}' joined {self.channel} on {self.host}:{self.port}.")
+
+            while self.running:
+                try:
+                    raw = await reader.readline()
+                except ValueError as e:
+                    # An over-long line; the reader has already discarded it.
+                    logger.warning(f"Chat input '{self.source}' skipped a line: {e}")
+                    continue
+                if not raw:
+                    raise ConnectionError("chat server closed the connection")
+                line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+                if line.startswith("PING"):
+                    await self._send("PONG" + line[4:])
+                    continue
+                try:
+                    message = parse_privmsg(line)
+                    if message:
+                        await self._handle_message(*message)
+                except Exception as e:
+                    logger.error(f"Chat input '{self.source}' failed to handle {line!r}: {e}")
+        finally:
+            self._writer.close()
+
+    async def _handle_message(self, user: str, channel: str, text: str):
+        self.messages_received += 1
+        if not text.startswith(self.command_prefix):
+            return
+        command = text[len(self.command_prefix):].strip()
+        if not command:
+            return
+        self.commands_published += 1
+        await self.event_bus.publish("transcription_received", command, meta={"source": self.source, "user": user})
+
+    async def stop(self):
+        self.running = False
+        if self._writer is not None:
+            self._writer.close()
+
+    async def process_input(self):
+        attempt = 0
+        while self.running:
+            try:
+                await self._session()
+                attempt = 0
+            except Exception as e:
+                # Anything but cancellation reconnects: a chat hiccup must not end the session.
+                if not self.running:
+                    break
+                delay = RECONNECT_DELAYS_S[min(attempt, len(RECONNECT_DELAYS_S) - 1)]
+                attempt += 1
+                logger.warning(f"Chat input '{self.source}' disconnected ({e}). Reconnecting in {delay} s.")
+                await asyncio.sleep(delay)
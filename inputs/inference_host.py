@@ -0,0 +1,261 @@
+import ipaddress
+import json
+import os
+import secrets
+import threading
+from multiprocessing.connection import AuthenticationError, Client, Listener
+from loguru import logger
+
+from core import process_stats
+from core.config_loader import ConfigLoader
+from core.event_bus import EventBus
+from inputs.asr_processor import ASRProcessor
+from inputs.isolated_asr_processor import IsolatedASRProcessor, serve_ring
+from inputs.offline_confirmer import OfflineConfirmer
+from inputs.shared_audio import SharedAudioRing
+
+DEFAULT_ADDRESS = "127.0.0.1:8767"
+# Random key shared by the host and the controllers of this install, created on first use.
+KEY_FILE = "inference_host.key"
+# Largest message either side accepts.
+MAX_MESSAGE_BYTES = 1 << 20
+# Processor arguments a controller may set for its session. Anything else is refused.
+SESSION_SETTINGS = (
+    "model_config", "model_dir", "sample_rate", "vad_frame_duration_ms", "vad_aggressiveness", "provider",
+    "decoding_method", "recognition_mode", "decode_chunk_ms", "idle_after_s", "confirm_model_config",
+    "confirm_model_dir", "preprocess", "quality_governor",
+)
+
+# Recognizers loaded by this process, shared by every session decoding with the same model.
+_models = {}
+_models_lock = threading.Lock()
+
+def parse_address(address: str) -> tuple:
+    host, _, port = address.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+def is_loopback(address: str) -> bool:
+    host, _ = parse_address(address)
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+def resolve_authkey(address: str, authkey: str = None, key_file: str = None) -> str:
+    """
+    The key to listen or connect with. Without an explicit `authkey`, the
+    install's key file is used, and created with a random key on first use.
+    A host reachable from other machines must be given a key explicitly.
+    """
+    if authkey:
+        return authkey
+    if not is_loopback(address):
+        raise ValueError(f"The inference host address {address} is not on this machine. Set an authkey explicitly to use it.")
+    key_file = key_file or os.path.join(ConfigLoader.get_base_path(), KEY_FILE)
+    try:
+        with open(key_file, "r", encoding="utf-8") as f:
+            key = f.read().strip()
+        if key:
+            return key
+    except FileNotFoundError:
+        pass
+    key = secrets.token_hex(32)
+    # Readable by this user only.
+    fd = os.open(key_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(key)
+    logger.info(f"Created the inference host key in {key_file}.")
+    return key
+
+class JSONConnection:
+    """
+    A multiprocessing connection that carries JSON instead of pickles, so
+    neither end can make the other run code. Tuples arrive as lists.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def send(self, message):
+        self.conn.send_bytes(json.dumps(message).encode("utf-8"))
+
+    def recv(self):
+        return json.loads(self.conn.recv_bytes(MAX_MESSAGE_BYTES))
+
+    def poll(self, timeout: float = 0.0) -> bool:
+        return self.conn.poll(timeout)
+
+    def close(self):
+        self.conn.close()
+
+def validate_session(session, allowed: tuple = SESSION_SETTINGS) -> dict:
+    """Checks an "open" request's session setup, returning it. Raises ValueError if it is malformed."""
+    if not isinstance(session, dict):
+        raise ValueError("Session setup must be an object.")
+    if not isinstance(session.get("ring_name"), str) or not isinstance(session.get("capacity"), int) or session["capacity"] <= 0:
+        raise ValueError("Session setup needs a ring_name and a positive capacity.")
+    kwargs = session.get("processor_kwargs")
+    if not isinstance(kwargs, dict):
+        raise ValueError("Session setup needs processor_kwargs.")
+    refused = sorted(set(kwargs) - set(allowed))
+    if refused:
+        raise ValueError(f"Session settings not accepted by the host: {', '.join(refused)}.")
+    return session
+
+def shared_model(key: tuple, load):
+    """The model loaded under `key`, loading it with `load()` on first use."""
+    with _models_lock:
+        if key not in _models:
+            logger.info(f"Loading {key[0]} model from {key[1] or 'memory'} for the first session using it.")
+            _models[key] = load()
+        return _models[key]
+
+def loaded_models() -> int:
+    return len(_models)
+
+class SharedOfflineConfirmer(OfflineConfirmer):
+    """A session's confirmation queue, decoding with the host's one copy of the offline model."""
+
+    def _create_recognizer(self):
+        key = ("offline", self.model_dir, json.dumps(self.model_config, sort_keys=True), self.provider, self.num_threads, self.SAMPLE_RATE)
+        return shared_model(key, super()._create_recognizer)
+
+class SharedModelASRProcessor(ASRProcessor):
+    """
+    ASRProcessor of one inference host session. The session owns its VAD,
+    decode scheduling and recognizer stream; the recognizer itself (the model
+    weights) is loaded once per host and shared with every other session
+    using the same model. ONNX Runtime sessions are safe to run from several
+    threads, and release the GIL while they do.
+    """
+
+    def _create_recognizer(self):
+        key = ("streaming", self.model_dir, json.dumps(self.model_config, sort_keys=True), self.provider, self.decoding_method, self.SAMPLE_RATE)
+        return shared_model(key, super()._create_recognizer)
+
+    def _create_confirmer(self):
+        if not self.confirm_model_config:
+            return super()._create_confirmer()
+        return SharedOfflineConfirmer(self.confirm_model_config, self.confirm_model_dir, sample_rate=self.SAMPLE_RATE, provider=self.provider)
+
+class InferenceHost:
+    """
+    Local ASR server for several controllers on one machine, e.g. one per
+    talent on a streaming PC. Each controller connects as a session: it writes
+    its microphone audio to a shared-memory ring and receives transcription and
+    status events back over the connection, as with process isolation. Every
+    session decodes on a thread of its own, and sessions using the same model
+    share one loaded copy of it.
+    """
+
+    def __init__(self, address: str = DEFAULT_ADDRESS, authkey: str = None,
+                 processor_class=SharedModelASRProcessor, poll_interval_s: float = 0.06,
+                 session_settings: tuple = SESSION_SETTINGS):
+        self.address = address
+        self.authkey = resolve_authkey(address, authkey).encode("utf-8")
+        self.processor_class = processor_class
+        self.session_settings = session_settings
+        self.poll_interval_s = poll_interval_s
+        self.sessions = 0
+        self.sessions_served = 0
+        self._lock = threading.Lock()
+
+    def serve_forever(self):
+        with Listener(parse_address(self.address), authkey=self.authkey) as listener:
+            logger.info(f"Inference host listening on {self.address}.")
+            while True:
+                try:
+                    conn = listener.accept()
+                except (AuthenticationError, EOFError, ConnectionError) as e:
+                    logger.warning(f"Rejected a connection: {e}")
+                    continue
+                threading.Thread(target=self._serve_client, args=(JSONConnection(conn),), name="inference-session", daemon=True).start()
+
+    def _serve_client(self, conn: JSONConnection):
+        try:
+            request, payload = conn.recv()
+            if request == "stats":
+                conn.send(self.stats())
+            elif request == "open":
+                try:
+                    session = validate_session(payload, self.session_settings)
+                except ValueError as e:
+                    logger.warning(f"Refused a session: {e}")
+                    conn.send(("asr_error", str(e), None))
+                    return
+                self._serve_session(conn, session)
+        except (EOFError, OSError):
+            pass  # The controller went away.
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Dropped a malformed request: {e}")
+        finally:
+            conn.close()
+
+    def _serve_session(self, conn, session: dict):
+        ring = SharedAudioRing.attach(session["ring_name"], session["capacity"], unrelated=True)
+        try:
+            try:
+                processor = self.processor_class(event_bus=None, **session["processor_kwargs"])
+            except Exception as e:
+                conn.send(("asr_error", f"{type(e).__name__}: {e}", None))
+                return
+            with self._lock:
+                self.sessions += 1
+                self.sessions_served += 1
+            logger.info(f"Session opened ({self.sessions} active, {loaded_models()} model(s) loaded).")
+            try:
+                serve_ring(processor, ring, conn, self.poll_interval_s)
+            finally:
+                if processor.confirmer is not None:
+                    processor.confirmer.close()
+                with self._lock:
+                    self.sessions -= 1
+                logger.info(f"Session closed ({self.sessions} active).")
+        finally:
+            ring.close()
+
+    def stats(self) -> dict:
+        return {
+            "sessions": self.sessions,
+            "sessions_served": self.sessions_served,
+            "models": loaded_models(),
+            "rss_bytes": process_stats.current_rss_bytes(),
+        }
+
+def run_inference_host(address: str = DEFAULT_ADDRESS, authkey: str = None, processor_class=SharedModelASRProcessor,
+                       session_settings: tuple = SESSION_SETTINGS):
+    """Process entry point, e.g. for multiprocessing or vts_inference_host.py."""
+    InferenceHost(address, authkey, processor_class, session_settings=session_settings).serve_forever()
+
+def host_stats(address: str = DEFAULT_ADDRESS, authkey: str = None) -> dict:
+    conn = JSONConnection(Client(parse_address(address), authkey=resolve_authkey(address, authkey).encode("utf-8")))
+    try:
+        conn.send(("stats", None))
+        return conn.recv()
+    finally:
+        conn.close()
+
+class HostedASRProcessor(IsolatedASRProcessor):
+    """
+    Decodes through a running InferenceHost instead of a worker process of
+    its own. Capture and event forwarding are the same as with process
+    isolation; only the worker is replaced by a session on the host.
+    """
+
+    def __init__(self, event_bus: EventBus, model_config: dict, model_dir: str,
+                 host_address: str = DEFAULT_ADDRESS, host_authkey: str = None, **kwargs) -> None:
+        super().__init__(event_bus, model_config, model_dir, **kwargs)
+        self.host_address = host_address
+        self.host_authkey = host_authkey
+
+    def _start_worker(self):
+        try:
+            authkey = resolve_authkey(self.host_address, self.host_authkey)
+            self._conn = JSONConnection(Client(parse_address(self.host_address), authkey=authkey.encode("utf-8")))
+        except ConnectionRefusedError:
+            raise RuntimeError(f"No inference host is listening on {self.host_address}. Start it with vts_inference_host.py.")
+        self.ring = SharedAudioRing.create(self.ring_capacity)
+        self._conn.send(("open", {"ring_name": self.ring.name, "capacity": self.ring_capacity, "processor_kwargs": self.processor_kwargs}))
+        logger.info(f"Opened a session on the inference host at {self.host_address}.")
@@ -0,0 +1,177 @@
+import asyncio
+import multiprocessing
+from loguru import logger
+
+from core.interfaces import InputProcessor
+from core.event_bus import EventBus
+from inputs.shared_audio import SharedAudioRing
+
+# Events the worker may send back. Anything else on the pipe is ignored.
+FORWARDED_EVENTS = ("asr_status_update", "asr_ready", "asr_quality_tier", "transcription_received", "transcription_partial")
+
+def serve_ring(processor, ring: SharedAudioRing, conn, poll_interval_s: float = 0.06):
+    """
+    Decodes the audio `ring` receives with `processor`, sending results and
+    status changes over `conn`, until a message arrives on `conn`.
+    """
+    # Audio captured while the model loaded is stale by now.
+    ring.skip_to_latest()
+    conn.send(("asr_ready", True, None))
+
+    # Waiting on the pipe paces reads to the capture block size; decoding
+    # itself only happens when the processor says a decode is due.
+    while not conn.poll(poll_interval_s):
+        samples = ring.read()
+        if samples.size > 0 and processor._feed(samples, ring.last_write_time):
+            results = processor._decode_pending()
+        else:
+            # Hybrid mode: offline confirmations finish in the background.
+            results = processor._take_confirmations()
+        for result in results:
+            conn.send(result)
+        status = processor._take_status_change()
+        if status:
+            conn.send(("asr_status_update", status, None))
+    if ring.dropped_samples:
+        logger.warning(f"ASR worker fell behind and dropped {ring.dropped_samples} samples.")
+
+def run_asr_worker(ring_name: str, capacity: int, conn, processor_class, processor_kwargs: dict, poll_interval_s: float = 0.06):
+    """
+    Entry point of the ASR child process. Reads audio from the shared ring,
+    runs VAD and decoding with `processor_class`, and sends compact
+    (event_type, payload, meta) tuples back over `conn`. Any message from the parent
+    stops it.
+    """
+    ring = SharedAudioRing.attach(ring_name, capacity)
+    try:
+        try:
+            processor = processor_class(event_bus=None, **processor_kwargs)
+        except Exception as e:
+            conn.send(("asr_error", f"{type(e).__name__}: {e}", None))
+            return
+        serve_ring(processor, ring, conn, poll_interval_s)
+    except (EOFError, BrokenPipeError):
+        pass  # The parent went away.
+    finally:
+        ring.close()
+        conn.close()
+
+class IsolatedASRProcessor(InputProcessor):
+    """
+    Runs VAD and decoding in a child process so they never compete with the UI,
+    the resolver and the VTS websocket for this process's GIL. The device
+    callback copies audio straight into a shared-memory ring; only transcription
+    and status events come back, over a pipe, and are republished on the bus.
+    """
+
+    def __init__(
+        self,
+        event_bus: EventBus,
+        model_config: dict,
+        model_dir: str,
+        sample_rate: int = 16000,
+        vad_frame_duration_ms: int = 30,
+        ring_seconds: float = 10.0,
+        input_device=None,
+        input_channels: list = None,
+        processor_class=None,
+        **processor_kwargs,
+    ) -> None:
+        self.event_bus = event_bus
+        self.SAMPLE_RATE = sample_rate
+        self.vad_frame_duration_ms = vad_frame_duration_ms
+        self.input_device = input_device
+        self.input_channels = input_channels
+        self.audio_listeners = []
+        self.ring_capacity = int(sample_rate * ring_seconds)
+        if processor_class is None:
+            from inputs.asr_processor import ASRProcessor
+            processor_class = ASRProcessor
+        self.processor_class = processor_class
+        self.processor_kwargs = dict(
+            model_config=model_config,
+            model_dir=model_dir,
+            sample_rate=sample_rate,
+            vad_frame_duration_ms=vad_frame_duration_ms,
+            **processor_kwargs,
+        )
+        self.ring = None
+        self.process = None
+        self._conn = None
+
+    def write_audio(self, samples):
+        """Queues captured samples for the worker. Safe to call from the audio thread."""
+        self.ring.write(samples)
+        for listener in self.audio_listeners:
+            listener(samples)
+
+    def _start_worker(self):
+        # spawn everywhere: forking a process that already runs Qt and an event loop is unsafe.
+        context = multiprocessing.get_context("spawn")
+        self.ring = SharedAudioRing.create(self.ring_capacity)
+        self._conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=run_asr_worker,
+            args=(self.ring.name, self.ring_capacity, child_conn, self.processor_class, self.processor_kwargs),
+            name="asr-worker",
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        logger.info(f"Started ASR worker process (pid {self.process.pid}).")
+
+    async def _forward_events(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                event_type, payload, meta = await loop.run_in_executor(None, self._conn.recv)
+            except (EOFError, OSError):
+                logger.info("ASR worker process exited.")
+                return
+            if event_type == "asr_error":
+                raise RuntimeError(f"ASR worker failed to start: {payload}")
+            if event_type in FORWARDED_EVENTS:
+                await self.event_bus.publish(event_type, payload, meta=meta)
+
+    async def _shutdown_worker(self):
+        await self.stop()
+        if self.process is not None:
+            await asyncio.to_thread(self.process.join, 2.0)
+            if self.process.is_alive():
+                logger.warning("ASR worker did not stop in time. Terminating it.")
+                self.process.terminate()
+                await asyncio.to_thread(self.process.join, 2.0)
+            self.process = None
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        if self.ring is not None:
+            self.ring.close()
+            self.ring.unlink()
+            self.ring = None
+
+    async def stop(self):
+        """Asks the worker to exit; process_input returns once it has."""
+        if self._conn is not None:
+            try:
+                self._conn.send(("stop", None, None))
+            except (BrokenPipeError, OSError):
+                pass
+
+    async def process_input(self):
+        from inputs.audio_capture import open_input_stream
+        logger.info("Starting microphone stream for the isolated ASR worker...")
+        await self.event_bus.publish("asr_status_update", "Loading model...")
+        self._start_worker()
+
+        try:
+            with open_input_stream(self.write_audio, self.input_device, self.SAMPLE_RATE, self.vad_frame_duration_ms * 2,
+                                   self.input_channels):
+                logger.info("Microphone stream started. Audio is decoded in the worker process.")
+                await self._forward_events()
+        except Exception as e:
+            logger.error(f"An error occurred during audio streaming: {e}")
+            await self.event_bus.publish("asr_status_update", "Error")
+            raise
+        finally:
+            await self._shutdown_worker()
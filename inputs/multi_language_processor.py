@@ -0,0 +1,130 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from loguru import logger
+
+from core import process_stats
+from core.event_bus import EventBus
+from inputs.asr_processor import ASRProcessor
+
+DEFAULT_CPU_BUDGET = 0.5
+# How often the CPU budget is checked, in seconds of decoding.
+CPU_WINDOW_S = 5.0
+
+class MultiLanguageASRProcessor(ASRProcessor):
+    """
+    Recognizes several languages at once. This processor captures audio, runs
+    VAD and decodes the primary language itself; each extra language gets a
+    recognizer of its own that decodes the same speech. The recognizers run side
+    by side on a thread pool (ONNX Runtime releases the GIL while it computes),
+    and every result carries meta["language"] so the resolver can keep the
+    languages' utterances apart and drop a trigger another language already fired.
+
+    While this process uses more than `cpu_budget` of the machine's CPU, only
+    the primary language is decoded. The extra languages come back once the
+    machine could afford them again.
+    """
+
+    def __init__(
+        self,
+        event_bus: EventBus,
+        model_config: dict,
+        model_dir: str,
+        language: str = "en",
+        extra_models: dict = None,
+        cpu_budget: float = DEFAULT_CPU_BUDGET,
+        **kwargs,
+    ) -> None:
+        super().__init__(event_bus, model_config, model_dir, **kwargs)
+        self.language = language
+        self.cpu_budget = cpu_budget
+        self.decoders = {language: self}
+        # The primary decoder confirms utterances and governs quality for all languages.
+        shared_kwargs = {key: value for key, value in kwargs.items() if not key.startswith("confirm_") and key != "quality_governor"}
+        for extra_language, models in (extra_models or {}).items():
+            decoder = self._create_decoder(models, shared_kwargs)
+            # The same speech reaches every recognizer, so they share one clock.
+            decoder.speech_clock = self.speech_clock
+            self.decoders[extra_language] = decoder
+        self.active_languages = list(self.decoders)
+        self.executor = ThreadPoolExecutor(max_workers=len(self.decoders), thread_name_prefix="asr-language")
+        self._cpu_window = (time.monotonic(), process_stats.cpu_seconds())
+        logger.info(f"Recognizing {', '.join(self.decoders)} in parallel (CPU budget {cpu_budget:.0%}).")
+
+    def _create_decoder(self, models: dict, kwargs: dict) -> ASRProcessor:
+        return ASRProcessor(self.event_bus, **models, **kwargs)
+
+    def _decode_pending(self) -> list:
+        audio, self.audio_buffer = self.audio_buffer, np.array([], dtype=np.float32)
+        finish, self.finish_pending = self.finish_pending, False
+        self._apply_cpu_budget(audio.size)
+        audio, dropped_results = self._drop_backlog(audio)
+        started = time.perf_counter()
+
+        for language in self.active_languages[1:]:
+            self.decoders[language].last_captured_at = self.last_captured_at
+        # The primary language decodes on this thread, the others next to it.
+        futures = {language: self.executor.submit(self.decoders[language]._decode_audio, audio, finish)
+                   for language in self.active_languages[1:]}
+        results = dropped_results + self._tag(self.language, ASRProcessor._decode_audio(self, audio, finish))
+        for language, future in futures.items():
+            try:
+                results.extend(self._tag(language, future.result()))
+            except Exception as e:
+                logger.error(f"Decoding {language} failed: {e}")
+        results.extend(self._take_confirmations())
+        results.extend(self._govern(audio.size, time.perf_counter() - started))
+        return results
+
+    def _drop_backlog(self, audio: np.ndarray) -> tuple:
+        kept, results = ASRProcessor._drop_backlog(self, audio)
+        if kept.size == audio.size:
+            return audio, []
+        results = self._tag(self.language, results)
+        for language in self.active_languages[1:]:
+            decoder = self.decoders[language]
+            results.extend(self._tag(language, decoder._finish_utterance()))
+            decoder._new_stream(self.stream_origin_s)
+        return kept, results
+
+    def _take_confirmations(self) -> list:
+        results = []
+        for language, decoder in self.decoders.items():
+            results.extend(self._tag(language, ASRProcessor._take_confirmations(decoder)))
+        return results
+
+    @staticmethod
+    def _tag(language: str, results: list) -> list:
+        return [(event_type, text, {**meta, "language": language}) for event_type, text, meta in results]
+
+    def _apply_cpu_budget(self, pending_samples: int):
+        """Drops to the primary language while over the CPU budget, and restores the others once they would fit again."""
+        started_at, started_cpu = self._cpu_window
+        now = time.monotonic()
+        if len(self.decoders) == 1 or now - started_at < CPU_WINDOW_S:
+            return
+        cpu = process_stats.cpu_seconds()
+        self._cpu_window = (now, cpu)
+        share = (cpu - started_cpu) / (now - started_at) / (os.cpu_count() or 1)
+
+        if len(self.active_languages) > 1 and share > self.cpu_budget:
+            logger.warning(f"ASR is using {share:.0%} of the CPU (budget {self.cpu_budget:.0%}). Recognizing {self.language} only.")
+            self.active_languages = [self.language]
+        elif len(self.active_languages) == 1 and share * len(self.decoders) < self.cpu_budget:
+            logger.info(f"CPU use is back to {share:.0%}. Recognizing {', '.join(self.decoders)} again.")
+            # Skipped recognizers missed audio, so they start a fresh stream at the audio about to be decoded.
+            origin_s = (self.speech_clock.total_samples - pending_samples) / self.SAMPLE_RATE
+            for decoder in list(self.decoders.values())[1:]:
+                decoder._reset_stream()
+                decoder._new_stream(origin_s)
+            self.active_languages = list(self.decoders)
+
+    async def stop(self):
+        await super().stop()
+        for decoder in list(self.decoders.values())[1:]:
+            await decoder.stop()
+        self.executor.shutdown(wait=False)
+
+    def stats(self) -> dict:
+        return {"languages": list(self.decoders), "active_languages": list(self.active_languages), "cpu_budget": self.cpu_budget}
@@ -0,0 +1,87 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from loguru import logger
+
+class OfflineConfirmer:
+    """
+    Second pass of hybrid recognition. Endpointed utterances are re-decoded
+    with a non-streaming sherpa-onnx model, which sees the whole segment at
+    once and is markedly more accurate than the streaming partials. Decoding
+    runs on a small thread pool (sherpa-onnx releases the GIL while it decodes)
+    and at most `max_pending` segments are queued, so the extra CPU stays bounded.
+    """
+
+    def __init__(
+        self,
+        model_config: dict,
+        model_dir: str,
+        sample_rate: int = 16000,
+        provider: str = "cpu",
+        num_threads: int = 1,
+        max_workers: int = 1,
+        max_pending: int = 2,
+    ) -> None:
+        self.model_config = model_config
+        self.model_dir = model_dir
+        self.SAMPLE_RATE = sample_rate
+        self.provider = provider
+        self.num_threads = num_threads
+        self.max_pending = max_pending
+        self.recognizer = self._create_recognizer()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="asr-confirm")
+        self.in_flight = []
+        self.skipped = 0
+
+    def _create_recognizer(self):
+        import sherpa_onnx
+        model_type = self.model_config.get("model_type", "transducer")
+        params = self.model_config["params"]
+        logger.info(f"Creating offline confirmation recognizer of type '{model_type}'")
+
+        if model_type == "transducer":
+            return sherpa_onnx.OfflineRecognizer.from_transducer(
+                tokens=os.path.join(self.model_dir, params["tokens"]),
+                encoder=os.path.join(self.model_dir, params["encoder"]),
+                decoder=os.path.join(self.model_dir, params["decoder"]),
+                joiner=os.path.join(self.model_dir, params["joiner"]),
+                num_threads=self.num_threads,
+                sample_rate=self.SAMPLE_RATE,
+                feature_dim=80,
+                provider=self.provider,
+            )
+        elif model_type == "sense-voice":
+            return sherpa_onnx.OfflineRecognizer.from_sense_voice(
+                model=os.path.join(self.model_dir, params["model"]),
+                tokens=os.path.join(self.model_dir, params["tokens"]),
+                num_threads=self.num_threads,
+                sample_rate=self.SAMPLE_RATE,
+                provider=self.provider,
+                language=params.get("language", ""),
+            )
+        else:
+            raise ValueError(f"Unsupported confirmation model_type: {model_type}")
+
+    def submit(self, audio: np.ndarray):
+        """
+        Queues `audio` (one utterance, float32 at sample_rate) for decoding and
+        returns a concurrent.futures.Future of its text, or None if the pool is
+        saturated and the utterance goes unconfirmed.
+        """
+        self.in_flight = [future for future in self.in_flight if not future.done()]
+        if len(self.in_flight) >= self.max_pending:
+            self.skipped += 1
+            logger.warning(f"Offline confirmation is falling behind; {self.skipped} utterance(s) left unconfirmed.")
+            return None
+        future = self.executor.submit(self._decode, audio)
+        self.in_flight.append(future)
+        return future
+
+    def _decode(self, audio: np.ndarray) -> str:
+        stream = self.recognizer.create_stream()
+        stream.accept_waveform(self.SAMPLE_RATE, audio)
+        self.recognizer.decode_stream(stream)
+        return stream.result.text.strip()
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,122 @@
+import time
+from dataclasses import dataclass
+from loguru import logger
+
+DEFAULT_TARGET_LATENCY_S = 1.0
+# Load is judged over windows of this many seconds of wall time.
+DEFAULT_WINDOW_S = 2.0
+# A tier is kept at least this long before stepping back up, so a game's
+# load spikes don't make the quality flap.
+DEFAULT_HOLD_S = 10.0
+# Real-time factors (decode time / audio time) that step down and up.
+STEP_DOWN_RTF = 0.8
+STEP_UP_RTF = 0.4
+
+@dataclass(frozen=True)
+class QualityTier:
+    name: str
+    confirm: bool = True       # Hybrid mode: re-decode finished utterances offline
+    chunk_scale: int = 1       # Multiple of the model's decode chunk fed per decode
+    drop_backlog: bool = False # Drop speech queued beyond the latency target
+
+# Best first. Each tier gives up more accuracy or latency for less CPU.
+TIERS = (
+    QualityTier("full"),
+    QualityTier("no_confirm", confirm=False),
+    QualityTier("large_chunk", confirm=False, chunk_scale=2),
+    QualityTier("drop_backlog", confirm=False, chunk_scale=2, drop_backlog=True),
+)
+TIER_NAMES = tuple(tier.name for tier in TIERS)
+
+class QualityGovernor:
+    """
+    Keeps recognition latency under `target_latency_s` when decoding competes
+    for the CPU, by trading quality for speed at runtime.
+
+    The processor reports every decode: how much audio it covered, how long it
+    took and how stale the newest decoded audio was by the time it finished.
+    Once per window the governor steps one tier down if the decodes ran slower
+    than STEP_DOWN_RTF of real time or lagged past the target, and one tier
+    back up after `hold_s` of windows under STEP_UP_RTF and half the target.
+    A decode lagging past the target ends the window early, so a sudden spike
+    is answered within half a window. Windows without speech say nothing about
+    the load and keep the tier.
+    """
+
+    def __init__(
+        self,
+        target_latency_s: float = DEFAULT_TARGET_LATENCY_S,
+        window_s: float = DEFAULT_WINDOW_S,
+        hold_s: float = DEFAULT_HOLD_S,
+        lowest_tier: str = TIER_NAMES[-1],
+    ) -> None:
+        if lowest_tier not in TIER_NAMES:
+            raise ValueError(f"Unknown quality tier '{lowest_tier}'. Expected one of {', '.join(TIER_NAMES)}.")
+        self.target_latency_s = target_latency_s
+        self.window_s = window_s
+        self.hold_s = hold_s
+        self.lowest = TIER_NAMES.index(lowest_tier)
+        self.index = 0
+        self.changed_at = time.monotonic()
+        self.changes = 0
+        self.dropped_s = 0.0
+        self.last_rtf = None
+        self.last_lag_s = None
+        self._start_window(self.changed_at)
+
+    @property
+    def tier(self) -> QualityTier:
+        return TIERS[self.index]
+
+    def _start_window(self, now: float):
+        self._window_started = now
+        self._audio_s = 0.0
+        self._decode_s = 0.0
+        self._max_lag_s = 0.0
+
+    def record(self, audio_s: float, decode_s: float, lag_s: float, now: float = None) -> bool:
+        """Accounts for one decode. Returns True if the tier changed."""
+        now = time.monotonic() if now is None else now
+        self._audio_s += audio_s
+        self._decode_s += decode_s
+        self._max_lag_s = max(self._max_lag_s, lag_s)
+        overdue = lag_s > self.target_latency_s and now - self.changed_at >= self.window_s / 2
+        if now - self._window_started < self.window_s and not overdue:
+            return False
+        if self._audio_s <= 0:
+            self._start_window(now)
+            return False
+        rtf = self._decode_s / self._audio_s
+        lag_s = self._max_lag_s
+        self.last_rtf, self.last_lag_s = rtf, lag_s
+        self._start_window(now)
+
+        if (rtf > STEP_DOWN_RTF or lag_s > self.target_latency_s) and self.index < self.lowest:
+            self._set(self.index + 1, now)
+            logger.warning(f"ASR is falling behind (RTF {rtf:.2f}, lag {lag_s * 1000:.0f} ms). Stepping down to quality tier '{self.tier.name}'.")
+            return True
+        if (rtf < STEP_UP_RTF and lag_s < self.target_latency_s / 2 and self.index > 0
+                and now - self.changed_at >= self.hold_s):
+            self._set(self.index - 1, now)
+            logger.info(f"ASR has headroom again (RTF {rtf:.2f}, lag {lag_s * 1000:.0f} ms). Stepping up to quality tier '{self.tier.name}'.")
+            return True
+        return False
+
+    def backlog_limit_s(self) -> float:
+        """Most queued speech worth decoding: more would finish past the target at the last real-time factor."""
+        return self.target_latency_s / max(1.0, self.last_rtf or 1.0)
+
+    def _set(self, index: int, now: float):
+        self.index = index
+        self.changed_at = now
+        self.changes += 1
+
+    def stats(self) -> dict:
+        return {
+            "tier": self.tier.name,
+            "tier_index": self.index,
+            "changes": self.changes,
+            "rtf": round(self.last_rtf, 3) if self.last_rtf is not None else None,
+            "lag_ms": round(self.last_lag_s * 1000) if self.last_lag_s is not None else None,
+            "dropped_s": round(self.dropped_s, 2),
+        }
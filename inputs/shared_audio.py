@@ -0,0 +1,111 @@
+import os
+from multiprocessing import resource_tracker, shared_memory
+import time
+import numpy as np
+
+# The header holds the monotonically increasing write position and the
+# time.monotonic() of the last write. It gets a whole cache line so writes to it
+# never share a line with the sample data.
+HEADER_BYTES = 64
+
+class SharedAudioRing:
+    """
+    Single-producer, single-consumer ring of float32 samples in shared memory.
+
+    The producer (the audio device callback) copies samples in and then
+    publishes the new write position; the consumer (the ASR worker process)
+    keeps its own read position. Neither side locks. A consumer that falls more
+    than `capacity` samples behind skips ahead and counts what it lost in
+    `dropped_samples`.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, capacity: int):
+        self.shm = shm
+        self.capacity = capacity
+        self._write_pos = np.ndarray((1,), dtype=np.int64, buffer=shm.buf, offset=0)
+        self._write_time = np.ndarray((1,), dtype=np.float64, buffer=shm.buf, offset=8)
+        self._data = np.ndarray((capacity,), dtype=np.float32, buffer=shm.buf, offset=HEADER_BYTES)
+        self.read_pos = 0
+        self.dropped_samples = 0
+
+    @classmethod
+    def create(cls, capacity: int) -> "SharedAudioRing":
+        shm = shared_memory.SharedMemory(create=True, size=HEADER_BYTES + capacity * 4)
+        shm.buf[:HEADER_BYTES] = bytes(HEADER_BYTES)
+        return cls(shm, capacity)
+
+    @classmethod
+    def attach(cls, name: str, capacity: int, unrelated: bool = False) -> "SharedAudioRing":
+        """
+        Maps a ring created by another process. `unrelated`: that process did
+        not start this one (e.g. a controller feeding the inference host).
+        """
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Before Python 3.13. Processes started by multiprocessing share the
+            # creator's resource tracker, so attaching there doesn't add an owner.
+            # An unrelated process has a tracker of its own, which would unlink
+            # the ring when this process exits.
+            shm = shared_memory.SharedMemory(name=name)
+            if unrelated and os.name == "posix":
+                resource_tracker.unregister(shm._name, "shared_memory")
+        return cls(shm, capacity)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @property
+    def last_write_time(self) -> float:
+        """time.monotonic() at which the newest samples were written."""
+        return float(self._write_time[0])
+
+    def write(self, samples: np.ndarray, captured_at: float = None):
+        samples = np.asarray(samples, dtype=np.float32).reshape(-1)
+        count = samples.size
+        if count > self.capacity:
+            samples = samples[-self.capacity:]
+        kept = samples.size
+        position = int(self._write_pos[0])
+        start = (position + count - kept) % self.capacity
+        first = min(kept, self.capacity - start)
+        self._data[start:start + first] = samples[:first]
+        self._data[:kept - first] = samples[first:]
+        self._write_time[0] = time.monotonic() if captured_at is None else captured_at
+        # Published only after the samples are in place.
+        self._write_pos[0] = position + count
+
+    def skip_to_latest(self):
+        """Discards everything written so far."""
+        self.read_pos = int(self._write_pos[0])
+
+    def read(self, max_samples: int = None) -> np.ndarray:
+        available = int(self._write_pos[0]) - self.read_pos
+        if available > self.capacity:
+            self.dropped_samples += available - self.capacity
+            self.read_pos += available - self.capacity
+            available = self.capacity
+        if max_samples is not None:
+            available = min(available, max_samples)
+        if available <= 0:
+            return np.array([], dtype=np.float32)
+
+        start = self.read_pos % self.capacity
+        end = start + available
+        if end <= self.capacity:
+            samples = self._data[start:end].copy()
+        else:
+            samples = np.concatenate((self._data[start:], self._data[:end - self.capacity]))
+        self.read_pos += available
+        return samples
+
+    def close(self):
+        # The numpy views must go before the mapping can be closed.
+        self._write_pos = None
+        self._write_time = None
+        self._data = None
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
@@ -0,0 +1,131 @@
+import numpy as np
+
+EPS = 1e-10
+# The noise floor follows a quieter noise within this many seconds.
+NOISE_FALL_S = 0.05
+SPEECH_OVER_NOISE = 4.0
+# Share of a block's energy the noise gate must keep for the block to count as speech for AGC.
+SPEECH_ENERGY_KEPT = 0.25
+
+class SpeechPreprocessor:
+    """
+    Streaming clean-up of captured audio ahead of VAD and decoding: a high-pass
+    filter, spectral-gating noise suppression and automatic gain control.
+
+    `process` accepts blocks of any size. Each block is cut into 50%-overlapping
+    square-root-Hann frames that go through one batched real FFT; the filters
+    are per-bin gains on those spectra, and the frames are overlap-added back.
+    With every stage off the output is the input, `delay_s` late.
+
+    - High-pass: bins below `highpass_hz` are removed (desk rumble, mains hum).
+    - Noise suppression: a per-bin noise floor follows the level of each block,
+      falling quickly and rising over `noise_rise_s`, so steady game audio or
+      fan noise becomes floor while speech, which comes and goes, stays above
+      it. Bins within `threshold` times the floor are attenuated, down to `floor_gain`.
+    - AGC: the level of cleaned speech is brought towards `target_rms`, within
+      `max_gain`. Blocks quieter than `gate_rms`, or mostly removed by the
+      noise gate, leave the gain alone, so noise is not pumped up between words.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        frame_ms: int = 32,
+        highpass_hz: float = 100.0,
+        noise_suppression: bool = True,
+        threshold: float = 3.0,
+        floor_gain: float = 0.1,
+        noise_rise_s: float = 2.0,
+        agc: bool = True,
+        target_rms: float = 0.1,
+        max_gain: float = 10.0,
+        gate_rms: float = 0.003,
+    ) -> None:
+        self.sample_rate = sample_rate
+        self.hop = int(sample_rate * frame_ms / 1000) // 2
+        self.frame = 2 * self.hop
+        # sqrt-Hann analysis and synthesis windows multiply to a periodic Hann,
+        # whose 50%-overlapped copies sum to exactly one.
+        self.window = np.sqrt(np.hanning(self.frame + 1)[:-1]).astype(np.float32)
+        frequencies = np.fft.rfftfreq(self.frame, 1 / sample_rate)
+        self.bin_gain = (frequencies >= highpass_hz).astype(np.float32) if highpass_hz else np.ones(frequencies.size, dtype=np.float32)
+        self.noise_suppression = noise_suppression
+        self.threshold = threshold
+        self.floor_gain = floor_gain
+        self.noise_rise_s = noise_rise_s
+        self.agc = agc
+        self.target_rms = target_rms
+        self.max_gain = max_gain
+        self.gate_rms = gate_rms
+
+        self.noise = None  # Per-bin magnitude floor
+        self.gain = 1.0
+        self._input = np.zeros(self.hop, dtype=np.float32)
+        self._overlap = np.zeros(self.hop, dtype=np.float32)
+
+    @property
+    def delay_s(self) -> float:
+        return self.hop / self.sample_rate
+
+    @property
+    def pending_s(self) -> float:
+        """How far the last output sample lags the last input sample."""
+        return self._input.size / self.sample_rate
+
+    def _smoothing(self, block_s: float, time_constant_s: float) -> float:
+        return float(np.exp(-block_s / time_constant_s))
+
+    def _gate(self, magnitudes: np.ndarray, block_s: float) -> np.ndarray:
+        """Per-frame, per-bin gains of spectral gating, updating the noise floor from this block."""
+        level = magnitudes.mean(axis=0)
+        if self.noise is None:
+            self.noise = level
+        else:
+            # Bins far above the floor are most likely speech: the floor still
+            # rises under them, in case the noise got louder, but ten times slower.
+            rise = np.where(level > SPEECH_OVER_NOISE * self.noise,
+                            self._smoothing(block_s, 10 * self.noise_rise_s), self._smoothing(block_s, self.noise_rise_s))
+            smoothing = np.where(level > self.noise, rise, self._smoothing(block_s, NOISE_FALL_S))
+            self.noise = smoothing * self.noise + (1 - smoothing) * level
+        return np.clip(1.0 - self.threshold * self.noise / (magnitudes + EPS), self.floor_gain, 1.0)
+
+    def _update_gain(self, rms: float, block_s: float):
+        if rms < self.gate_rms:
+            return
+        wanted = min(self.max_gain, self.target_rms / rms)
+        # Back off fast on loud speech, come up slowly on quiet speech.
+        smoothing = self._smoothing(block_s, 0.05 if wanted < self.gain else 1.0)
+        self.gain = smoothing * self.gain + (1 - smoothing) * wanted
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        data = np.concatenate((self._input, np.asarray(samples, dtype=np.float32).reshape(-1)))
+        count = (data.size - self.hop) // self.hop
+        if count <= 0:
+            self._input = data
+            return np.array([], dtype=np.float32)
+        self._input = data[count * self.hop:]
+
+        frames = np.lib.stride_tricks.sliding_window_view(data, self.frame)[::self.hop][:count] * self.window
+        spectra = np.fft.rfft(frames, axis=1)
+        block_s = count * self.hop / self.sample_rate
+        gains = np.broadcast_to(self.bin_gain, spectra.shape)
+        if self.noise_suppression:
+            magnitudes = np.abs(spectra)
+            gains = gains * self._gate(magnitudes, block_s)
+            if self.agc:
+                kept = float(np.sum((magnitudes * gains) ** 2) / (np.sum(magnitudes ** 2) + EPS))
+        spectra *= gains
+        # Only speech sets the gain: blocks the gate mostly removed are noise.
+        if self.agc and (not self.noise_suppression or kept >= SPEECH_ENERGY_KEPT):
+            # Parseval: mean square of the windowed frames from their spectra (the window's mean square is 0.5).
+            power = (2 * np.sum(np.abs(spectra[:, 1:-1]) ** 2, axis=1) + np.abs(spectra[:, 0]) ** 2 + np.abs(spectra[:, -1]) ** 2) / self.frame ** 2
+            self._update_gain(float(np.sqrt(2 * power.mean())), block_s)
+        if self.agc:
+            spectra *= self.gain
+        frames = np.fft.irfft(spectra, n=self.frame, axis=1).astype(np.float32) * self.window
+
+        # Overlap-add: each hop of output is this frame's first half plus the previous frame's second half.
+        previous_halves = np.concatenate((self._overlap[np.newaxis], frames[:-1, self.hop:]))
+        self._overlap = frames[-1, self.hop:].copy()
+        output = (frames[:, :self.hop] + previous_halves).reshape(-1)
+        return np.clip(output, -1.0, 1.0) if self.agc else output
@@ -0,0 +1,67 @@
+from math import ceil, gcd
+import numpy as np
+
+def downmix(block: np.ndarray) -> np.ndarray:
+    """Averages a (frames, channels) block to mono float32."""
+    block = np.asarray(block, dtype=np.float32)
+    if block.ndim == 1:
+        return block
+    if block.shape[1] == 1:
+        return block[:, 0]
+    return block.mean(axis=1, dtype=np.float32)
+
+def design_filter_bank(up: int, down: int, taps_per_phase: int, beta: float = 8.0) -> np.ndarray:
+    """
+    Kaiser-windowed sinc low-pass for rational resampling by up/down, split
+    into `up` polyphase branches of `taps_per_phase` taps each. Row p holds
+    h[p], h[p + up], h[p + 2 * up], ...
+    """
+    length = taps_per_phase * up
+    # Cut off just below the lower of the two Nyquist rates, relative to the upsampled rate.
+    cutoff = 0.95 / max(up, down)
+    m = np.arange(length) - (length - 1) / 2
+    h = cutoff * np.sinc(cutoff * m) * np.kaiser(length, beta)
+    h *= up / h.sum()  # Unity gain after zero-stuffing by `up`.
+    return h.reshape(taps_per_phase, up).T.astype(np.float32)
+
+class PolyphaseResampler:
+    """
+    Streaming rational resampler. `process` accepts blocks of any size and
+    carries filter history and phase across calls, so feeding a signal in
+    blocks gives the same output as feeding it at once. Each block is
+    computed with a single gather and multiply over all of its output samples.
+    """
+
+    def __init__(self, in_rate: int, out_rate: int, zero_crossings: int = 16):
+        divisor = gcd(int(in_rate), int(out_rate))
+        self.in_rate = int(in_rate)
+        self.out_rate = int(out_rate)
+        self.up = self.out_rate // divisor
+        self.down = self.in_rate // divisor
+        # The filter spans `zero_crossings` lobes of the sinc on each side,
+        # measured at the lower of the two rates.
+        taps_per_phase = ceil(2 * zero_crossings * max(self.up, self.down) / self.up)
+        self.taps = taps_per_phase
+        self.bank = design_filter_bank(self.up, self.down, taps_per_phase)
+        self._tap_offsets = np.arange(taps_per_phase)
+        self._history = np.zeros(taps_per_phase - 1, dtype=np.float32)
+        # Position of the next output sample in the upsampled timeline,
+        # relative to the start of the history buffer.
+        self._position = (taps_per_phase - 1) * self.up
+
+    @property
+    def delay_s(self) -> float:
+        """Group delay the filter adds."""
+        return (self.taps * self.up - 1) / 2 / (self.in_rate * self.up)
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        samples = np.concatenate((self._history, np.asarray(samples, dtype=np.float32)))
+        positions = np.arange(self._position, samples.size * self.up, self.down)
+        base, phase = np.divmod(positions, self.up)
+        windows = samples[base[:, None] - self._tap_offsets]
+        output = np.einsum("nk,nk->n", windows, self.bank[phase])
+
+        consumed = samples.size - (self.taps - 1)
+        self._history = samples[consumed:]
+        self._position = int(self._position + positions.size * self.down - consumed * self.up)
+        return output.astype(np.float32, copy=False)
@@ -0,0 +1,37 @@
+import bisect
+
+class SpeechClock:
+    """
+    Maps positions in the recognizer's stream back to when that audio was
+    captured. Only VAD speech frames and silence padding are fed to the
+    recognizer, so stream time drifts away from wall time with every pause;
+    each buffered speech frame is recorded here with the time.monotonic() at
+    which its last sample was captured.
+    """
+
+    def __init__(self, sample_rate: int, max_anchors: int = 4096):
+        self.sample_rate = sample_rate
+        self.max_anchors = max_anchors
+        self.total_samples = 0
+        self._offsets = []  # Stream sample offset at the end of each recorded span
+        self._times = []    # Capture time of that span's last sample
+
+    def add(self, samples: int, captured_at: float = None):
+        """Accounts for `samples` appended to the stream; padding passes captured_at=None."""
+        self.total_samples += samples
+        if captured_at is None:
+            return
+        self._offsets.append(self.total_samples)
+        self._times.append(captured_at)
+        if len(self._offsets) > self.max_anchors:
+            # Token timestamps only ever refer to the current utterance.
+            del self._offsets[:self.max_anchors // 2]
+            del self._times[:self.max_anchors // 2]
+
+    def capture_time(self, stream_s: float):
+        """Capture time of the audio at `stream_s` seconds into the stream, or None if unknown."""
+        if not self._offsets:
+            return None
+        offset = stream_s * self.sample_rate
+        index = min(bisect.bisect_left(self._offsets, offset), len(self._offsets) - 1)
+        return self._times[index] - (self._offsets[index] - offset) / self.sample_rate
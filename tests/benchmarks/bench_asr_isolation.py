@@ -0,0 +1,178 @@
+"""
+ASR process isolation benchmark.
+
+Feeds synthetic audio at real-time pace through the in-process ASRProcessor
+and through IsolatedASRProcessor, with a recognizer stand-in that spends a
+configurable share of the audio duration in GIL-holding Python work. While it
+runs, a 60 Hz ticker on the event loop measures frame time (what the qasync UI
+would see), and a keyword marker injected once a second measures the latency
+from captured audio to `hotkey_triggered`.
+
+    python -m tests.benchmarks.bench_asr_isolation [--seconds 10] [--load 0.4]
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import threading
+import time
+import numpy as np
+
+from core.event_bus import EventBus
+from core.intent_resolver import KeywordIntentResolver
+from inputs.asr_processor import ASRProcessor
+from inputs.isolated_asr_processor import IsolatedASRProcessor
+
+SAMPLE_RATE = 16000
+BLOCK_SAMPLES = 960  # What the real stream delivers: two 30 ms VAD frames.
+FRAME_INTERVAL_S = 1 / 60
+MARKER_LEVEL = 0.9
+NOISE_LEVEL = 0.05
+
+class _Stream:
+    def __init__(self):
+        self.pending = 0
+        self.marker = False
+
+    def accept_waveform(self, sample_rate, audio):
+        self.pending += audio.size
+        self.marker = self.marker or bool(np.any(audio > MARKER_LEVEL))
+
+class BusyRecognizer:
+    """Mimics the OnlineRecognizer calls ASRProcessor makes, burning `load` seconds of CPU per second of audio."""
+
+    def __init__(self, load: float):
+        self.load = load
+
+    def create_stream(self):
+        return _Stream()
+
+    def is_ready(self, stream):
+        return stream.pending > 0
+
+    def decode_stream(self, stream):
+        deadline = time.perf_counter() + stream.pending / SAMPLE_RATE * self.load
+        stream.pending = 0
+        while time.perf_counter() < deadline:
+            pass
+
+    def get_result(self, stream):
+        return "angry" if stream.marker else ""
+
+    def is_endpoint(self, stream):
+        return stream.marker
+
+    def reset(self, stream):
+        stream.marker = False
+
+class AlwaysSpeech:
+    def is_speech(self, frame, sample_rate):
+        return True
+
+class BenchASRProcessor(ASRProcessor):
+    def __init__(self, *args, load: float = 0.4, **kwargs):
+        self.load = load
+        super().__init__(*args, **kwargs)
+        self.vad = AlwaysSpeech()
+
+    def _create_recognizer(self):
+        return BusyRecognizer(self.load)
+
+def feed_audio(write, seconds: float, marker_times: list, stop: threading.Event):
+    """Plays the part of the PortAudio callback thread."""
+    rng = np.random.default_rng(0)
+    block_s = BLOCK_SAMPLES / SAMPLE_RATE
+    started = time.perf_counter()
+    for index in range(int(seconds / block_s)):
+        if stop.is_set():
+            return
+        block = (rng.standard_normal(BLOCK_SAMPLES) * NOISE_LEVEL).astype(np.float32)
+        if index % int(1 / block_s) == int(0.5 / block_s):
+            block[:] = MARKER_LEVEL + 0.05
+            marker_times.append(time.perf_counter())
+        write(block)
+        time.sleep(max(0.0, started + (index + 1) * block_s - time.perf_counter()))
+
+def summarize(samples_ms: list) -> dict:
+    if not samples_ms:
+        return {"count": 0}
+    ordered = sorted(samples_ms)
+    return {
+        "count": len(ordered),
+        "p50": round(statistics.median(ordered), 2),
+        "p95": round(ordered[int(len(ordered) * 0.95) - 1], 2),
+        "p99": round(ordered[int(len(ordered) * 0.99) - 1], 2),
+        "max": round(ordered[-1], 2),
+    }
+
+async def measure(isolated: bool, seconds: float, load: float) -> dict:
+    event_bus = EventBus()
+    resolver = KeywordIntentResolver(event_bus, {"angry": {"hotkeyID": "hk", "cooldown_s": 0}})
+    triggers = await event_bus.subscribe("hotkey_triggered")
+    loop = asyncio.get_running_loop()
+    kwargs = dict(model_config={}, model_dir="", load=load)
+
+    if isolated:
+        processor = IsolatedASRProcessor(event_bus, processor_class=BenchASRProcessor, **kwargs)
+        ready = await event_bus.subscribe("asr_ready")
+        processor._start_worker()
+        background = [asyncio.create_task(processor._forward_events())]
+        await asyncio.wait_for(ready.get(), timeout=60)
+        write = processor.write_audio
+    else:
+        processor = BenchASRProcessor(event_bus, **kwargs)
+        background = [asyncio.create_task(processor._decode_loop())]
+        def write(block):
+            asyncio.run_coroutine_threadsafe(processor._audio_callback(block), loop)
+    background.append(asyncio.create_task(resolver.resolve_intent()))
+
+    marker_times, latencies_ms, frames_ms = [], [], []
+
+    async def collect_triggers():
+        while True:
+            await triggers.get()
+            received = time.perf_counter()
+            if len(latencies_ms) < len(marker_times):
+                latencies_ms.append((received - marker_times[len(latencies_ms)]) * 1000)
+
+    background.append(asyncio.create_task(collect_triggers()))
+    stop = threading.Event()
+    feeder = threading.Thread(target=feed_audio, args=(write, seconds, marker_times, stop), daemon=True)
+    feeder.start()
+
+    try:
+        while feeder.is_alive():
+            started = time.perf_counter()
+            await asyncio.sleep(FRAME_INTERVAL_S)
+            frames_ms.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(0.5)  # Let the last marker through.
+    finally:
+        stop.set()
+        if isolated:
+            await processor._shutdown_worker()
+        else:
+            await processor.stop()
+        for task in background:
+            task.cancel()
+        await asyncio.gather(*background, return_exceptions=True)
+
+    return {
+        "frame_time_ms": summarize(frames_ms),
+        "hotkey_latency_ms": summarize(latencies_ms),
+        "markers": len(marker_times),
+        "missed_triggers": len(marker_times) - len(latencies_ms),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--load", type=float, default=0.4, help="Decode CPU seconds per second of audio.")
+    args = parser.parse_args()
+
+    results = {"seconds": args.seconds, "load": args.load, "frame_budget_ms": round(FRAME_INTERVAL_S * 1000, 2)}
+    for mode, isolated in (("in_process", False), ("isolated", True)):
+        results[mode] = asyncio.run(measure(isolated, args.seconds, args.load))
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Chat input throughput benchmark.
+
+Floods a local fake IRC server channel with raid-sized bursts of chat (a share
+of them "!<keyword>" commands) and measures how fast ChatInputProcessor and
+KeywordIntentResolver get through them: messages per second end to end, time
+to drain each burst, process CPU, and how many hotkey triggers reach the bus.
+Runs with batched resolution and with one transcription per pass.
+
+    python -m tests.benchmarks.bench_chat_throughput [--messages 20000] [--burst 500] [--keywords 50]
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from core import intent_resolver, process_stats
+from core.event_bus import EventBus
+from core.intent_resolver import KeywordIntentResolver
+from inputs.chat_input_processor import ChatInputProcessor
+from tests.fake_irc_server import FakeIRCServer
+
+CHANNEL = "#raid"
+
+async def measure(messages: int, burst: int, keywords: int, command_share: float, max_batch: int) -> dict:
+    intent_resolver.MAX_BATCH = max_batch
+    expression_map = {f"keyword{i}": {"hotkeyID": f"hotkey_{i % 10}", "cooldown_s": 0} for i in range(keywords)}
+    async with FakeIRCServer() as server:
+        event_bus = EventBus()
+        resolver = KeywordIntentResolver(event_bus, expression_map)
+        resolver.set_rate_limit("raid", triggers_per_s=2, burst=5)
+        chat = ChatInputProcessor(event_bus, "127.0.0.1", server.port, CHANNEL, source="raid")
+        tasks = [asyncio.create_task(chat.process_input()), asyncio.create_task(resolver.resolve_intent())]
+        await asyncio.wait_for(server.joined.wait(), 5)
+
+        every = max(1, round(1 / command_share)) if command_share else 0
+        drain_ms = []
+        cpu_started, started = process_stats.cpu_seconds(), time.perf_counter()
+        for offset in range(0, messages, burst):
+            lines = []
+            for i in range(offset, min(offset + burst, messages)):
+                text = f"!keyword{i % keywords} lets go" if every and i % every == 0 else f"PogChamp raid message number {i}"
+                lines.append((f"viewer{i % 997}", text))
+            expected = resolver.source_counts.get("raid", 0) + sum(1 for _, text in lines if text.startswith("!"))
+            burst_started = time.perf_counter()
+            await server.flood(CHANNEL, lines)
+            # A burst is drained once every command in it has been resolved.
+            while resolver.source_counts.get("raid", 0) < expected:
+                await asyncio.sleep(0)
+            drain_ms.append((time.perf_counter() - burst_started) * 1000)
+        wall_s = time.perf_counter() - started
+        cpu_s = process_stats.cpu_seconds() - cpu_started
+
+        await chat.stop()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    drain_ms.sort()
+    return {
+        "messages_per_s": round(chat.messages_received / wall_s),
+        "commands_resolved": resolver.source_counts.get("raid", 0),
+        "burst_drain_p50_ms": round(drain_ms[len(drain_ms) // 2], 2),
+        "burst_drain_max_ms": round(drain_ms[-1], 2),
+        "cpu_us_per_message": round(cpu_s / max(1, chat.messages_received) * 1e6, 2),
+        "hotkey_triggers": event_bus.published_counts["hotkey_triggered"],
+        "rate_limited": resolver.rate_limits["raid"].rejected,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--burst", type=int, default=500, help="Messages delivered at once.")
+    parser.add_argument("--keywords", type=int, default=50)
+    parser.add_argument("--command-share", type=float, default=0.2, help="Fraction of messages that are !commands.")
+    args = parser.parse_args()
+
+    results = {"messages": args.messages, "burst": args.burst, "keywords": args.keywords}
+    for name, max_batch in (("one_per_pass", 1), ("batched", intent_resolver.MAX_BATCH)):
+        results[name] = asyncio.run(measure(args.messages, args.burst, args.keywords, args.command_share, max_batch))
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Decode scheduling benchmark.
+
+Feeds synthetic audio at real-time pace through ASRProcessor with the
+event-driven scheduler and with the fixed 50 ms polling loop it replaced, and
+reports decode-loop wakeups, recognizer decodes and status events per second
+plus process CPU, for a silent room and for intermittent speech.
+
+    python -m tests.benchmarks.bench_decode_scheduling [--seconds 10] [--load 0.1]
+"""
+import argparse
+import asyncio
+import json
+import time
+import numpy as np
+
+from core import process_stats
+from core.event_bus import EventBus
+from inputs.asr_processor import ASRProcessor
+from tests.benchmarks.bench_asr_isolation import BLOCK_SAMPLES, SAMPLE_RATE, BusyRecognizer
+
+SPEECH_LEVEL = 0.3
+NOISE_LEVEL = 0.005
+
+class EnergyVad:
+    def is_speech(self, frame, sample_rate):
+        return np.abs(np.frombuffer(frame, dtype=np.int16)).max() > SPEECH_LEVEL * 0.5 * 32767
+
+class CountingRecognizer(BusyRecognizer):
+    def __init__(self, load: float):
+        super().__init__(load)
+        self.decodes = 0
+
+    def decode_stream(self, stream):
+        self.decodes += 1
+        super().decode_stream(stream)
+
+class EventDrivenProcessor(ASRProcessor):
+    def __init__(self, *args, load: float = 0.1, **kwargs):
+        self.load = load
+        super().__init__(*args, **kwargs)
+        self.vad = EnergyVad()
+
+    def _create_recognizer(self):
+        return CountingRecognizer(self.load)
+
+class PollingProcessor(EventDrivenProcessor):
+    """The scheduling this replaced: wake every 50 ms and decode whatever speech is buffered."""
+
+    async def _audio_callback(self, samples):
+        speech = self._vad_filter(samples)
+        if speech.size > 0:
+            self.audio_buffer = np.concatenate((self.audio_buffer, speech))
+
+    async def _decode_loop(self):
+        while self.running:
+            await asyncio.sleep(0.05)
+            self.decode_wakeups += 1
+            if self.audio_buffer.size > 0:
+                await self.event_bus.publish("asr_status_update", "Transcribing")
+                for event_type, text, meta in self._transcribe_np(self.audio_buffer):
+                    await self.event_bus.publish(event_type, text, meta=meta)
+                self.audio_buffer = np.array([], dtype=np.float32)
+                await self.event_bus.publish("asr_status_update", "Listening")
+
+def feed_audio(write, seconds: float, talking: bool):
+    rng = np.random.default_rng(0)
+    block_s = BLOCK_SAMPLES / SAMPLE_RATE
+    started = time.perf_counter()
+    for index in range(int(seconds / block_s)):
+        block = (rng.standard_normal(BLOCK_SAMPLES) * NOISE_LEVEL).astype(np.float32)
+        # Intermittent speech: 1.5 s on, 1.5 s off.
+        if talking and (index * block_s) % 3.0 < 1.5:
+            block += SPEECH_LEVEL * np.sign(np.sin(np.arange(BLOCK_SAMPLES) / 8)).astype(np.float32)
+        write(block)
+        time.sleep(max(0.0, started + (index + 1) * block_s - time.perf_counter()))
+
+async def measure(processor_class, seconds: float, load: float, talking: bool) -> dict:
+    event_bus = EventBus()
+    processor = processor_class(event_bus, model_config={}, model_dir="", load=load)
+    loop = asyncio.get_running_loop()
+    decode_task = asyncio.create_task(processor._decode_loop())
+
+    def write(block):
+        asyncio.run_coroutine_threadsafe(processor._audio_callback(block), loop)
+
+    cpu_started, wall_started = process_stats.cpu_seconds(), time.perf_counter()
+    await asyncio.to_thread(feed_audio, write, seconds, talking)
+    wall_s = time.perf_counter() - wall_started
+    cpu_s = process_stats.cpu_seconds() - cpu_started
+    await processor.stop()
+    await decode_task
+
+    return {
+        "decode_loop_wakeups_per_s": round(processor.decode_wakeups / wall_s, 2),
+        "recognizer_decodes_per_s": round(processor.recognizer.decodes / wall_s, 2),
+        "status_events_per_s": round(event_bus.published_counts["asr_status_update"] / wall_s, 2),
+        "cpu_percent": round(100 * cpu_s / wall_s, 2),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--load", type=float, default=0.1, help="Decode CPU seconds per second of speech.")
+    args = parser.parse_args()
+
+    results = {"seconds": args.seconds, "load": args.load}
+    for scenario, talking in (("silence", False), ("intermittent_speech", True)):
+        results[scenario] = {
+            "polling_50ms": asyncio.run(measure(PollingProcessor, args.seconds, args.load, talking)),
+            "event_driven": asyncio.run(measure(EventDrivenProcessor, args.seconds, args.load, talking)),
+        }
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
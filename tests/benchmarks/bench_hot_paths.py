@@ -0,0 +1,240 @@
+"""
+Micro-benchmarks of the per-event hot paths.
+
+Times EventBus publish/consume, KeywordIntentResolver._process_one_event
+with 10, 1k and 10k keywords, ASRProcessor._audio_callback per second of
+audio, _transcribe_np with a stand-in recognizer, VTS request encoding, and the
+caller's cost of a log call through the queued, rate-limited sinks.
+Each case reports the median time per operation over several repeats, and the
+results are printed as JSON. Pass --baseline with an earlier run's JSON to
+compare against it; the exit status is 1 if any case got slower than
+--tolerance.
+
+    python -m tests.benchmarks.bench_hot_paths [--output results.json] [--baseline previous.json] [--tolerance 0.25]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import numpy as np
+
+from core.event_bus import EventBus
+from core.intent_resolver import KeywordIntentResolver
+from inputs.asr_processor import ASRProcessor
+from tests.benchmarks.bench_asr_isolation import BLOCK_SAMPLES, SAMPLE_RATE, BusyRecognizer
+
+REPEATS = 7
+MIN_REPEAT_S = 0.1
+
+def time_per_op(run, ops_per_call: int = 1) -> dict:
+    """
+    Calls `run()` (which performs `ops_per_call` operations) enough times to
+    fill MIN_REPEAT_S, REPEATS times over, and returns the median and best
+    time per operation.
+    """
+    # Calibrate: double the calls until they take a tenth of a repeat, then scale up.
+    calls = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(calls):
+            run()
+        elapsed = time.perf_counter() - started
+        if elapsed >= MIN_REPEAT_S / 10:
+            break
+        calls *= 2
+    calls = max(1, round(calls * MIN_REPEAT_S / elapsed))
+
+    samples = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        for _ in range(calls):
+            run()
+        samples.append((time.perf_counter() - started) / (calls * ops_per_call))
+    return {
+        "median_ns": round(statistics.median(samples) * 1e9, 1),
+        "best_ns": round(min(samples) * 1e9, 1),
+        "spread_pct": round(100 * (max(samples) - min(samples)) / statistics.median(samples), 1),
+        "ops": calls * ops_per_call * REPEATS,
+    }
+
+def bench_event_bus(loop) -> dict:
+    results = {}
+    for subscribers in (1, 4):
+        event_bus = EventBus()
+        queues = [event_bus.get_queue("transcription_received") for _ in range(subscribers)]
+
+        def publish_and_consume(batch=100):
+            async def go():
+                for _ in range(batch):
+                    await event_bus.publish("transcription_received", "hello world")
+                for queue in queues:
+                    while not queue.empty():
+                        queue.get_nowait()
+            loop.run_until_complete(go())
+
+        results[f"publish_consume_{subscribers}_subscribers"] = time_per_op(publish_and_consume, 100)
+    return results
+
+def bench_resolver(loop) -> dict:
+    results = {}
+    for keywords in (10, 1000, 10000):
+        event_bus = EventBus()
+        expression_map = {f"keyword{i:05d}": {"hotkeyID": f"hotkey_{i % 20}", "cooldown_s": 0} for i in range(keywords)}
+        resolver = KeywordIntentResolver(event_bus, expression_map)
+        miss = "i am not saying any configured word at all today"
+        hit = f"now keyword{keywords - 1:05d} please"
+
+        for name, text in (("miss", miss), ("hit", hit)):
+            def process(batch=20):
+                async def go():
+                    for _ in range(batch):
+                        await resolver._process_one_event(text)
+                loop.run_until_complete(go())
+            results[f"process_one_event_{keywords}_keywords_{name}"] = time_per_op(process, 20)
+    return results
+
+class BenchASRProcessor(ASRProcessor):
+    def _create_recognizer(self):
+        return BusyRecognizer(0)
+
+def bench_asr(loop) -> dict:
+    rng = np.random.default_rng(0)
+    second = (rng.standard_normal(SAMPLE_RATE) * 0.3).astype(np.float32)
+    blocks = [second[i:i + BLOCK_SAMPLES] for i in range(0, SAMPLE_RATE, BLOCK_SAMPLES)]
+    processor = BenchASRProcessor(event_bus=EventBus(), model_config={}, model_dir="")
+
+    def audio_second():
+        async def go():
+            for block in blocks:
+                await processor._audio_callback(block, time.monotonic())
+        loop.run_until_complete(go())
+        # Nothing decodes here, so drop what the callback buffered.
+        processor.audio_buffer = np.array([], dtype=np.float32)
+
+    chunk = second[:processor.decode_chunk_samples]
+
+    def transcribe():
+        processor._transcribe_np(chunk)
+
+    return {
+        "audio_callback_per_audio_second": time_per_op(audio_second),
+        "transcribe_np_per_chunk": time_per_op(transcribe),
+    }
+
+def bench_vts_encoding() -> dict:
+    from agents.vts_client import RequestTemplate, encode
+    hotkey_trigger = RequestTemplate("HotkeyTriggerRequest", {"hotkeyID": "hotkey_angry"})
+
+    def encode_hotkey(batch=100):
+        for request_id in range(batch):
+            encode({"apiName": "VTubeStudioPublicAPI", "apiVersion": "1.0", "requestID": str(request_id),
+                    "messageType": "HotkeyTriggerRequest", "data": {"hotkeyID": "hotkey_angry"}})
+
+    def render_hotkey(batch=100):
+        for request_id in range(batch):
+            hotkey_trigger.render(str(request_id))
+
+    def encode_parameters(batch=100):
+        for request_id in range(batch):
+            encode({"apiName": "VTubeStudioPublicAPI", "apiVersion": "1.0", "requestID": str(request_id),
+                    "messageType": "InjectParameterDataRequest", "data": {"faceFound": False, "mode": "set", "parameterValues": [
+                        {"id": "MouthOpen", "weight": 1, "value": 0.42}, {"id": "Brows", "weight": 1, "value": 0.7}]}})
+
+    return {
+        "encode_hotkey_trigger": time_per_op(encode_hotkey, 100),
+        "render_hotkey_trigger_template": time_per_op(render_hotkey, 100),
+        "encode_inject_parameters": time_per_op(encode_parameters, 100),
+    }
+
+def bench_logging() -> dict:
+    from loguru import logger
+    from core import logging_setup
+    from core.logging_setup import BackgroundLogWriter, CategoryLogger, render_text
+
+    devnull = open(os.devnull, "w")
+    writer = BackgroundLogWriter([(render_text, devnull)])
+    sink = logger.add(writer, format="{message}", level="INFO")
+    logging_setup._rate_limits["bench_limited"] = (1e-9, 1)
+    unlimited_log, limited_log = CategoryLogger("bench_unlimited"), CategoryLogger("bench_limited")
+
+    def log_trigger(batch=100):
+        for _ in range(batch):
+            unlimited_log.info("Keyword '{keyword}' detected. Triggering expression: {hotkey}", keyword="angry", hotkey="hotkey_angry")
+
+    def log_rate_limited(batch=100):
+        for _ in range(batch):
+            limited_log.info("Transcribed: {text}", text="i am so angry")
+
+    def log_below_level(batch=100):
+        for _ in range(batch):
+            logger.debug("VTS event received: {event_type}", event_type="ModelLoadedEvent")
+
+    try:
+        return {
+            "log_trigger_queued": time_per_op(log_trigger, 100),
+            "log_rate_limited_dropped": time_per_op(log_rate_limited, 100),
+            "log_below_level": time_per_op(log_below_level, 100),
+        }
+    finally:
+        logger.remove(sink)
+        writer.close()
+        devnull.close()
+        del logging_setup._rate_limits["bench_limited"]
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Cases whose median got slower than the baseline's by more than `tolerance`."""
+    regressions = []
+    for case, result in results["cases"].items():
+        previous = baseline.get("cases", {}).get(case)
+        if not previous:
+            continue
+        ratio = result["median_ns"] / previous["median_ns"]
+        result["vs_baseline"] = round(ratio, 3)
+        if ratio > 1 + tolerance:
+            regressions.append(case)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output", help="Also write the results to this file.")
+    parser.add_argument("--baseline", help="Results of an earlier run to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown before a case counts as a regression.")
+    args = parser.parse_args()
+
+    # Per-operation logging would dominate the timings.
+    from loguru import logger
+    logger.remove()
+
+    loop = asyncio.new_event_loop()
+    cases = {}
+    cases.update(bench_event_bus(loop))
+    cases.update(bench_resolver(loop))
+    cases.update(bench_asr(loop))
+    cases.update(bench_vts_encoding())
+    cases.update(bench_logging())
+    loop.close()
+
+    results = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "cases": cases,
+    }
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        results["regressions"] = regressions
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
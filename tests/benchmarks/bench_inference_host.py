@@ -0,0 +1,126 @@
+"""
+Inference host memory benchmark.
+
+Starts controller sessions one after another, first each with an ASR worker
+process of its own (process isolation) and then all on one inference host,
+and reports the resident memory added by each additional instance. The
+recognizer stand-in holds `--weights-mb` of model weights, about what a
+streaming zipformer takes once loaded.
+
+    python -m tests.benchmarks.bench_inference_host [--instances 4] [--weights-mb 200]
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import numpy as np
+
+from core import process_stats
+from core.event_bus import EventBus
+from inputs.inference_host import SESSION_SETTINGS, HostedASRProcessor, SharedModelASRProcessor, host_stats, run_inference_host
+from inputs.isolated_asr_processor import IsolatedASRProcessor
+from tests.benchmarks.bench_asr_isolation import BenchASRProcessor, BusyRecognizer
+
+AUTHKEY = "bench-inference-host"
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+class WeightsRecognizer(BusyRecognizer):
+    def __init__(self, load: float, weights_mb: float):
+        super().__init__(load)
+        # np.ones writes every page, so the weights are resident like a loaded model's.
+        self.weights = np.ones(int(weights_mb * 2 ** 20) // 4, dtype=np.float32)
+
+class WeightsASRProcessor(BenchASRProcessor):
+    def __init__(self, *args, weights_mb: float = 200, **kwargs):
+        self.weights_mb = weights_mb
+        super().__init__(*args, **kwargs)
+
+    def _create_recognizer(self):
+        return WeightsRecognizer(self.load, self.weights_mb)
+
+class SharedWeightsASRProcessor(SharedModelASRProcessor, WeightsASRProcessor):
+    pass
+
+def free_address() -> str:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return f"127.0.0.1:{probe.getsockname()[1]}"
+
+def start_host(address: str) -> subprocess.Popen:
+    """Runs a host on `address` in a process of its own, unrelated to this one like a real host."""
+    host = subprocess.Popen([sys.executable, "-m", "tests.benchmarks.bench_inference_host", "--serve", address], cwd=REPO_ROOT)
+    deadline = time.monotonic() + 30
+    while True:
+        try:
+            host_stats(address, AUTHKEY)
+            return host
+        except ConnectionRefusedError:
+            if time.monotonic() > deadline or host.poll() is not None:
+                host.kill()
+                raise
+            time.sleep(0.05)
+
+async def open_session(processor) -> asyncio.Task:
+    """Starts `processor`'s worker or host session and waits until it decodes."""
+    ready = await processor.event_bus.subscribe("asr_ready")
+    processor._start_worker()
+    forwarding = asyncio.create_task(processor._forward_events())
+    await asyncio.wait_for(ready.get(), timeout=60)
+    return forwarding
+
+async def measure(hosted: bool, instances: int, weights_mb: float) -> dict:
+    kwargs = dict(model_config={}, model_dir="", load=0.0, weights_mb=weights_mb)
+    host = None
+    if hosted:
+        address = free_address()
+        host = start_host(address)
+    processors, tasks, rss_mb = [], [], []
+    try:
+        for _ in range(instances):
+            if hosted:
+                processor = HostedASRProcessor(EventBus(), host_address=address, host_authkey=AUTHKEY, **kwargs)
+            else:
+                processor = IsolatedASRProcessor(EventBus(), processor_class=WeightsASRProcessor, **kwargs)
+            processors.append(processor)
+            tasks.append(await open_session(processor))
+            if hosted:
+                rss = host_stats(address, AUTHKEY)["rss_bytes"]
+            else:
+                rss = sum(process_stats.current_rss_bytes(worker.process.pid) for worker in processors)
+            rss_mb.append(round(rss / 2 ** 20, 1))
+    finally:
+        for processor in processors:
+            await processor._shutdown_worker()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if host is not None:
+            host.terminate()
+            host.wait()
+
+    return {
+        "decoder_rss_mb": rss_mb,
+        "per_additional_instance_mb": round((rss_mb[-1] - rss_mb[0]) / max(1, instances - 1), 1),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--instances", type=int, default=4)
+    parser.add_argument("--weights-mb", type=float, default=200)
+    parser.add_argument("--serve", metavar="ADDRESS", help=argparse.SUPPRESS)  # The host process started by start_host.
+    args = parser.parse_args()
+    if args.serve:
+        run_inference_host(args.serve, AUTHKEY, SharedWeightsASRProcessor, session_settings=SESSION_SETTINGS + ("load", "weights_mb"))
+        return
+
+    results = {"instances": args.instances, "weights_mb": args.weights_mb}
+    for mode, hosted in (("isolated", False), ("inference_host", True)):
+        results[mode] = asyncio.run(measure(hosted, args.instances, args.weights_mb))
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Parameter stream benchmark.
+
+Connects the real VTSWebSocketAgent to the local fake VTS server, fires a
+hotkey trigger every --trigger-interval seconds, and measures how long each
+trigger takes from being resolved to reaching the server: without a parameter
+stream, with the stream at --rate Hz, and with a naive stream that sends every
+frame regardless of pending triggers. Also reports the frame rate achieved.
+
+    python -m tests.benchmarks.bench_parameter_stream [--seconds 10] [--rate 60] [--vts-delay-ms 2]
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+import numpy as np
+
+from agents.parameter_stream import ParameterStream
+from agents.vts_output_agent import VTSWebSocketAgent
+from core.event_bus import EventBus
+from core.latency import LatencyHistogram
+from tests.fake_vts_server import FakeVTSServer
+
+SAMPLE_RATE = 16000
+BLOCK_S = 0.06
+PARAMETERS = {"MouthOpen": {"feature": "loudness"}, "Brows": {"feature": "pitch"}}
+
+class NaiveParameterStream(ParameterStream):
+    """Sends every frame straight through the request path, never yielding to triggers."""
+
+    async def send_frame(self) -> bool:
+        frame = self.compute_frame()
+        await self.vts_agent._request("InjectParameterDataRequest", {
+            "faceFound": False,
+            "mode": "set",
+            "parameterValues": [{"id": parameter_id, "weight": 1, "value": value} for parameter_id, value in frame.items()],
+        })
+        self.frames_sent += 1
+        return True
+
+async def feed_audio(stream: ParameterStream):
+    rng = np.random.default_rng(0)
+    t = np.arange(int(SAMPLE_RATE * BLOCK_S)) / SAMPLE_RATE
+    while True:
+        level = rng.uniform(0.01, 0.5)
+        frequency = rng.uniform(100, 300)
+        stream.push((level * np.sin(2 * np.pi * frequency * t)).astype(np.float32))
+        await asyncio.sleep(BLOCK_S)
+
+async def measure(stream_class, seconds: float, rate_hz: float, trigger_interval_s: float, vts_delay_s: float) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        async with FakeVTSServer(response_delay_s=vts_delay_s) as server:
+            event_bus = EventBus()
+            agent = VTSWebSocketAgent("127.0.0.1", server.port, os.path.join(tmp, "token.txt"), event_bus)
+            await agent.connect(max_retries=1)
+            await agent.authenticate()
+
+            tasks = [asyncio.create_task(agent.run())]
+            stream = None
+            if stream_class is not None:
+                stream = stream_class(agent, PARAMETERS, rate_hz=rate_hz, smoothing=0)
+                tasks += [asyncio.create_task(stream.run()), asyncio.create_task(feed_audio(stream))]
+
+            published_at = []
+            started = time.monotonic()
+            while time.monotonic() - started < seconds:
+                # Offset from the frame clock so triggers land at random points of a frame.
+                await asyncio.sleep(trigger_interval_s * (0.5 + np.random.random()))
+                published_at.append(time.monotonic())
+                await event_bus.publish("hotkey_triggered", "hotkey_angry")
+            await asyncio.sleep(0.2)
+            wall_s = time.monotonic() - started
+
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await agent.disconnect()
+
+    arrivals = [arrived_at for arrived_at, _ in server.requests_of("HotkeyTriggerRequest")]
+    histogram = LatencyHistogram(buckets_ms=(0.5, 1, 2, 3, 5, 10, 20, 50))
+    for sent, arrived in zip(published_at, arrivals):
+        histogram.record(arrived - sent)
+    summary = histogram.summary()
+    result = {
+        "triggers": len(arrivals),
+        "trigger_latency_mean_ms": summary["mean_ms"],
+        "trigger_latency_p99_ms": summary["p99_ms"],
+        "trigger_latency_max_ms": summary["max_ms"],
+        "frames_per_s": round(len(server.requests_of("InjectParameterDataRequest")) / wall_s, 1),
+    }
+    if stream is not None:
+        result["frames_yielded"] = stream.frames_yielded
+        result["frames_unchanged"] = stream.frames_unchanged
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--rate", type=float, default=60.0, help="Parameter frames per second.")
+    parser.add_argument("--trigger-interval", type=float, default=0.25)
+    parser.add_argument("--vts-delay-ms", type=float, default=2.0, help="Simulated VTS processing time per request.")
+    args = parser.parse_args()
+
+    results = {"seconds": args.seconds, "rate_hz": args.rate, "vts_delay_ms": args.vts_delay_ms}
+    for name, stream_class in (("no_stream", None), ("naive_stream", NaiveParameterStream), ("parameter_stream", ParameterStream)):
+        results[name] = asyncio.run(measure(stream_class, args.seconds, args.rate, args.trigger_interval, args.vts_delay_ms / 1000))
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Quality governor benchmark.
+
+Feeds continuous speech at real-time pace through ASRProcessor with a
+recognizer stand-in that burns CPU per decode call and per second of audio.
+Halfway through the first third a "game" load spike makes decoding slower
+than real time until the last third. Reports, with and without the quality
+governor, how stale decoded audio was when each decode finished (the delay
+a trigger would see), the tiers the governor went through, and how much
+speech it dropped.
+
+    python -m tests.benchmarks.bench_quality_governor [--seconds 30] [--load 0.3] [--spike-load 1.3] [--target-ms 1000]
+"""
+import argparse
+import json
+import time
+import numpy as np
+
+from core.latency import LatencyHistogram
+from tests.benchmarks.bench_asr_isolation import BLOCK_SAMPLES, SAMPLE_RATE, BenchASRProcessor, BusyRecognizer
+
+# Fixed cost of a decode call: feature extraction, session setup, Python glue.
+CALL_OVERHEAD_S = 0.01
+
+class SpikyRecognizer(BusyRecognizer):
+    def decode_stream(self, stream):
+        deadline = time.perf_counter() + CALL_OVERHEAD_S + stream.pending / SAMPLE_RATE * self.load
+        stream.pending = 0
+        while time.perf_counter() < deadline:
+            pass
+
+class SpikyASRProcessor(BenchASRProcessor):
+    def _create_recognizer(self):
+        return SpikyRecognizer(self.load)
+
+def run(seconds: float, load: float, spike_load: float, governor: dict = None) -> dict:
+    processor = SpikyASRProcessor(None, model_config={}, model_dir="", load=load, quality_governor=governor)
+    block_s = BLOCK_SAMPLES / SAMPLE_RATE
+    block = np.full(BLOCK_SAMPLES, 0.3, dtype=np.float32)
+    lag = LatencyHistogram()
+    tiers = []
+    started = time.monotonic()
+    fed = 0
+    while fed * block_s < seconds:
+        now = time.monotonic()
+        processor.recognizer.load = spike_load if seconds / 6 <= now - started < seconds * 2 / 3 else load
+        # Blocks captured while the last decode ran queue up, as audio callbacks do on a busy loop.
+        due = False
+        while fed * block_s <= now - started and fed * block_s < seconds:
+            fed += 1
+            due = processor._feed(block, started + fed * block_s) or due
+        if not due:
+            time.sleep(max(0.0, started + (fed + 1) * block_s - time.monotonic()))
+            continue
+        for event_type, payload, _ in processor._decode_pending():
+            if event_type == "asr_quality_tier":
+                tiers.append((round(time.monotonic() - started, 1), payload))
+        lag.record(time.monotonic() - processor.last_captured_at)
+
+    result = {"decode_lag": lag.summary()}
+    if processor.governor is not None:
+        result["tier_changes"] = tiers
+        result["dropped_s"] = round(processor.governor.dropped_s, 2)
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=30.0)
+    parser.add_argument("--load", type=float, default=0.3, help="Decode seconds per audio second normally.")
+    parser.add_argument("--spike-load", type=float, default=1.3, help="Decode seconds per audio second during the spike.")
+    parser.add_argument("--target-ms", type=float, default=1000)
+    args = parser.parse_args()
+
+    results = {"seconds": args.seconds, "load": args.load, "spike_load": args.spike_load, "target_ms": args.target_ms}
+    results["static"] = run(args.seconds, args.load, args.spike_load)
+    results["governed"] = run(args.seconds, args.load, args.spike_load, {"target_latency_ms": args.target_ms})
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Capture conversion benchmark.
+
+Runs the downmix and polyphase resampler that the audio callback applies to
+native-rate device blocks, over synthetic audio in 60 ms blocks, and reports
+CPU milliseconds per second of audio for common device formats.
+
+    python -m tests.benchmarks.bench_resample [--seconds 30]
+"""
+import argparse
+import json
+import time
+import numpy as np
+
+from inputs.utils.resample import PolyphaseResampler, downmix
+
+TARGET_RATE = 16000
+BLOCK_MS = 60
+FORMATS = ((44100, 1), (44100, 2), (48000, 1), (48000, 2), (48000, 8), (96000, 2))
+
+def measure(rate: int, channels: int, seconds: float) -> dict:
+    block = int(rate * BLOCK_MS / 1000)
+    audio = np.random.default_rng(0).standard_normal((block * 50, channels)).astype(np.float32) * 0.1
+    resampler = PolyphaseResampler(rate, TARGET_RATE)
+    blocks = int(seconds * 1000 / BLOCK_MS)
+
+    started = time.process_time()
+    for index in range(blocks):
+        offset = (index % 50) * block
+        resampler.process(downmix(audio[offset:offset + block]))
+    cpu_s = time.process_time() - started
+    audio_s = blocks * BLOCK_MS / 1000
+
+    return {
+        "rate": rate,
+        "channels": channels,
+        "taps_per_phase": resampler.taps,
+        "delay_ms": round(resampler.delay_s * 1000, 2),
+        "cpu_ms_per_audio_s": round(cpu_s / audio_s * 1000, 3),
+        "cpu_ms_per_block": round(cpu_s / blocks * 1000, 4),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=30.0, help="Audio seconds to convert per format.")
+    args = parser.parse_args()
+    print(json.dumps({"block_ms": BLOCK_MS, "results": [measure(rate, channels, args.seconds) for rate, channels in FORMATS]}, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Startup benchmark for the entry point.
+
+Measures, in fresh interpreters, the cumulative `-X importtime` cost of the
+modules on the path to the first window, lists which heavy third-party
+modules each one drags in, and times `vts_main.py --startup-benchmark` (or a
+frozen build) from process launch to the shown window.
+
+    python -m tests.benchmarks.bench_startup [--runs 5] [--exe dist/VTS_Voice_Controller/VTS_Voice_Controller.exe]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Target for the frozen (one-folder) build described by VTS_Voice_Controller.spec.
+TARGET_TIME_TO_WINDOW_S = 1.5
+
+HEAVY_MODULES = ("sherpa_onnx", "onnxruntime", "sounddevice", "webrtcvad", "numpy", "cv2", "pyvts", "requests", "PyQt6")
+
+MODULES = ("core.application_core", "ui.app_ui", "vts_main")
+
+def measure_import(module: str) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    imported = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            imported[name.strip()] = int(cumulative)
+    return {
+        "module": module,
+        "cumulative_ms": round(imported.get(module, 0) / 1000, 2),
+        "heavy_imports": sorted(m for m in imported if m in HEAVY_MODULES),
+        "ok": result.returncode == 0,
+    }
+
+def measure_time_to_window(command: list, runs: int) -> dict:
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = subprocess.run(command, cwd=ROOT, env=env, capture_output=True, text=True, timeout=120)
+        wall_s = time.perf_counter() - started
+        lines = [l for l in result.stdout.splitlines() if l.startswith("{")]
+        if result.returncode != 0 or not lines:
+            return {"error": result.stderr.strip().splitlines()[-1:] or "no output"}
+        samples.append({"wall_s": wall_s, **json.loads(lines[-1])})
+    return {
+        "runs": runs,
+        "median_wall_s": round(statistics.median(s["wall_s"] for s in samples), 4),
+        "median_in_process_s": round(statistics.median(s["time_to_window_s"] for s in samples), 4),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--exe", help="Path to a frozen build to time instead of vts_main.py.")
+    args = parser.parse_args()
+
+    command = [args.exe] if args.exe else [sys.executable, "vts_main.py"]
+    window = measure_time_to_window(command + ["--startup-benchmark"], args.runs)
+    results = {
+        "imports": [measure_import(module) for module in MODULES],
+        "time_to_window": window,
+        "target_time_to_window_s": TARGET_TIME_TO_WINDOW_S,
+    }
+    if args.exe and "median_wall_s" in window:
+        results["meets_target"] = window["median_wall_s"] <= TARGET_TIME_TO_WINDOW_S
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
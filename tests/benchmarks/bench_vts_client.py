@@ -0,0 +1,135 @@
+"""
+VTS client benchmark.
+
+Sends hotkey triggers to the local fake VTS server (answering each request in
+a task of its own, as VTube Studio does) while a parameter stream keeps a
+frame in flight, and reports the trigger round trip and the request
+throughput of:
+
+- locked: VTSClient with one request on the socket at a time, as with the
+  lock the agent needed on top of pyvts,
+- pyvts: pyvts itself behind such a lock, when it is installed,
+- native: VTSClient with requests correlated by requestID and pre-encoded
+  trigger templates.
+
+    python -m tests.benchmarks.bench_vts_client [--triggers 200] [--rate 60] [--frame-delay-ms 4]
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from agents.vts_client import RequestTemplate, VTSClient
+from core.latency import LatencyHistogram
+from tests.fake_vts_server import FakeVTSServer
+
+BUCKETS_MS = (0.25, 0.5, 1, 2, 3, 5, 10, 20, 50)
+FRAME = {"faceFound": False, "mode": "set", "parameterValues": [
+    {"id": "MouthOpen", "weight": 1, "value": 0.42}, {"id": "Brows", "weight": 1, "value": 0.7}]}
+TRIGGER = {"hotkeyID": "hotkey_angry"}
+
+class LockedVTSClient(VTSClient):
+    """VTSClient serialized like pyvts: a request waits until the previous one is answered."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lock = asyncio.Lock()
+
+    async def _exchange(self, request_id: str, message: str, timeout_s: float = None) -> dict:
+        async with self.lock:
+            return await super()._exchange(request_id, message, timeout_s)
+
+class NativeSender:
+    def __init__(self, client: VTSClient):
+        self.client = client
+        self.trigger = RequestTemplate("HotkeyTriggerRequest", TRIGGER)
+
+    async def send_trigger(self):
+        return await self.client.send_template(self.trigger)
+
+    async def send_frame(self):
+        return await self.client.request("InjectParameterDataRequest", FRAME)
+
+class LockedSender(NativeSender):
+    async def send_trigger(self):
+        return await self.client.request("HotkeyTriggerRequest", TRIGGER)
+
+class PyvtsSender:
+    def __init__(self, port: int, token_file: str):
+        import pyvts
+        self.vts = pyvts.vts(plugin_info={"plugin_name": "VTS Voice Controller", "developer": "Gemini", "authentication_token_path": token_file},
+                             vts_api_info={**pyvts.config.vts_api, "port": port})
+        self.lock = asyncio.Lock()
+
+    async def send_trigger(self):
+        async with self.lock:
+            return await self.vts.request(self.vts.vts_request.requestTriggerHotKey(TRIGGER["hotkeyID"]))
+
+    async def send_frame(self):
+        async with self.lock:
+            return await self.vts.request(self.vts.vts_request.requestSetMultiParameterValue(["MouthOpen", "Brows"], [0.42, 0.7]))
+
+async def open_sender(mode: str, port: int, token_file: str):
+    if mode == "pyvts":
+        sender = PyvtsSender(port, token_file)
+        await sender.vts.connect()
+        return sender, sender.vts.close
+    client = (LockedVTSClient if mode == "locked" else VTSClient)("127.0.0.1", port, token_file)
+    await client.connect()
+    return (LockedSender if mode == "locked" else NativeSender)(client), client.close
+
+async def stream_frames(sender, rate_hz: float):
+    while True:
+        await asyncio.gather(sender.send_frame(), asyncio.sleep(1 / rate_hz))
+
+async def measure(mode: str, triggers: int, rate_hz: float, frame_delay_s: float) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        async with FakeVTSServer(concurrent=True) as server:
+            server.delays["InjectParameterDataRequest"] = frame_delay_s
+            sender, close = await open_sender(mode, server.port, os.path.join(tmp, "token.txt"))
+            try:
+                # Triggers while a parameter frame is always in flight.
+                frames = asyncio.create_task(stream_frames(sender, rate_hz))
+                round_trip = LatencyHistogram(buckets_ms=BUCKETS_MS)
+                for _ in range(triggers):
+                    await asyncio.sleep(0.5 / rate_hz)
+                    started = time.perf_counter()
+                    await sender.send_trigger()
+                    round_trip.record(time.perf_counter() - started)
+                frames.cancel()
+                await asyncio.gather(frames, return_exceptions=True)
+
+                # Throughput: 50 triggers at a time, no frames.
+                started = time.perf_counter()
+                for _ in range(max(1, triggers // 50)):
+                    await asyncio.gather(*(sender.send_trigger() for _ in range(50)))
+                elapsed_s = time.perf_counter() - started
+            finally:
+                await close()
+    return {
+        "trigger_round_trip_with_frames": round_trip.summary(),
+        "triggers_per_s": round(max(1, triggers // 50) * 50 / elapsed_s),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--triggers", type=int, default=200)
+    parser.add_argument("--rate", type=float, default=60.0, help="Parameter frames per second.")
+    parser.add_argument("--frame-delay-ms", type=float, default=4.0, help="How long the server takes to answer a parameter frame.")
+    args = parser.parse_args()
+
+    modes = ["locked", "native"]
+    try:
+        import pyvts  # noqa: F401
+        modes.insert(1, "pyvts")
+    except ImportError:
+        pass
+    results = {"triggers": args.triggers, "rate_hz": args.rate, "frame_delay_ms": args.frame_delay_ms}
+    for mode in modes:
+        results[mode] = asyncio.run(measure(mode, args.triggers, args.rate, args.frame_delay_ms / 1000))
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Offline replay harness.
+
+Plays a recorded WAV file through the real pipeline (native-rate conversion,
+VAD, the sherpa-onnx recognizer for --language and KeywordIntentResolver) at
+real-time pace, and records the delay from the end of each spoken keyword to
+the moment the VTS agent would send its HotkeyTriggerRequest. Prints a latency
+histogram and a JSON summary, with the pipeline's CPU seconds per second of
+audio and, given the keywords actually spoken (--expect), keyword recall.
+
+    python -m tests.benchmarks.replay_harness recording.wav --language en --mode accurate [--keywords angry,cry]
+    python -m tests.benchmarks.replay_harness recording.wav --expect angry,happy,angry --compare-preprocess
+
+Keywords default to the expressions in vts_config.yaml. --preprocess runs the
+SpeechPreprocessor front end ahead of VAD; --compare-preprocess replays with
+and without it.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import wave
+from collections import Counter
+import numpy as np
+
+from core import process_stats
+from core.config_loader import ConfigLoader
+from core.event_bus import EventBus
+from core.intent_resolver import KeywordIntentResolver
+from core.latency import LatencyHistogram
+from inputs.utils.resample import PolyphaseResampler, downmix
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SAMPLE_RATE = 16000
+BLOCK_MS = 60
+
+def load_wav(path: str) -> np.ndarray:
+    """Reads a 16-bit PCM WAV file as mono float32 at 16 kHz."""
+    with wave.open(path, "rb") as wav:
+        if wav.getsampwidth() != 2:
+            raise ValueError(f"{path}: only 16-bit PCM WAV files are supported.")
+        rate, channels = wav.getframerate(), wav.getnchannels()
+        frames = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+    audio = downmix(frames.reshape(-1, channels).astype(np.float32) / 32768.0)
+    if rate != SAMPLE_RATE:
+        audio = PolyphaseResampler(rate, SAMPLE_RATE).process(audio)
+    return audio
+
+def expression_map_from_config(config_path: str) -> dict:
+    config = ConfigLoader.load_yaml(config_path) or {}
+    return {keyword: {"hotkeyID": exp_file, "cooldown_s": 0}
+            for exp_file, exp_data in config.get("expressions", {}).items()
+            for keyword in exp_data.get("keywords", [])}
+
+def create_processor(event_bus: EventBus, language: str, mode: str, preprocess: dict = None):
+    from inputs.asr_processor import ASRProcessor
+    from inputs.utils.utils import ensure_model_downloaded_and_extracted
+
+    model_config = ConfigLoader.load_yaml(os.path.join(ROOT, "config", "models.yaml"))[language]
+    model_dir = ensure_model_downloaded_and_extracted(model_config["url"], os.path.join(ROOT, "models"))
+    confirm_kwargs = {}
+    if mode == "hybrid" and model_config.get("confirm"):
+        confirm_kwargs = {
+            "confirm_model_config": model_config["confirm"],
+            "confirm_model_dir": ensure_model_downloaded_and_extracted(model_config["confirm"]["url"], os.path.join(ROOT, "models")),
+        }
+    return ASRProcessor(event_bus, model_config=model_config, model_dir=model_dir, recognition_mode=mode, preprocess=preprocess, **confirm_kwargs)
+
+def keyword_recall(expected: list, triggers: list) -> dict:
+    """How many of the `expected` keyword utterances triggered, counting each trigger once."""
+    expected_counts = Counter(keyword.lower() for keyword in expected)
+    triggered_counts = Counter((entry["keyword"] or "").lower() for entry in triggers)
+    found = sum(min(count, triggered_counts[keyword]) for keyword, count in expected_counts.items())
+    return {
+        "expected": len(expected),
+        "found": found,
+        "recall": round(found / len(expected), 3) if expected else None,
+        "unexpected_triggers": sum(max(0, count - expected_counts[keyword]) for keyword, count in triggered_counts.items()),
+    }
+
+async def replay(audio: np.ndarray, processor, event_bus: EventBus, expression_map: dict, tail_s: float = 2.0) -> dict:
+    """
+    Feeds `audio` to `processor` in capture-sized blocks at real-time pace and
+    measures keyword-end-to-send latency the way VTSWebSocketAgent does.
+    """
+    resolver = KeywordIntentResolver(event_bus, expression_map)
+    triggers = event_bus.get_queue("hotkey_triggered")
+    histogram = LatencyHistogram()
+    trigger_log = []
+    started = time.monotonic()
+
+    async def record_triggers():
+        # Stands in for VTSWebSocketAgent.run: latency is taken where the request would be sent.
+        while True:
+            event = await triggers.get()
+            sent_at = time.monotonic()
+            spoken_end = (event.meta or {}).get("spoken_end")
+            entry = {"hotkey": event.payload, "keyword": (event.meta or {}).get("keyword"), "sent_at_s": round(sent_at - started, 3)}
+            if spoken_end is not None:
+                histogram.record(sent_at - spoken_end)
+                entry["spoken_end_s"] = round(spoken_end - started, 3)
+                entry["latency_ms"] = round((sent_at - spoken_end) * 1000, 1)
+            trigger_log.append(entry)
+
+    tasks = [
+        asyncio.create_task(resolver.resolve_intent()),
+        asyncio.create_task(processor._decode_loop()),
+        asyncio.create_task(record_triggers()),
+    ]
+    block = SAMPLE_RATE * BLOCK_MS // 1000
+    silence = np.zeros(int(tail_s * SAMPLE_RATE), dtype=np.float32)
+    audio = np.concatenate((audio, silence))
+    started_cpu = process_stats.cpu_seconds()
+    try:
+        for index, offset in enumerate(range(0, audio.size, block)):
+            # Pace like a device would deliver blocks, stamping each as it is "captured".
+            await asyncio.sleep(max(0.0, started + (index + 1) * BLOCK_MS / 1000 - time.monotonic()))
+            await processor._audio_callback(audio[offset:offset + block], time.monotonic())
+        await asyncio.sleep(0.5)
+    finally:
+        await processor.stop()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    audio_s = audio.size / SAMPLE_RATE
+
+    return {
+        "audio_s": round(audio_s, 2),
+        "cpu_s_per_audio_s": round((process_stats.cpu_seconds() - started_cpu) / audio_s, 4),
+        "triggers": trigger_log,
+        "untimed_triggers": sum(1 for entry in trigger_log if "latency_ms" not in entry),
+        "latency": histogram.summary(),
+        "histogram": histogram,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("wav", help="16-bit PCM WAV recording to replay.")
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--mode", choices=["fast", "accurate", "hybrid"], default="fast")
+    parser.add_argument("--keywords", help="Comma-separated keywords. Defaults to the expressions in --config.")
+    parser.add_argument("--config", default=os.path.join(ROOT, "vts_config.yaml"))
+    parser.add_argument("--json", help="Also write the summary to this file.")
+    parser.add_argument("--expect", help="Comma-separated keywords spoken in the recording, repeated as often as spoken, for keyword recall.")
+    parser.add_argument("--preprocess", action="store_true", help="Run the noise suppression and AGC front end ahead of VAD.")
+    parser.add_argument("--compare-preprocess", action="store_true", help="Replay once without and once with the front end.")
+    args = parser.parse_args()
+    expected = [k.strip() for k in args.expect.split(",") if k.strip()] if args.expect else None
+
+    if args.keywords:
+        expression_map = {k.strip(): {"hotkeyID": k.strip(), "cooldown_s": 0} for k in args.keywords.split(",") if k.strip()}
+    else:
+        expression_map = expression_map_from_config(args.config)
+
+    async def run(preprocess: bool):
+        event_bus = EventBus()
+        processor = await asyncio.to_thread(create_processor, event_bus, args.language, args.mode, {"enabled": preprocess})
+        results = await replay(load_wav(args.wav), processor, event_bus, expression_map)
+        if expected is not None:
+            results["keyword_recall"] = keyword_recall(expected, results["triggers"])
+        return results
+
+    summary = {"wav": args.wav, "language": args.language, "mode": args.mode}
+    if args.compare_preprocess:
+        for label, preprocess in (("raw", False), ("preprocessed", True)):
+            results = asyncio.run(run(preprocess))
+            print(f"{label}:\n{results.pop('histogram').render()}", file=sys.stderr)
+            summary[label] = results
+    else:
+        results = asyncio.run(run(args.preprocess))
+        print(results.pop("histogram").render(), file=sys.stderr)
+        summary.update(preprocess=args.preprocess, **results)
+    print(json.dumps(summary, indent=2))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+
+if __name__ == "__main__":
+    main()
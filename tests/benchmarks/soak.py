@@ -0,0 +1,247 @@
+"""
+Long-run soak harness.
+
+Runs the whole ApplicationCore pipeline: VAD and decode scheduling, the
+resolver, the VTS agent (against the local fake VTS server), the config
+watcher and model polling. Synthetic speech, or a recorded WAV file, is
+replayed in place of the microphone at --speed times real time. Samples RSS,
+CPU, tracemalloc heap, event queue depths and resolver state, then prints a
+JSON report. The exit status is 1 if, after warm-up, memory grows past its
+budget or a queue backs up.
+
+    python -m tests.benchmarks.soak [--hours 8] [--speed 200] [--wav recording.wav --language en --mode fast]
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from unittest.mock import patch
+import numpy as np
+import yaml
+from loguru import logger
+
+from core import process_stats
+from core.application_core import ApplicationCore
+from core.config_loader import ConfigLoader
+from inputs.asr_processor import ASRProcessor
+from tests.benchmarks.bench_asr_isolation import BLOCK_SAMPLES, SAMPLE_RATE, BusyRecognizer
+from tests.benchmarks.bench_decode_scheduling import EnergyVad
+from tests.fake_vts_server import FakeVTSServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SPEECH_LEVEL = 0.3
+MARKER_LEVEL = 0.9
+NOISE_LEVEL = 0.005
+
+def synthetic_audio(seconds: float = 30.0) -> np.ndarray:
+    """Room noise with a 1.5 s burst of "speech" every 5 s; every fourth burst carries a keyword marker."""
+    rng = np.random.default_rng(0)
+    audio = (rng.standard_normal(int(seconds * SAMPLE_RATE)) * NOISE_LEVEL).astype(np.float32)
+    burst = np.sign(np.sin(np.arange(int(1.5 * SAMPLE_RATE)) / 8)).astype(np.float32)
+    for index, start_s in enumerate(np.arange(1.0, seconds - 2, 5.0)):
+        start = int(start_s * SAMPLE_RATE)
+        level = MARKER_LEVEL if index % 4 == 0 else SPEECH_LEVEL
+        audio[start:start + burst.size] += level * burst
+    return audio
+
+class SoakRecognizer(BusyRecognizer):
+    """Hears the next configured keyword whenever the keyword marker went by, and ends the utterance there."""
+
+    def __init__(self, keywords: list):
+        super().__init__(0)
+        self.keywords = keywords
+        self.heard = 0
+
+    def get_result(self, stream):
+        return self.keywords[self.heard % len(self.keywords)] if stream.marker else ""
+
+    def is_endpoint(self, stream):
+        return stream.marker
+
+    def reset(self, stream):
+        if stream.marker:
+            self.heard += 1
+        stream.marker = False
+
+class ReplayASRProcessor(ASRProcessor):
+    """Feeds a recording through the processor in place of the microphone, `speed` times faster than real time."""
+
+    def __init__(self, *args, audio: np.ndarray, speed: float, keywords: list = None, **kwargs):
+        self.keywords = keywords
+        super().__init__(*args, **kwargs)
+        self.audio = audio
+        self.speed = speed
+        self.audio_s_fed = 0.0
+        if keywords:
+            self.vad = EnergyVad()
+
+    def _create_recognizer(self):
+        if self.keywords:
+            return SoakRecognizer(self.keywords)
+        return super()._create_recognizer()
+
+    async def process_input(self):
+        decode_task = asyncio.create_task(self._decode_loop())
+        await self.event_bus.publish("asr_ready", True)
+        block_s = BLOCK_SAMPLES / SAMPLE_RATE
+        started, index = time.monotonic(), 0
+        try:
+            while self.running:
+                offset = (index * BLOCK_SAMPLES) % (self.audio.size - BLOCK_SAMPLES)
+                await self._audio_callback(self.audio[offset:offset + BLOCK_SAMPLES], time.monotonic())
+                index += 1
+                self.audio_s_fed = index * block_s
+                await asyncio.sleep(max(0.0, started + index * block_s / self.speed - time.monotonic()))
+        finally:
+            decode_task.cancel()
+
+class SoakApplicationCore(ApplicationCore):
+    def __init__(self, *args, processor_factory, **kwargs):
+        self.processor_factory = processor_factory
+        super().__init__(*args, **kwargs)
+
+    async def set_language(self, language: str, timeline=None):
+        self.current_language = language
+        self.input_processor = await asyncio.to_thread(self.processor_factory, self.event_bus)
+
+def write_config(tmp_dir: str, port: int) -> tuple:
+    """The project's config pointed at the fake server, plus the hotkeys that server should report."""
+    shutil.copytree(os.path.join(ROOT, "config"), os.path.join(tmp_dir, "config"))
+    config = ConfigLoader.load_yaml(os.path.join(ROOT, "vts_config.yaml"))
+    config["vts_settings"] = {"host": "127.0.0.1", "port": port, "token_file": os.path.join(tmp_dir, "vts_token.txt")}
+    config.pop("chat_inputs", None)
+    config.pop("parameter_stream", None)
+    for exp_data in config["expressions"].values():
+        exp_data.setdefault("auto_off_s", 20)
+    with open(os.path.join(tmp_dir, "vts_config.yaml"), "w", encoding="utf-8") as f:
+        yaml.safe_dump(config, f)
+    hotkeys = [{"name": exp_data["name"], "type": "ToggleExpression", "file": exp_file, "hotkeyID": f"hotkey_{index}"}
+               for index, (exp_file, exp_data) in enumerate(config["expressions"].items())]
+    keywords = [keyword for exp_data in config["expressions"].values() for keyword in exp_data.get("keywords", [])]
+    return hotkeys, keywords
+
+def sample(app: ApplicationCore, started: float, cpu_started: float) -> dict:
+    stats = app.event_bus.stats()
+    depths = [depth for queue_depths in stats["queue_depths"].values() for depth in queue_depths]
+    wall_s = time.monotonic() - started
+    processor = app.input_processor
+    return {
+        "wall_s": round(wall_s, 1),
+        "audio_h": round(getattr(processor, "audio_s_fed", 0) / 3600, 3),
+        "rss_mb": round(process_stats.current_rss_bytes() / 2 ** 20, 2),
+        "heap_mb": round(tracemalloc.get_traced_memory()[0] / 2 ** 20, 2) if tracemalloc.is_tracing() else None,
+        "cpu_percent": round(100 * (process_stats.cpu_seconds() - cpu_started) / max(wall_s, 1e-9), 1),
+        "max_queue_depth": max(depths, default=0),
+        "events_dropped": sum(stats["dropped"].values()),
+        "hotkeys_triggered": stats["published"].get("hotkey_triggered", 0),
+        "cooldowns": len(app.intent_resolver.expression_cooldowns) if app.intent_resolver else 0,
+    }
+
+async def soak(args) -> dict:
+    wall_s = args.hours * 3600 / args.speed
+    warmup_s = wall_s * args.warmup
+    with tempfile.TemporaryDirectory() as tmp_dir, patch("core.application_core.ConfigLoader.get_base_path", return_value=tmp_dir):
+        async with FakeVTSServer(max_recorded=1000) as server:
+            server.hotkeys, keywords = write_config(tmp_dir, server.port)
+            server.expression_states = {hotkey["file"]: False for hotkey in server.hotkeys}
+
+            if args.wav:
+                from inputs.utils.utils import ensure_model_downloaded_and_extracted
+                from tests.benchmarks.replay_harness import load_wav
+                audio = load_wav(args.wav)
+                model_config = ConfigLoader.load_yaml(os.path.join(ROOT, "config", "models.yaml"))[args.language]
+                model_dir = ensure_model_downloaded_and_extracted(model_config["url"], os.path.join(ROOT, "models"))
+                confirm_kwargs = {}
+                if args.mode == "hybrid" and model_config.get("confirm"):
+                    confirm_kwargs = {
+                        "confirm_model_config": model_config["confirm"],
+                        "confirm_model_dir": ensure_model_downloaded_and_extracted(model_config["confirm"]["url"], os.path.join(ROOT, "models")),
+                    }
+
+                def processor_factory(event_bus):
+                    return ReplayASRProcessor(event_bus, model_config=model_config, model_dir=model_dir,
+                                              recognition_mode=args.mode, audio=audio, speed=args.speed, **confirm_kwargs)
+            else:
+                audio = synthetic_audio()
+
+                def processor_factory(event_bus):
+                    return ReplayASRProcessor(event_bus, model_config={}, model_dir="", recognition_mode=args.mode,
+                                              audio=audio, speed=args.speed, keywords=keywords)
+
+            app = SoakApplicationCore(os.path.join(tmp_dir, "vts_config.yaml"), recognition_mode=args.mode,
+                                      language=args.language, processor_factory=processor_factory)
+            run_task = asyncio.create_task(app.run())
+            started, cpu_started = time.monotonic(), process_stats.cpu_seconds()
+            samples, baseline, heap_baseline = [], None, None
+            while time.monotonic() - started < wall_s and not run_task.done():
+                await asyncio.sleep(min(args.sample_interval, max(0.0, wall_s - (time.monotonic() - started))))
+                samples.append(sample(app, started, cpu_started))
+                if baseline is None and time.monotonic() - started >= warmup_s:
+                    baseline = samples[-1]
+                    if tracemalloc.is_tracing():
+                        heap_baseline = tracemalloc.take_snapshot()
+            run_task.cancel()
+            await asyncio.gather(run_task, return_exceptions=True)
+
+    final = samples[-1]
+    baseline = baseline or samples[0]
+    report = {
+        "hours": args.hours,
+        "speed": args.speed,
+        "baseline": baseline,
+        "final": final,
+        "rss_growth_mb": round(final["rss_mb"] - baseline["rss_mb"], 2),
+        "samples": samples,
+    }
+    if heap_baseline is not None:
+        report["heap_growth_mb"] = round(final["heap_mb"] - baseline["heap_mb"], 2)
+        top = tracemalloc.take_snapshot().compare_to(heap_baseline, "lineno")[:args.top]
+        report["top_allocation_growth"] = [str(stat) for stat in top]
+
+    failures = []
+    if report["rss_growth_mb"] > args.rss_budget_mb:
+        failures.append(f"RSS grew {report['rss_growth_mb']} MB after warm-up (budget {args.rss_budget_mb} MB)")
+    if report.get("heap_growth_mb", 0) > args.heap_budget_mb:
+        failures.append(f"Python heap grew {report['heap_growth_mb']} MB after warm-up (budget {args.heap_budget_mb} MB)")
+    max_depth = max(s["max_queue_depth"] for s in samples)
+    if max_depth > args.queue_budget:
+        failures.append(f"An event queue reached {max_depth} events (budget {args.queue_budget})")
+    report["failures"] = failures
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--hours", type=float, default=8.0, help="Hours of audio to replay.")
+    parser.add_argument("--speed", type=float, default=200.0, help="Replay speed relative to real time.")
+    parser.add_argument("--wav", help="Replay this recording through the real recognizer instead of synthetic audio.")
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--mode", choices=["fast", "accurate", "hybrid"], default="fast")
+    parser.add_argument("--sample-interval", type=float, default=5.0, help="Wall seconds between samples.")
+    parser.add_argument("--warmup", type=float, default=0.1, help="Share of the run before the baseline sample.")
+    parser.add_argument("--rss-budget-mb", type=float, default=25.0)
+    parser.add_argument("--heap-budget-mb", type=float, default=5.0)
+    parser.add_argument("--queue-budget", type=int, default=100)
+    parser.add_argument("--top", type=int, default=10, help="Allocation sites to list by heap growth.")
+    parser.add_argument("--no-tracemalloc", action="store_true", help="Skip heap tracing, which roughly doubles CPU use.")
+    parser.add_argument("--json", help="Also write the report to this file.")
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    if not args.no_tracemalloc:
+        tracemalloc.start()
+
+    report = asyncio.run(soak(args))
+    print(json.dumps(report, indent=2))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    sys.exit(1 if report["failures"] else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Minimal IRC server standing in for a chat service (e.g. Twitch chat) in tests
+and benchmarks. Clients that JOIN a channel receive whatever is broadcast to it.
+"""
+import asyncio
+
+class FakeIRCServer:
+    def __init__(self):
+        self.server = None
+        self.port = None
+        self.members = {}  # channel -> set of StreamWriters
+        self.received = []  # Lines sent by clients
+        self.joined = asyncio.Event()
+
+    async def start(self) -> "FakeIRCServer":
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        for writers in self.members.values():
+            for writer in writers:
+                writer.close()
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                raw = await reader.readline()
+                if not raw:
+                    break
+                line = raw.decode("utf-8").rstrip("\r\n")
+                self.received.append(line)
+                if line.startswith("JOIN "):
+                    self.members.setdefault(line[5:].strip(), set()).add(writer)
+                    self.joined.set()
+        except ConnectionError:
+            pass
+        finally:
+            for writers in self.members.values():
+                writers.discard(writer)
+
+    def _write_all(self, channel: str, data: bytes):
+        for writer in self.members.get(channel, ()):
+            writer.write(data)
+
+    async def say(self, channel: str, user: str, text: str):
+        self._write_all(channel, f"@badges=;color= :{user}!{user}@{user}.tmi PRIVMSG {channel} :{text}\r\n".encode("utf-8"))
+        await self.drain(channel)
+
+    async def flood(self, channel: str, messages: list):
+        """Sends every (user, text) pair in one write, as a raid would arrive."""
+        self._write_all(channel, "".join(f":{user}!{user}@{user}.tmi PRIVMSG {channel} :{text}\r\n" for user, text in messages).encode("utf-8"))
+        await self.drain(channel)
+
+    async def ping(self, channel: str):
+        self._write_all(channel, b"PING :tmi.fake\r\n")
+        await self.drain(channel)
+
+    async def drain(self, channel: str):
+        for writer in list(self.members.get(channel, ())):
+            await writer.drain()
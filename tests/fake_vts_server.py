@@ -0,0 +1,118 @@
+"""
+Minimal stand-in for the VTube Studio public API, for tests and benchmarks.
+
+Serves the requests the VTS agent makes over a real websocket on localhost
+and records every request with the time.monotonic() it arrived. With
+`concurrent`, each request is answered by a task of its own, so a slow
+request does not hold up the ones behind it, as in VTube Studio.
+"""
+import asyncio
+import json
+import time
+from collections import deque
+
+from websockets.asyncio.server import serve
+
+class FakeVTSServer:
+    def __init__(self, hotkeys: list = None, model_id: str = "model_1", response_delay_s: float = 0.0, max_recorded: int = None, concurrent: bool = False):
+        self.hotkeys = hotkeys if hotkeys is not None else [
+            {"name": "Angry", "type": "ToggleExpression", "file": "SignAngry.exp3.json", "hotkeyID": "hotkey_angry"},
+        ]
+        self.model_id = model_id
+        self.response_delay_s = response_delay_s
+        self.concurrent = concurrent
+        # Extra delay per message type, e.g. to make a parameter frame slower than a trigger.
+        self.delays = {}
+        self.expression_states = {hotkey["file"]: False for hotkey in self.hotkeys if hotkey.get("file")}
+        self.received = deque(maxlen=max_recorded)  # (arrival time, request message)
+        self.server = None
+        self.port = None
+        self.connections = set()
+
+    async def start(self) -> "FakeVTSServer":
+        self.server = await serve(self._handle, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    def requests_of(self, message_type: str) -> list:
+        return [(arrived_at, message) for arrived_at, message in self.received if message.get("messageType") == message_type]
+
+    async def push_event(self, event_type: str, data: dict):
+        """Sends an event, as VTS does for subscribed events, to every connected client."""
+        for websocket in list(self.connections):
+            await websocket.send(self._message("", event_type, data))
+
+    async def push_raw(self, raw: str):
+        """Sends a frame as is, e.g. one that is not a valid API message, to every connected client."""
+        for websocket in list(self.connections):
+            await websocket.send(raw)
+
+    def _message(self, request_id: str, message_type: str, data: dict) -> str:
+        return json.dumps({
+            "apiName": "VTubeStudioPublicAPI",
+            "apiVersion": "1.0",
+            "timestamp": int(time.time() * 1000),
+            "requestID": request_id,
+            "messageType": message_type,
+            "data": data,
+        })
+
+    async def _handle(self, websocket):
+        self.connections.add(websocket)
+        tasks = set()
+        try:
+            async for raw in websocket:
+                message = json.loads(raw)
+                self.received.append((time.monotonic(), message))
+                if self.concurrent:
+                    task = asyncio.create_task(self._answer(websocket, message))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                else:
+                    await self._answer(websocket, message)
+        finally:
+            self.connections.discard(websocket)
+            for task in tasks:
+                task.cancel()
+
+    async def _answer(self, websocket, message: dict):
+        delay_s = self.response_delay_s + self.delays.get(message.get("messageType"), 0.0)
+        if delay_s:
+            await asyncio.sleep(delay_s)
+        message_type, data = self._respond(message.get("messageType", ""), message.get("data") or {})
+        await websocket.send(self._message(message.get("requestID", ""), message_type, data))
+
+    def _respond(self, message_type: str, data: dict):
+        if message_type == "AuthenticationTokenRequest":
+            return "AuthenticationTokenResponse", {"authenticationToken": "fake-token"}
+        if message_type == "AuthenticationRequest":
+            return "AuthenticationResponse", {"authenticated": True, "reason": ""}
+        if message_type == "HotkeysInCurrentModelRequest":
+            return "HotkeysInCurrentModelResponse", {"modelLoaded": True, "modelID": self.model_id, "availableHotkeys": self.hotkeys}
+        if message_type == "HotkeyTriggerRequest":
+            return "HotkeyTriggerResponse", {"hotkeyID": data.get("hotkeyID")}
+        if message_type == "CurrentModelRequest":
+            return "CurrentModelResponse", {"modelLoaded": True, "modelID": self.model_id, "modelName": "Fake Model"}
+        if message_type == "EventSubscriptionRequest":
+            return "EventSubscriptionResponse", {"subscribedEventCount": 1, "subscribedEvents": [data.get("eventName")]}
+        if message_type == "ExpressionStateRequest":
+            expressions = [{"name": file.split(".")[0], "file": file, "active": active} for file, active in self.expression_states.items()]
+            return "ExpressionStateResponse", {"modelLoaded": True, "modelID": self.model_id, "expressions": expressions}
+        if message_type == "ExpressionActivationRequest":
+            if data.get("expressionFile") not in self.expression_states:
+                return "APIError", {"errorID": 452, "message": "Expression not found."}
+            self.expression_states[data["expressionFile"]] = bool(data.get("active"))
+            return "ExpressionActivationResponse", {}
+        if message_type == "InjectParameterDataRequest":
+            return "InjectParameterDataResponse", {}
+        return "APIError", {"errorID": 1, "message": f"Unsupported request: {message_type}"}
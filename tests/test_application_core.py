@@ -1,5 +1,6 @@
 
 import asyncio
+import tempfile
 import unittest
 from unittest.mock import AsyncMock, MagicMock, patch
 
@@ -7,44 +8,72 @@ from core.application_core import ApplicationCore
 
 class TestApplicationCore(unittest.TestCase):
 
-    @patch('core.application_core.ASRProcessor')
+    @patch('inputs.asr_processor.ASRProcessor')
     @patch('core.application_core.VTSWebSocketAgent')
     def test_application_run(self, mock_vts_agent, mock_asr_processor):
         async def run_test():
-            # Setup application
-            app = ApplicationCore("vts_config.yaml")
-
-            # Mock the VTS agent methods
-            mock_vts_agent.return_value.connect = AsyncMock()
-            mock_vts_agent.return_value.authenticate = AsyncMock()
-            mock_vts_agent.return_value.get_hotkey_list.return_value = {
-                'data': {
-                    'availableHotkeys': [
-                        {
-                            'name': 'test_expression',
-                            'type': 'ToggleExpression',
-                            'file': 'test.exp3.json',
-                            'hotkeyID': 'hotkey_1'
-                        }
-                    ]
+            # Setup application in a scratch directory so the real config, caches and models stay untouched
+            with tempfile.TemporaryDirectory() as tmp_dir, \
+                    patch('core.application_core.ConfigLoader.get_base_path', return_value=tmp_dir):
+                app = ApplicationCore("vts_config.yaml")
+
+                mock_asr_processor.return_value.process_input = AsyncMock()
+
+                # Mock the VTS agent methods
+                mock_vts_agent.return_value.connect = AsyncMock()
+                mock_vts_agent.return_value.authenticate = AsyncMock()
+                mock_vts_agent.return_value.sync_expression_states = AsyncMock()
+                mock_vts_agent.return_value.get_hotkey_list = AsyncMock()
+                mock_vts_agent.return_value.get_hotkey_list.return_value = {
+                    'data': {
+                        'availableHotkeys': [
+                            {
+                                'name': 'test_expression',
+                                'type': 'ToggleExpression',
+                                'file': 'test.exp3.json',
+                                'hotkeyID': 'hotkey_1'
+                            }
+                        ]
+                    }
                 }
-            }
 
-            # Run the app initialization
-            await app._initialize_components()
+                # Run the app initialization
+                await app._initialize_components()
+
+                # Get the queue for the hotkey_triggered event
+                hotkey_queue = await app.event_bus.subscribe("hotkey_triggered")
+
+                # Directly process a transcription
+                await app.intent_resolver._process_one_event("test_expression")
 
-            # Get the queue for the hotkey_triggered event
-            hotkey_queue = await app.event_bus.subscribe("hotkey_triggered")
+                # Wait for the event to be processed
+                event = await hotkey_queue.get()
 
-            # Directly process a transcription
-            await app.intent_resolver._process_one_event("test_expression")
+                # Check if hotkey is triggered
+                self.assertEqual(event.payload, 'hotkey_1')
 
-            # Wait for the event to be processed
-            event = await hotkey_queue.get()
+        asyncio.run(run_test())
+
+    def test_model_switch_keeps_other_models_keywords(self):
+        async def run_test():
+            with tempfile.TemporaryDirectory() as tmp_dir, \
+                    patch('core.application_core.ConfigLoader.get_base_path', return_value=tmp_dir):
+                app = ApplicationCore("vts_config.yaml")
+                app.config['expressions'] = {'Angry.exp3.json': {'name': 'Angry', 'keywords': ['grr'], 'cooldown_s': 60}}
+                model_a = [{'name': 'Angry', 'type': 'ToggleExpression', 'file': 'Angry.exp3.json', 'hotkeyID': 'hotkey_a'}]
+                model_b = [{'name': 'Happy', 'type': 'ToggleExpression', 'file': 'Happy.exp3.json', 'hotkeyID': 'hotkey_b'}]
 
-            # Check if hotkey is triggered
-            self.assertEqual(event.payload, 'hotkey_1')
+                self.assertIn('grr', await app._apply_vts_expressions(model_a))
+                expression_map = await app._apply_vts_expressions(model_b)
+                self.assertNotIn('grr', expression_map)
+                self.assertIn('NEW_KEYWORD_Happy', expression_map)
+                # Model A's keywords stay in the config file while model B is loaded.
+                saved = app.config_store.load()['expressions']
+                self.assertEqual(saved['Angry.exp3.json']['keywords'], ['grr'])
 
+                expression_map = await app._apply_vts_expressions(model_a)
+                self.assertEqual(expression_map['grr']['hotkeyID'], 'hotkey_a')
+                self.assertNotIn('NEW_KEYWORD_Angry', expression_map)
 
         asyncio.run(run_test())
 
@@ -0,0 +1,98 @@
+import unittest
+from concurrent.futures import Future
+from unittest.mock import MagicMock
+import numpy as np
+
+from inputs.asr_processor import ASRProcessor
+
+class EnergyVad:
+    def is_speech(self, frame, sample_rate):
+        return np.abs(np.frombuffer(frame, dtype=np.int16)).max() > 1000
+
+class StubASRProcessor(ASRProcessor):
+    def _create_recognizer(self):
+        recognizer = MagicMock()
+        recognizer.is_ready.return_value = False
+        recognizer.get_result.return_value = ""
+        recognizer.is_endpoint.return_value = False
+        return recognizer
+
+def make_processor(**kwargs):
+    processor = StubASRProcessor(event_bus=None, model_config={}, model_dir="", decode_chunk_ms=90, idle_after_s=0.6, **kwargs)
+    processor.vad = EnergyVad()
+    return processor
+
+def speech(ms):
+    return np.full(16 * ms, 0.5, dtype=np.float32)
+
+def silence(ms):
+    return np.zeros(16 * ms, dtype=np.float32)
+
+class TestDecodeScheduling(unittest.TestCase):
+    def test_decode_is_due_once_a_chunk_of_speech_is_buffered(self):
+        processor = make_processor()
+        self.assertFalse(processor._feed(speech(60)))
+        self.assertTrue(processor._feed(speech(30)))
+        self.assertEqual(processor._take_status_change(), "Transcribing")
+        self.assertIsNone(processor._take_status_change())
+
+    def test_end_of_speech_flushes_the_tail(self):
+        processor = make_processor()
+        processor._feed(speech(30))
+        self.assertFalse(processor._feed(silence(150)))
+        self.assertTrue(processor._feed(silence(150)))
+        self.assertEqual(processor.status, "Listening")
+        # The tail is padded with a chunk of silence.
+        self.assertEqual(processor.audio_buffer.size, 16 * 30 + processor.decode_chunk_samples)
+
+    def test_sustained_silence_goes_idle_and_resets_the_recognizer(self):
+        processor = make_processor()
+        processor._feed(speech(30))
+        processor._feed(silence(300))
+        processor._decode_pending()
+        self.assertTrue(processor._feed(silence(300)))
+        self.assertTrue(processor.idle)
+        processor._decode_pending()
+        processor.recognizer.reset.assert_called_once()
+
+        # Silence while idle never schedules a decode.
+        for _ in range(10):
+            self.assertFalse(processor._feed(silence(60)))
+        self.assertEqual(processor._take_status_change(), "Idle")
+
+class TestHybridConfirmation(unittest.TestCase):
+    def test_endpointed_utterances_are_confirmed_offline(self):
+        processor = make_processor(recognition_mode="hybrid")
+        processor.confirmer = MagicMock()
+        processor.confirmer.submit.return_value = future = Future()
+        processor.recognizer.get_result.return_value = "ANGRY"
+
+        processor._feed(speech(90))
+        results = processor._decode_pending()
+        self.assertEqual([event_type for event_type, _, _ in results], ["transcription_partial"])
+        self.assertTrue(results[0][2]["provisional"])
+
+        processor.recognizer.is_endpoint.return_value = True
+        processor._feed(speech(90))
+        self.assertEqual(processor._decode_pending(), [])
+        submitted = processor.confirmer.submit.call_args.args[0]
+        self.assertEqual(submitted.size, 2 * 16 * 90)
+
+        future.set_result("ANGRY CAT")
+        [(event_type, text, meta)] = processor._take_confirmations()
+        self.assertEqual((event_type, text, meta["confirmation"], meta["utterance"]), ("transcription_received", "ANGRY CAT", "offline", 0))
+
+    def test_streaming_text_stands_when_the_confirmer_is_saturated(self):
+        processor = make_processor(recognition_mode="hybrid")
+        processor.confirmer = MagicMock()
+        processor.confirmer.submit.return_value = None
+        processor.recognizer.get_result.return_value = "ANGRY"
+        processor.recognizer.is_endpoint.return_value = True
+
+        processor._feed(speech(90))
+        results = processor._decode_pending()
+        self.assertEqual(results[-1][0], "transcription_received")
+        self.assertEqual((results[-1][1], results[-1][2]["confirmation"]), ("ANGRY", "skipped"))
+
+if __name__ == '__main__':
+    unittest.main()
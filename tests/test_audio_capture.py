@@ -0,0 +1,17 @@
+import unittest
+
+from inputs.audio_capture import channel_indices
+
+class TestAudioCapture(unittest.TestCase):
+    def test_only_selected_channels_are_mixed(self):
+        self.assertEqual(channel_indices(None, 8), [0])
+        self.assertEqual(channel_indices([2], 2), [1])
+        self.assertEqual(channel_indices([3, 1, 3], 8), [0, 2])
+
+    def test_missing_channels_are_refused(self):
+        for input_channels in ([3], [0], ["1"]):
+            with self.assertRaises(ValueError):
+                channel_indices(input_channels, 2)
+
+if __name__ == '__main__':
+    unittest.main()
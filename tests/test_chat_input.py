@@ -0,0 +1,104 @@
+import asyncio
+import unittest
+
+from core.event_bus import Event, EventBus
+from core.intent_resolver import KeywordIntentResolver
+from inputs.chat_input_processor import ChatInputProcessor, parse_privmsg
+from tests.fake_irc_server import FakeIRCServer
+
+class TestChatInput(unittest.TestCase):
+    def test_parse_privmsg(self):
+        self.assertEqual(parse_privmsg("@badges=; :bob!bob@bob.tmi PRIVMSG #chan :!angry now"), ("bob", "#chan", "!angry now"))
+        self.assertIsNone(parse_privmsg(":tmi.fake 001 justinfan :Welcome"))
+
+    def test_commands_are_published_with_their_source(self):
+        async def run_test():
+            async with FakeIRCServer() as server:
+                event_bus = EventBus()
+                transcriptions = await event_bus.subscribe("transcription_received")
+                chat = ChatInputProcessor(event_bus, "127.0.0.1", server.port, "chan", source="twitch")
+                task = asyncio.create_task(chat.process_input())
+                await asyncio.wait_for(server.joined.wait(), 5)
+
+                await server.ping("#chan")
+                await server.say("#chan", "alice", "hello there")
+                await server.say("#chan", "bob", "!angry")
+                event = await asyncio.wait_for(transcriptions.get(), 5)
+                self.assertEqual((event.payload, event.meta), ("angry", {"source": "twitch", "user": "bob"}))
+                await asyncio.sleep(0.05)
+                self.assertIn("PONG :tmi.fake", server.received)
+                self.assertEqual(chat.messages_received, 2)
+
+                await chat.stop()
+                task.cancel()
+
+        asyncio.run(run_test())
+
+    def test_bad_lines_do_not_end_the_session(self):
+        async def run_test():
+            async with FakeIRCServer() as server:
+                event_bus = EventBus()
+                transcriptions = await event_bus.subscribe("transcription_received")
+                chat = ChatInputProcessor(event_bus, "127.0.0.1", server.port, "chan", source="twitch")
+                task = asyncio.create_task(chat.process_input())
+                await asyncio.wait_for(server.joined.wait(), 5)
+
+                # A line past the stream limit, then a message the handler fails on.
+                server._write_all("#chan", b"x" * 100_000 + b"\r\n")
+                original_publish = event_bus.publish
+                async def failing_publish(*args, **kwargs):
+                    event_bus.publish = original_publish
+                    raise RuntimeError("subscriber failed")
+                event_bus.publish = failing_publish
+                await server.say("#chan", "alice", "!happy")
+                await server.say("#chan", "bob", "!angry")
+                event = await asyncio.wait_for(transcriptions.get(), 5)
+                self.assertEqual(event.payload, "angry")
+                self.assertFalse(task.done())
+
+                await chat.stop()
+                task.cancel()
+
+        asyncio.run(run_test())
+
+    def test_batched_chat_triggers_once_within_the_rate_limit(self):
+        async def run_test():
+            event_bus = EventBus()
+            resolver = KeywordIntentResolver(event_bus, {"angry": {"hotkeyID": "hotkey_1", "cooldown_s": 0}})
+            resolver.set_rate_limit("twitch", triggers_per_s=0.001, burst=1)
+            hotkey_queue = await event_bus.subscribe("hotkey_triggered")
+
+            raid = [Event("transcription_received", "angry", {"source": "twitch", "user": f"user{i}"}) for i in range(500)]
+            await resolver.resolve_batch(raid, partial=False)
+            await resolver.resolve_batch(raid[:1], partial=False)
+            self.assertEqual(hotkey_queue.qsize(), 1)
+            self.assertEqual(resolver.source_counts["twitch"], 501)
+            self.assertEqual(resolver.rate_limits["twitch"].rejected, 1)
+
+            # Speech is not rate limited by chat.
+            await resolver.resolve_batch([Event("transcription_received", "angry")], partial=False)
+            self.assertEqual(hotkey_queue.qsize(), 2)
+
+        asyncio.run(run_test())
+
+    def test_batched_triggers_keep_arrival_order(self):
+        async def run_test():
+            event_bus = EventBus()
+            resolver = KeywordIntentResolver(event_bus, {
+                "angry": {"hotkeyID": "hotkey_angry", "cooldown_s": 0},
+                "happy": {"hotkeyID": "hotkey_happy", "cooldown_s": 0},
+            })
+            hotkey_queue = await event_bus.subscribe("hotkey_triggered")
+            batch = [
+                Event("transcription_received", "angry", {"source": "twitch", "user": "alice"}),
+                Event("transcription_received", "happy"),
+                Event("transcription_received", "angry", {"source": "twitch", "user": "bob"}),
+            ]
+            await resolver.resolve_batch(batch, partial=False)
+            self.assertEqual([hotkey_queue.get_nowait().payload for _ in range(3)],
+                             ["hotkey_angry", "hotkey_happy", "hotkey_angry"])
+
+        asyncio.run(run_test())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+from core.config_store import ConfigStore
+from core.expression_map import ExpressionMapBuilder
+
+class TestConfigStore(unittest.TestCase):
+
+    def test_save_only_when_changed(self):
+        async def run_test():
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                store = ConfigStore(os.path.join(tmp_dir, 'vts_config.yaml'))
+                config = {'expressions': {'Angry.exp3.json': {'name': 'Angry', 'keywords': ['angry']}}}
+
+                self.assertTrue(await store.save(config))
+                self.assertFalse(await store.save(config))
+                self.assertEqual(store.load(), config)
+
+                config['expressions']['Angry.exp3.json']['keywords'].append('mad')
+                self.assertTrue(await store.save(config))
+                self.assertEqual(ConfigStore(store.path).load(), config)
+                # No temporary files are left behind.
+                self.assertEqual(os.listdir(tmp_dir), ['vts_config.yaml'])
+
+        asyncio.run(run_test())
+
+    def test_snapshot_round_trip(self):
+        async def run_test():
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                store = ConfigStore(os.path.join(tmp_dir, 'vts_config.yaml'))
+                builder = ExpressionMapBuilder({'Angry.exp3.json': 'hotkey_1'})
+                builder.update({'Angry.exp3.json': {'name': 'Angry', 'keywords': ['angry']}})
+                key = ConfigStore.snapshot_key(builder.expressions, builder.hotkey_ids)
+
+                await store.save_snapshot(key, builder.to_snapshot())
+
+                self.assertIsNone(store.load_snapshot('other key'))
+                restored = ExpressionMapBuilder.from_snapshot(store.load_snapshot(key))
+                self.assertEqual(restored.build(), builder.build())
+                # The snapshot is plain JSON, not pickled objects.
+                with open(store.snapshot_path, encoding='utf-8') as f:
+                    self.assertEqual(json.load(f)['value']['hotkey_ids'], {'Angry.exp3.json': 'hotkey_1'})
+                # Incremental updates keep working on a restored builder.
+                builder.update({'Angry.exp3.json': {'name': 'Angry', 'keywords': ['mad']}})
+                self.assertEqual(restored.update({'Angry.exp3.json': {'name': 'Angry', 'keywords': ['mad']}}).changed, ['Angry.exp3.json'])
+                self.assertEqual(restored.build(), builder.build())
+
+        asyncio.run(run_test())
+
+if __name__ == '__main__':
+    unittest.main()
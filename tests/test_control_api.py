@@ -0,0 +1,107 @@
+import asyncio
+import json
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+from core.control_api import WATCHER_QUEUE_SIZE, ControlAPI
+from core.event_bus import Event
+
+async def http_request(port: int, method: str, path: str, body: dict = None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    data = json.dumps(body).encode() if body is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(data)}\r\n\r\n".encode() + data)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(payload)
+
+class TestControlAPI(unittest.TestCase):
+
+    def _controller(self):
+        controller = MagicMock()
+        controller.describe.return_value = {"running": False, "language": "en"}
+        controller.start = AsyncMock(return_value=True)
+        controller.stop = AsyncMock(return_value=False)
+        controller.set_language = AsyncMock()
+        controller.supports_language.side_effect = lambda language: language in ("en", "ja")
+        controller.profile = AsyncMock(return_value={"path": "logs/profiles/profile.folded", "samples": 10})
+        controller.watchers = set()
+        return controller
+
+    def test_routes(self):
+        async def run_test():
+            controller = self._controller()
+            api = ControlAPI(controller, port=0)
+            await api.start()
+            try:
+                self.assertEqual(await http_request(api.port, "GET", "/status"), (200, {"running": False, "language": "en"}))
+
+                status, _ = await http_request(api.port, "POST", "/start", {"language": "ja"})
+                self.assertEqual(status, 202)
+                controller.start.assert_awaited_once_with(None, "ja")
+
+                status, _ = await http_request(api.port, "POST", "/stop")
+                self.assertEqual(status, 409)
+
+                status, _ = await http_request(api.port, "POST", "/language", {"language": "ja"})
+                self.assertEqual(status, 200)
+                controller.set_language.assert_awaited_once_with("ja")
+
+                # Languages without a model in models.yaml are refused.
+                status, body = await http_request(api.port, "POST", "/language", {"language": "xx"})
+                self.assertEqual(status, 400)
+                self.assertIn("xx", body["error"])
+                status, _ = await http_request(api.port, "POST", "/start", {"language": "xx"})
+                self.assertEqual(status, 400)
+                controller.set_language.assert_awaited_once()
+                controller.start.assert_awaited_once()
+
+                self.assertEqual(await http_request(api.port, "POST", "/profile", {"duration_s": 2}),
+                                 (200, {"path": "logs/profiles/profile.folded", "samples": 10}))
+                controller.profile.assert_awaited_once_with(2)
+                status, _ = await http_request(api.port, "POST", "/profile", {"duration_s": 3600})
+                self.assertEqual(status, 400)
+
+                status, _ = await http_request(api.port, "GET", "/missing")
+                self.assertEqual(status, 404)
+
+                for content_length in (b"abc", b"-1", b"\xb2", b"99999999"):
+                    reader, writer = await asyncio.open_connection("127.0.0.1", api.port)
+                    writer.write(b"POST /stop HTTP/1.1\r\nContent-Length: " + content_length + b"\r\n\r\n")
+                    await writer.drain()
+                    self.assertIn(b" 400 ", (await reader.read()).split(b"\r\n")[0])
+                    writer.close()
+            finally:
+                await api.close()
+
+        asyncio.run(run_test())
+
+    def test_event_stream(self):
+        async def run_test():
+            controller = self._controller()
+            api = ControlAPI(controller, port=0)
+            await api.start()
+            try:
+                reader, writer = await asyncio.open_connection("127.0.0.1", api.port)
+                writer.write(b"GET /events HTTP/1.1\r\nHost: localhost\r\n\r\n")
+                await writer.drain()
+                await reader.readuntil(b"\r\n\r\n")
+                while not controller.watchers:
+                    await asyncio.sleep(0.01)
+
+                next(iter(controller.watchers)).put_nowait(Event("hotkey_triggered", "hotkey_1"))
+                message = await asyncio.wait_for(reader.readuntil(b"\n\n"), timeout=1)
+                self.assertEqual(message, b'event: hotkey_triggered\ndata: "hotkey_1"\n\n')
+                self.assertEqual(next(iter(controller.watchers)).maxsize, WATCHER_QUEUE_SIZE)
+            finally:
+                # Closing doesn't wait for the client to hang up first.
+                await asyncio.wait_for(api.close(), timeout=2)
+            self.assertEqual(await asyncio.wait_for(reader.read(), timeout=1), b"")
+            self.assertFalse(controller.watchers)
+            writer.close()
+
+        asyncio.run(run_test())
+
+if __name__ == '__main__':
+    unittest.main()
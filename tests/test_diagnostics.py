@@ -0,0 +1,53 @@
+import asyncio
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from core.diagnostics import LoopWatchdog, capture_profile
+
+def block_the_loop(seconds: float):
+    time.sleep(seconds)
+
+def spin_until(stop: threading.Event):
+    while not stop.is_set():
+        sum(range(1000))
+
+class TestDiagnostics(unittest.TestCase):
+    def test_watchdog_captures_the_stack_that_blocked_the_loop(self):
+        async def run_test():
+            watchdog = LoopWatchdog(threshold_s=0.1, interval_s=0.02)
+            task = asyncio.create_task(watchdog.run())
+            await asyncio.sleep(0.1)
+            block_the_loop(0.4)
+            await asyncio.sleep(0.1)
+            task.cancel()
+            return watchdog
+
+        watchdog = asyncio.run(run_test())
+        self.assertEqual(watchdog.stalls, 1)
+        self.assertGreaterEqual(watchdog.lag.max_ms, 300)
+        self.assertIn("block_the_loop", watchdog._stall_stack)
+
+    def test_profile_is_written_as_folded_stacks(self):
+        stop = threading.Event()
+        worker = threading.Thread(target=spin_until, args=(stop,), name="busy-worker")
+        worker.start()
+        try:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                result = capture_profile(0.2, tmp_dir, interval_s=0.002)
+                with open(result["path"], encoding="utf-8") as f:
+                    lines = f.read().splitlines()
+        finally:
+            stop.set()
+            worker.join()
+
+        self.assertEqual(os.path.dirname(result["path"]), tmp_dir)
+        self.assertEqual(sum(int(line.rsplit(" ", 1)[1]) for line in lines), result["samples"])
+        busy = [line for line in lines if line.startswith("busy-worker;")]
+        self.assertTrue(busy)
+        self.assertIn("spin_until (test_diagnostics.py:", busy[0])
+
+if __name__ == '__main__':
+    unittest.main()
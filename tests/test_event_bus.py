@@ -16,5 +16,38 @@ class TestEventBus(unittest.TestCase):
 
         asyncio.run(run_test())
 
+    def test_every_subscriber_receives_events(self):
+        async def run_test():
+            event_bus = EventBus()
+            first_queue = await event_bus.subscribe("test_event")
+            second_queue = await event_bus.subscribe("test_event")
+            await event_bus.publish("test_event", "test_payload")
+            self.assertEqual((await first_queue.get()).payload, "test_payload")
+            self.assertEqual((await second_queue.get()).payload, "test_payload")
+
+            event_bus.unsubscribe("test_event", second_queue)
+            await event_bus.publish("test_event", "second_payload")
+            self.assertEqual(first_queue.qsize(), 1)
+            self.assertTrue(second_queue.empty())
+
+        asyncio.run(run_test())
+
+    def test_idle_subscribers_drop_their_oldest_events(self):
+        async def run_test():
+            event_bus = EventBus(max_queue_size=3)
+            queue = await event_bus.subscribe("test_event")
+            for index in range(5):
+                await event_bus.publish("test_event", index)
+            self.assertEqual([queue.get_nowait().payload for _ in range(3)], [2, 3, 4])
+            self.assertEqual(event_bus.stats()["dropped"], {"test_event": 2})
+
+            # Subscribers that always consume opt out of eviction.
+            consumer = await event_bus.subscribe("test_event", bounded=False)
+            for index in range(5):
+                await event_bus.publish("test_event", index)
+            self.assertEqual([consumer.get_nowait().payload for _ in range(5)], [0, 1, 2, 3, 4])
+
+        asyncio.run(run_test())
+
 if __name__ == '__main__':
     unittest.main()
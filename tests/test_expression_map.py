@@ -0,0 +1,61 @@
+import unittest
+
+from core.expression_map import ExpressionMapBuilder, diff_expressions
+
+class TestExpressionMap(unittest.TestCase):
+
+    def setUp(self):
+        self.expressions = {
+            'Angry.exp3.json': {'name': 'Angry', 'keywords': ['angry'], 'cooldown_s': 60},
+            'Cry.exp3.json': {'name': 'Cry', 'keywords': ['cry', 'sad'], 'cooldown_s': 30},
+        }
+        self.hotkey_ids = {'Angry.exp3.json': 'hotkey_1', 'Cry.exp3.json': 'hotkey_2'}
+
+    def test_build_map(self):
+        builder = ExpressionMapBuilder(self.hotkey_ids)
+        builder.update(self.expressions)
+        expression_map = builder.build()
+        self.assertEqual(expression_map['sad'], {"hotkeyID": 'hotkey_2', "cooldown_s": 30, "expression": 'Cry.exp3.json', "action": "toggle", "auto_off_s": None})
+        self.assertEqual(expression_map['Angry']['hotkeyID'], 'hotkey_1')
+        self.assertEqual(len(expression_map), 5)
+
+    def test_modes_and_off_keywords(self):
+        self.expressions['Angry.exp3.json'].update({'mode': True, 'off_keywords': ['calm']})  # unquoted `mode: on`
+        self.expressions['Cry.exp3.json']['auto_off_s'] = 5
+        self.expressions['Shock.exp3.json'] = {'name': 'Shock', 'keywords': ['shock'], 'mode': 'toggle', 'auto_off_s': 5}
+        builder = ExpressionMapBuilder({**self.hotkey_ids, 'Shock.exp3.json': 'hotkey_3'})
+        builder.update(self.expressions)
+        expression_map = builder.build()
+        self.assertEqual(expression_map['angry']['action'], 'on')
+        self.assertEqual(expression_map['calm']['action'], 'off')
+        self.assertEqual((expression_map['cry']['action'], expression_map['cry']['auto_off_s']), ('on', 5))
+        self.assertEqual(expression_map['shock']['action'], 'toggle')
+
+    def test_incremental_update(self):
+        builder = ExpressionMapBuilder(self.hotkey_ids)
+        builder.update(self.expressions)
+        untouched = builder.build()['angry']
+
+        edited = {k: dict(v) for k, v in self.expressions.items()}
+        edited['Cry.exp3.json']['keywords'] = ['tears']
+        diff = builder.update(edited)
+
+        self.assertEqual(diff.changed, ['Cry.exp3.json'])
+        expression_map = builder.build()
+        self.assertNotIn('sad', expression_map)
+        self.assertIn('tears', expression_map)
+        # Unchanged expressions keep their cached entries.
+        self.assertIs(expression_map['angry'], untouched)
+        self.assertFalse(builder.update(edited))
+
+    def test_diff_expressions(self):
+        new = dict(self.expressions)
+        del new['Angry.exp3.json']
+        new['Shock.exp3.json'] = {'name': 'Shock', 'keywords': ['shock']}
+        diff = diff_expressions(self.expressions, new)
+        self.assertEqual(diff.added, ['Shock.exp3.json'])
+        self.assertEqual(diff.removed, ['Angry.exp3.json'])
+        self.assertEqual(diff.changed, [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,28 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from core.hotkey_cache import HotkeyCache
+
+class TestHotkeyCache(unittest.TestCase):
+
+    def test_round_trip(self):
+        hotkeys = [{'name': 'Angry', 'type': 'ToggleExpression', 'file': 'Angry.exp3.json', 'hotkeyID': 'hotkey_1'}]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'hotkey_cache.json')
+            cache = HotkeyCache(path)
+            self.assertIsNone(cache.get_last())
+
+            self.assertTrue(cache.put('model_1', 'Model One', hotkeys))
+            self.assertFalse(cache.put('model_1', 'Model One', hotkeys))
+            asyncio.run(cache.save())
+            self.assertEqual(os.listdir(tmp_dir), ['hotkey_cache.json'])
+
+            reloaded = HotkeyCache(path)
+            self.assertEqual(reloaded.last_model_id, 'model_1')
+            self.assertEqual(reloaded.get_last(), hotkeys)
+            self.assertIsNone(reloaded.get('model_2'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import asyncio
+import os
+import stat
+import tempfile
+import unittest
+from multiprocessing.connection import Client
+import numpy as np
+
+from core.event_bus import EventBus
+from inputs.inference_host import HostedASRProcessor, JSONConnection, host_stats, parse_address, resolve_authkey, validate_session
+from tests.benchmarks.bench_inference_host import AUTHKEY, free_address, open_session, start_host
+
+WEIGHTS_MB = 64
+
+class TestInferenceHost(unittest.TestCase):
+    def test_sessions_share_one_model_and_each_get_their_own_results(self):
+        async def run_test():
+            address = free_address()
+            host = start_host(address)
+            processors, tasks = [], []
+            try:
+                for _ in range(3):
+                    processor = HostedASRProcessor(EventBus(), model_config={}, model_dir="", host_address=address,
+                                                   host_authkey=AUTHKEY, load=0.0, weights_mb=WEIGHTS_MB)
+                    processors.append(processor)
+                    tasks.append(await open_session(processor))
+                    if len(processors) == 1:
+                        first = host_stats(address, AUTHKEY)
+
+                stats = host_stats(address, AUTHKEY)
+                self.assertEqual((stats["sessions"], stats["models"]), (3, 1))
+                # Each session after the first costs its streams and buffers, not another copy of the weights.
+                per_additional_mb = (stats["rss_bytes"] - first["rss_bytes"]) / 2 / 2 ** 20
+                self.assertLess(per_additional_mb, WEIGHTS_MB / 4)
+
+                transcriptions = await processors[1].event_bus.subscribe("transcription_received")
+                others = [await processor.event_bus.subscribe("transcription_received") for processor in (processors[0], processors[2])]
+                processors[1].write_audio(np.full(16000 // 2, 0.95, dtype=np.float32))
+                event = await asyncio.wait_for(transcriptions.get(), timeout=10)
+                self.assertEqual(event.payload, "angry")
+                self.assertTrue(all(queue.empty() for queue in others))
+            finally:
+                for processor in processors:
+                    await processor._shutdown_worker()
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                host.terminate()
+                host.wait()
+
+        asyncio.run(run_test())
+
+    def test_sessions_only_accept_known_settings(self):
+        address = free_address()
+        host = start_host(address)
+        try:
+            conn = JSONConnection(Client(parse_address(address), authkey=AUTHKEY.encode("utf-8")))
+            conn.send(("open", {"ring_name": "ring", "capacity": 16000, "processor_kwargs": {"model_dir": "", "processor_class": "os.system"}}))
+            event_type, message, _ = conn.recv()
+            conn.close()
+            self.assertEqual(event_type, "asr_error")
+            self.assertIn("processor_class", message)
+            self.assertEqual(host_stats(address, AUTHKEY)["sessions_served"], 0)
+        finally:
+            host.terminate()
+            host.wait()
+        with self.assertRaises(ValueError):
+            validate_session({"ring_name": "ring", "capacity": -1, "processor_kwargs": {}})
+
+    def test_key_file_is_created_once_and_remote_hosts_need_a_key(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            key_file = os.path.join(tmp, "inference_host.key")
+            key = resolve_authkey("127.0.0.1:8767", key_file=key_file)
+            self.assertEqual(len(key), 64)
+            self.assertEqual(resolve_authkey("localhost:8767", key_file=key_file), key)
+            if os.name == "posix":
+                self.assertEqual(stat.S_IMODE(os.stat(key_file).st_mode), 0o600)
+        self.assertEqual(resolve_authkey("192.168.1.20:8767", "explicit"), "explicit")
+        with self.assertRaisesRegex(ValueError, "authkey"):
+            resolve_authkey("0.0.0.0:8767", key_file=key_file)
+
+    def test_missing_host_is_reported(self):
+        processor = HostedASRProcessor(EventBus(), model_config={}, model_dir="", host_address=free_address(), host_authkey=AUTHKEY)
+        with self.assertRaisesRegex(RuntimeError, "No inference host"):
+            processor._start_worker()
+        self.assertIsNone(processor.ring)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,7 +3,7 @@ import asyncio
 import unittest
 from unittest.mock import AsyncMock, MagicMock
 
-from core.intent_resolver import KeywordIntentResolver
+from core.intent_resolver import KeywordIntentResolver, keyword_end_times
 from core.event_bus import Event, EventBus
 
 class TestIntentResolver(unittest.TestCase):
@@ -34,5 +34,126 @@ class TestIntentResolver(unittest.TestCase):
 
         asyncio.run(run_test())
 
+    def test_chat_burst_does_not_evict_speech(self):
+        async def run_test():
+            event_bus = EventBus(max_queue_size=3)
+            intent_resolver = KeywordIntentResolver(event_bus, {"hello": "hotkey_1"})
+            await event_bus.publish("transcription_received", "hello world")
+            for _ in range(10):
+                await event_bus.publish("transcription_received", "raid hype", meta={"source": "twitch"})
+            self.assertEqual(intent_resolver.transcription_queue.qsize(), 11)
+            self.assertEqual(intent_resolver.transcription_queue.get_nowait().payload, "hello world")
+            self.assertEqual(event_bus.stats()["dropped"], {})
+
+        asyncio.run(run_test())
+
+    def test_update_expression_map(self):
+        async def run_test():
+            event_bus = EventBus()
+            intent_resolver = KeywordIntentResolver(event_bus, {"hello": "hotkey_1"})
+            hotkey_queue = await event_bus.subscribe("hotkey_triggered")
+
+            intent_resolver.update_expression_map({"goodbye": {"hotkeyID": "hotkey_2", "cooldown_s": 60}})
+
+            await intent_resolver._process_one_event("hello world")
+            self.assertTrue(hotkey_queue.empty())
+
+            await intent_resolver._process_one_event("goodbye world")
+            event = await hotkey_queue.get()
+            self.assertEqual(event.payload, "hotkey_2")
+
+        asyncio.run(run_test())
+
+    def test_keyword_end_times_follow_tokens(self):
+        meta = {"tokens": ["\u2581I", "\u2581AM", "\u2581AN", "GRY", "\u2581AN", "GRY"],
+                "token_times": [1.0, 1.2, 1.4, 1.6, 2.0, 2.2]}
+        self.assertEqual(keyword_end_times(meta, "angry"), [1.6, 2.2])
+        self.assertEqual(keyword_end_times({}, "angry"), [])
+
+    def test_streaming_results_trigger_each_occurrence_once(self):
+        async def run_test():
+            event_bus = EventBus()
+            intent_resolver = KeywordIntentResolver(event_bus, {"angry": {"hotkeyID": "hotkey_1", "cooldown_s": 0}})
+            hotkey_queue = await event_bus.subscribe("hotkey_triggered")
+            tokens = ["\u2581AN", "GRY", "\u2581CAT"]
+
+            # A partial result only fires once the keyword is well inside the decoded audio.
+            await intent_resolver._process_one_event("ANGRY", {"utterance": 1, "tokens": tokens[:2], "token_times": [10.0, 10.2], "decoded_until": 10.3}, partial=True)
+            self.assertTrue(hotkey_queue.empty())
+            await intent_resolver._process_one_event("ANGRY CAT", {"utterance": 1, "tokens": tokens, "token_times": [10.0, 10.2, 10.5], "decoded_until": 10.6}, partial=True)
+            event = await hotkey_queue.get()
+            self.assertEqual(event.payload, "hotkey_1")
+            self.assertEqual(event.meta["spoken_end"], 10.2)
+
+            # The final result of the same utterance doesn't fire again; the next utterance does.
+            await intent_resolver._process_one_event("ANGRY CAT", {"utterance": 1, "tokens": tokens, "token_times": [10.0, 10.2, 10.5]})
+            self.assertTrue(hotkey_queue.empty())
+            await intent_resolver._process_one_event("ANGRY", {"utterance": 2})
+            event = await hotkey_queue.get()
+            self.assertIsNone(event.meta["spoken_end"])
+
+        asyncio.run(run_test())
+
+    def test_hybrid_triggers_fire_early_and_arm_cooldowns_on_confirmation(self):
+        async def run_test():
+            event_bus = EventBus()
+            intent_resolver = KeywordIntentResolver(event_bus, {
+                "angry": {"hotkeyID": "hotkey_1", "cooldown_s": 60},
+                "happy": {"hotkeyID": "hotkey_2", "cooldown_s": 60},
+            })
+            hotkey_queue = await event_bus.subscribe("hotkey_triggered")
+
+            # Provisional results fire at once, without waiting for stability.
+            await intent_resolver._process_one_event("ANGRY", {"utterance": 1, "provisional": True}, partial=True)
+            event = await hotkey_queue.get()
+            self.assertTrue(event.meta["provisional"])
+            self.assertIsNone(intent_resolver.last_triggered_expression)
+
+            # The offline pass agrees on "angry" and also heard "happy", which fires late.
+            await intent_resolver._process_one_event("ANGRY HAPPY", {"utterance": 1, "confirmation": "offline"})
+            self.assertEqual(intent_resolver.last_triggered_expression, "hotkey_2")
+            event = await hotkey_queue.get()
+            self.assertEqual(event.payload, "hotkey_2")
+
+            # It overrules "happy" here: the next "happy" waits for confirmation.
+            await intent_resolver._process_one_event("HAPPY", {"utterance": 2, "provisional": True}, partial=True)
+            await hotkey_queue.get()
+            await intent_resolver._process_one_event("SAD", {"utterance": 2, "confirmation": "offline"})
+            self.assertIn("happy", intent_resolver.unconfirmed_keywords)
+            self.assertNotIn("hotkey_2", intent_resolver.expression_cooldowns)
+            await intent_resolver._process_one_event("HAPPY", {"utterance": 3, "provisional": True}, partial=True)
+            self.assertTrue(hotkey_queue.empty())
+            await intent_resolver._process_one_event("HAPPY", {"utterance": 3, "confirmation": "offline"})
+            event = await hotkey_queue.get()
+            self.assertNotIn("provisional", event.meta)
+            self.assertIn("hotkey_2", intent_resolver.expression_cooldowns)
+
+        asyncio.run(run_test())
+
+    def test_languages_keep_their_own_utterances_and_fire_a_hotkey_once(self):
+        async def run_test():
+            event_bus = EventBus()
+            intent_resolver = KeywordIntentResolver(event_bus, {
+                "angry": {"hotkeyID": "hotkey_1", "cooldown_s": 0},
+                "wütend": {"hotkeyID": "hotkey_1", "cooldown_s": 0},
+            }, clock=lambda: 100.0)
+            hotkey_queue = await event_bus.subscribe("hotkey_triggered")
+
+            await intent_resolver._process_one_event("ANGRY", {"utterance": 1, "language": "en"})
+            self.assertEqual((await hotkey_queue.get()).payload, "hotkey_1")
+            # The German recognizer heard the same words: the hotkey doesn't fire twice.
+            await intent_resolver._process_one_event("WÜTEND", {"utterance": 5, "language": "de"})
+            self.assertTrue(hotkey_queue.empty())
+            # Its utterance doesn't start a new English one either.
+            await intent_resolver._process_one_event("ANGRY CAT", {"utterance": 1, "language": "en"})
+            self.assertTrue(hotkey_queue.empty())
+
+            # Later German speech fires on its own.
+            intent_resolver.clock = lambda: 105.0
+            await intent_resolver._process_one_event("WÜTEND", {"utterance": 6, "language": "de"})
+            self.assertEqual((await hotkey_queue.get()).payload, "hotkey_1")
+
+        asyncio.run(run_test())
+
 if __name__ == '__main__':
     unittest.main()
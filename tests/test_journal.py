@@ -0,0 +1,105 @@
+import asyncio
+import os
+import tempfile
+import unittest
+import numpy as np
+
+from core.event_bus import EventBus
+from core.journal import AUDIO_EVENT_TYPE, EXPRESSION_MAP_EVENT_TYPE, RATE_LIMITS_EVENT_TYPE, EventJournal, JournalReader
+from vts_replay import replay
+
+EXPRESSION_MAP = {"angry": {"hotkeyID": "hotkey_angry", "cooldown_s": 5, "action": "toggle"}}
+
+class TestJournal(unittest.TestCase):
+    def test_bus_events_and_audio_round_trip(self):
+        async def run_test(path):
+            event_bus = EventBus()
+            journal = EventJournal(path, include_audio=True).open()
+            task = asyncio.create_task(journal.record(event_bus))
+            await asyncio.sleep(0)
+            journal.write_event(EXPRESSION_MAP_EVENT_TYPE, EXPRESSION_MAP)
+            await event_bus.publish("transcription_received", "so angry", meta={"utterance": 3, "token_times": [0.5, 0.9]})
+            await asyncio.sleep(0)
+            journal.write_audio(np.linspace(-1, 1, 960, dtype=np.float32))
+            await event_bus.publish("hotkey_triggered", "hotkey_angry", meta={"keyword": "angry"})
+            await asyncio.sleep(0)
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            journal.close()
+            self.assertEqual(event_bus.stats()["queue_depths"], {})
+
+        async def run_burst(path):
+            event_bus = EventBus(max_queue_size=4)
+            journal = EventJournal(path).open()
+            task = asyncio.create_task(journal.record(event_bus))
+            await asyncio.sleep(0)
+            # A chat burst larger than the bus's queue bound is journaled whole.
+            for index in range(20):
+                await event_bus.publish("transcription_received", "raid", meta={"source": "twitch", "user": f"user{index}"})
+            await asyncio.sleep(0)
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            journal.close()
+            self.assertEqual(event_bus.stats()["dropped"], {})
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "session.vtsj")
+            asyncio.run(run_test(path))
+            with open(path, "ab") as f:
+                f.write(b"\x01\x00\x00")  # A record cut short by a crash
+            records = list(JournalReader(path))
+
+        self.assertEqual([record.event_type for record in records],
+                         [EXPRESSION_MAP_EVENT_TYPE, "transcription_received", AUDIO_EVENT_TYPE, "hotkey_triggered"])
+        self.assertEqual((records[1].payload, records[1].meta), ("so angry", {"utterance": 3, "token_times": [0.5, 0.9]}))
+        self.assertEqual(len(records[2].payload), 960 * 2)
+        self.assertEqual(records[0].payload, EXPRESSION_MAP)
+        self.assertEqual(sorted(record.at for record in records), [record.at for record in records])
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "burst.vtsj")
+            asyncio.run(run_burst(path))
+            self.assertEqual(len(list(JournalReader(path))), 20)
+
+    def test_replay_reproduces_cooldowns_at_full_speed(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "session.vtsj")
+            journal = EventJournal(path).open()
+            journal.write_event(EXPRESSION_MAP_EVENT_TYPE, EXPRESSION_MAP, at=100.0)
+            # The second trigger in a row puts the hotkey on a 5 s cooldown, which has expired by t=110.
+            for at, triggered in ((100.0, True), (101.0, True), (102.0, False), (110.0, True)):
+                journal.write_event("transcription_received", "angry", at=at)
+                if triggered:
+                    journal.write_event("hotkey_triggered", "hotkey_angry", meta={"keyword": "angry"}, at=at)
+            journal.close()
+
+            report = asyncio.run(replay(JournalReader(path), speed=0))
+
+        self.assertTrue(report["matches"])
+        self.assertEqual([trigger["at_s"] for trigger in report["replayed_triggers"]], [0.0, 1.0, 10.0])
+        self.assertEqual(report["transcriptions"], 4)
+        self.assertLess(report["replay_s"], 1.0)
+
+    def test_replay_reproduces_chat_batches_and_rate_limits(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "session.vtsj")
+            journal = EventJournal(path).open()
+            journal.write_event(EXPRESSION_MAP_EVENT_TYPE, {"angry": {"hotkeyID": "hotkey_angry", "cooldown_s": 0}}, at=100.0)
+            journal.write_event(RATE_LIMITS_EVENT_TYPE, {"twitch": {"triggers_per_s": 0.5, "burst": 1.0}}, at=100.0)
+            # A raid's lines arrive in bursts; each burst is merged into one trigger, subject to the
+            # source's rate limit. Here the burst at t=101 is rate limited; youtube has no limit.
+            for start, source, triggered in ((100.0, "twitch", True), (101.0, "twitch", False), (102.0, "twitch", True), (103.0, "youtube", True)):
+                for offset in (0.0, 0.001, 0.002):
+                    journal.write_event("transcription_received", "angry", meta={"source": source, "user": "raider"}, at=start + offset)
+                if triggered:
+                    journal.write_event("hotkey_triggered", "hotkey_angry", meta={"keyword": "angry"}, at=start + 0.003)
+            journal.close()
+
+            report = asyncio.run(replay(JournalReader(path), speed=0))
+
+        self.assertTrue(report["matches"])
+        self.assertEqual([trigger["at_s"] for trigger in report["replayed_triggers"]], [0.002, 2.002, 3.002])
+        self.assertEqual(report["transcriptions"], 12)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,21 @@
+import unittest
+
+from core.latency import FAST_BUCKETS_MS, LatencyHistogram
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_percentiles_never_exceed_the_maximum(self):
+        histogram = LatencyHistogram()
+        for _ in range(100):
+            histogram.record(0.0012)
+        summary = histogram.summary()
+        self.assertEqual((summary["p50_ms"], summary["p99_ms"], summary["max_ms"]), (1.2, 1.2, 1.2))
+
+    def test_fast_buckets_resolve_sub_millisecond_latency(self):
+        histogram = LatencyHistogram(buckets_ms=FAST_BUCKETS_MS)
+        for latency_s in [0.0003] * 90 + [0.004] * 10:
+            histogram.record(latency_s)
+        self.assertEqual(histogram.percentile(0.5), 0.5)
+        self.assertEqual(histogram.percentile(0.99), 4.0)
+
+if __name__ == '__main__':
+    unittest.main()
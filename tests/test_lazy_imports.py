@@ -0,0 +1,28 @@
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ("sherpa_onnx", "onnxruntime", "sounddevice", "webrtcvad", "numpy", "cv2", "pyvts", "PyQt6")
+
+class TestLazyImports(unittest.TestCase):
+
+    def _imported_heavy_modules(self, module: str) -> list:
+        code = (
+            f"import sys, {module}\n"
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+        )
+        result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        return [m for m in result.stdout.strip().split(",") if m]
+
+    def test_application_core_is_light(self):
+        self.assertEqual(self._imported_heavy_modules("core.application_core"), [])
+
+    def test_entry_point_is_light(self):
+        self.assertEqual(self._imported_heavy_modules("vts_main"), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+import unittest
+
+from ui.log_view import LogModel
+
+class TestLogModel(unittest.TestCase):
+    def test_lines_are_buffered_until_flush(self):
+        model = LogModel(max_lines=10)
+        inserted = []
+        model.rowsInserted.connect(lambda parent, first, last: inserted.append((first, last)))
+
+        for i in range(3):
+            model.append(f"line {i}")
+        self.assertEqual(model.rowCount(), 0)
+
+        self.assertEqual(model.flush(), 3)
+        self.assertEqual(model.rowCount(), 3)
+        self.assertEqual(inserted, [(0, 2)])
+        self.assertEqual(model.flush(), 0)
+
+    def test_oldest_lines_are_dropped_at_capacity(self):
+        model = LogModel(max_lines=4)
+        for i in range(3):
+            model.append(f"line {i}")
+        model.flush()
+        for i in range(3, 10):
+            model.append(f"line {i}")
+        model.flush()
+
+        self.assertEqual(model.rowCount(), 4)
+        self.assertEqual([model.data(model.index(row)) for row in range(4)],
+                         ["line 6", "line 7", "line 8", "line 9"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from loguru import logger
+
+from core import logging_setup
+from core.logging_setup import BackgroundLogWriter, CategoryLogger, RotatingFile, render_json, render_text
+
+class TestLoggingSetup(unittest.TestCase):
+    def setUp(self):
+        self.text, self.json = io.StringIO(), io.StringIO()
+        self.writer = BackgroundLogWriter([(render_text, self.text), (render_json, self.json)])
+        self.sink = logger.add(self.writer, format="{message}", level="DEBUG")
+
+    def tearDown(self):
+        logger.remove(self.sink)
+        self.writer.close()
+
+    def test_high_frequency_categories_are_rate_limited(self):
+        with patch.dict(logging_setup._rate_limits, {"partial": (0.001, 3)}):
+            partial_log = CategoryLogger("partial")
+            for index in range(10):
+                partial_log.info("partial {index}", index=index)
+            partial_log.warning("warnings always pass")
+            partial_log._buckets["INFO"].tokens = 1.0
+            partial_log.info("partial {index}", index=10)
+        self.writer.close()
+
+        messages = [line.split(" - ", 1)[1] for line in self.text.getvalue().splitlines()]
+        self.assertEqual(messages, ["partial 0", "partial 1", "partial 2", "warnings always pass",
+                                    "partial 10 (7 similar messages suppressed)"])
+        self.assertEqual(partial_log.suppressed, 7)
+        self.assertIn("test_logging_setup:test_high_frequency_categories_are_rate_limited:", self.text.getvalue())
+
+    def test_structured_records_keep_message_fields(self):
+        CategoryLogger("trigger").info("Triggered hotkey: {hotkey}", hotkey="hotkey_{1}")
+        self.writer.close()
+
+        record = json.loads(self.json.getvalue())
+        self.assertEqual(record["message"], "Triggered hotkey: hotkey_{1}")
+        self.assertEqual((record["category"], record["hotkey"], record["level"]), ("trigger", "hotkey_{1}", "INFO"))
+
+    def test_log_file_rotates_and_keeps_writing(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            log_file = RotatingFile(os.path.join(tmp_dir, "vts_controller.log"), max_bytes=100)
+            for _ in range(3):
+                log_file.write("x" * 60 + "\n")
+            log_file.close()
+            self.assertEqual(len(os.listdir(tmp_dir)), 2)
+            with open(os.path.join(tmp_dir, "vts_controller.log"), encoding="utf-8") as f:
+                self.assertEqual(f.read(), "x" * 60 + "\n")
+
+if __name__ == '__main__':
+    unittest.main()
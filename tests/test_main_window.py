@@ -0,0 +1,17 @@
+import unittest
+
+from ui.main_window import parse_cooldown
+
+class TestKeywordEditor(unittest.TestCase):
+    def test_cooldowns_keep_fractions(self):
+        self.assertEqual(parse_cooldown("1.5"), 1.5)
+        self.assertEqual(parse_cooldown(" 60 "), 60)
+        self.assertIsInstance(parse_cooldown("60.0"), int)
+
+    def test_invalid_cooldowns_are_refused(self):
+        for text in ("", "soon", "-1", "nan", "inf"):
+            with self.assertRaises(ValueError):
+                parse_cooldown(text)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import numpy as np
+
+from inputs import multi_language_processor
+from inputs.multi_language_processor import MultiLanguageASRProcessor
+from tests.test_asr_processor import EnergyVad, StubASRProcessor, speech
+
+def stub_recognizer(text):
+    recognizer = MagicMock()
+    recognizer.is_ready.return_value = False
+    recognizer.get_result.return_value = text
+    recognizer.is_endpoint.return_value = False
+    return recognizer
+
+class StubMultiLanguageProcessor(MultiLanguageASRProcessor):
+    def _create_recognizer(self):
+        return stub_recognizer("ANGRY")
+
+    def _create_decoder(self, models, kwargs):
+        decoder = StubASRProcessor(self.event_bus, **models, **kwargs)
+        decoder.recognizer = stub_recognizer(models["model_config"]["text"])
+        decoder.stream = decoder.recognizer.create_stream()
+        return decoder
+
+def make_processor(cpu_budget=0.5):
+    processor = StubMultiLanguageProcessor(
+        event_bus=None, model_config={}, model_dir="", language="en",
+        extra_models={"de": {"model_config": {"text": "WÜTEND"}, "model_dir": ""}},
+        cpu_budget=cpu_budget, decode_chunk_ms=90,
+    )
+    processor.vad = EnergyVad()
+    return processor
+
+class TestMultiLanguageProcessor(unittest.TestCase):
+    def test_every_language_decodes_the_same_audio(self):
+        processor = make_processor()
+        processor._feed(speech(90))
+        results = processor._decode_pending()
+        self.assertEqual(sorted((meta["language"], text) for _, text, meta in results), [("de", "WÜTEND"), ("en", "ANGRY")])
+        self.assertIs(processor.decoders["de"].speech_clock, processor.speech_clock)
+        processor.decoders["de"].stream.accept_waveform.assert_called_once()
+        processor.executor.shutdown()
+
+    def test_over_budget_decodes_the_primary_language_only(self):
+        processor = make_processor(cpu_budget=0.5)
+        cpu = [0.0]
+        cpu_count = 2
+        with patch.object(multi_language_processor.process_stats, "cpu_seconds", lambda: cpu[0]), \
+             patch.object(multi_language_processor.os, "cpu_count", lambda: cpu_count), \
+             patch.object(multi_language_processor.time, "monotonic") as monotonic:
+            monotonic.return_value = 0.0
+            processor._cpu_window = (0.0, 0.0)
+
+            # 1.6 of 2 cores is over a 50% budget.
+            monotonic.return_value, cpu[0] = 10.0, 16.0
+            processor._feed(speech(90))
+            results = processor._decode_pending()
+            self.assertEqual(processor.active_languages, ["en"])
+            self.assertEqual({meta["language"] for _, _, meta in results}, {"en"})
+
+            # 1 of 2 cores: both languages together would still exceed the budget.
+            monotonic.return_value, cpu[0] = 20.0, 26.0
+            processor._apply_cpu_budget(0)
+            self.assertEqual(processor.active_languages, ["en"])
+
+            # 0.2 of 2 cores leaves room for both again, on a fresh stream.
+            monotonic.return_value, cpu[0] = 30.0, 28.0
+            processor._apply_cpu_budget(0)
+            self.assertEqual(processor.active_languages, ["en", "de"])
+            self.assertAlmostEqual(processor.decoders["de"].stream_origin_s, 0.09)
+        processor.executor.shutdown()
+
+if __name__ == '__main__':
+    unittest.main()
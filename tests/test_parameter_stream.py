@@ -0,0 +1,65 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+import numpy as np
+
+from agents.parameter_stream import ParameterStream, loudness, pitch_hz
+from agents.vts_output_agent import VTSWebSocketAgent
+from core.event_bus import EventBus
+from tests.fake_vts_server import FakeVTSServer
+
+def tone(frequency, seconds=0.064, level=0.3):
+    return (level * np.sin(2 * np.pi * frequency * np.arange(int(16000 * seconds)) / 16000)).astype(np.float32)
+
+class TestAudioFeatures(unittest.TestCase):
+    def test_pitch_and_loudness(self):
+        self.assertAlmostEqual(pitch_hz(tone(200), 16000), 200, delta=5)
+        self.assertIsNone(pitch_hz(np.zeros(1024, dtype=np.float32), 16000))
+        self.assertEqual(loudness(np.zeros(1024, dtype=np.float32)), 0.0)
+        self.assertGreater(loudness(tone(200)), 0.8)
+
+class TestParameterStream(unittest.TestCase):
+    def test_unchanged_frames_are_coalesced(self):
+        async def run_test():
+            agent = MagicMock()
+            agent.inject_parameters = AsyncMock(return_value=True)
+            stream = ParameterStream(agent, {"MouthOpen": {"feature": "loudness"}}, smoothing=0)
+
+            stream.push(tone(200))
+            self.assertTrue(await stream.send_frame())
+            self.assertGreater(agent.inject_parameters.call_args.args[0]["MouthOpen"], 0.8)
+            self.assertFalse(await stream.send_frame())
+            self.assertEqual(stream.frames_unchanged, 1)
+
+            # The ring keeps only the newest window, so silence replaces the tone.
+            stream.push(np.zeros(2048, dtype=np.float32))
+            self.assertTrue(await stream.send_frame())
+            self.assertEqual(agent.inject_parameters.call_args.args[0]["MouthOpen"], 0.0)
+
+        asyncio.run(run_test())
+
+    def test_frames_yield_to_hotkey_triggers_on_a_live_socket(self):
+        async def run_test():
+            with tempfile.TemporaryDirectory() as tmp:
+                async with FakeVTSServer() as server:
+                    event_bus = EventBus()
+                    agent = VTSWebSocketAgent("127.0.0.1", server.port, os.path.join(tmp, "token.txt"), event_bus)
+                    await agent.connect(max_retries=1)
+                    await agent.authenticate()
+
+                    self.assertTrue(await agent.inject_parameters({"MouthOpen": 0.5}))
+                    [(_, request)] = server.requests_of("InjectParameterDataRequest")
+                    self.assertEqual(request["data"]["parameterValues"][0], {"id": "MouthOpen", "weight": 1, "value": 0.5})
+
+                    # A queued trigger goes first; the frame is dropped, not delayed.
+                    await event_bus.publish("hotkey_triggered", "hotkey_angry")
+                    self.assertFalse(await agent.inject_parameters({"MouthOpen": 0.6}))
+                    self.assertEqual(len(server.requests_of("InjectParameterDataRequest")), 1)
+                    await agent.disconnect()
+
+        asyncio.run(run_test())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+import numpy as np
+
+from inputs.utils.preprocess import SpeechPreprocessor
+from tests.test_asr_processor import make_processor, speech
+
+SAMPLE_RATE = 16000
+
+def run_in_blocks(preprocessor: SpeechPreprocessor, audio: np.ndarray, block_sizes) -> np.ndarray:
+    output, offset = [], 0
+    for size in block_sizes:
+        if offset >= audio.size:
+            break
+        output.append(preprocessor.process(audio[offset:offset + size]))
+        offset += size
+    return np.concatenate(output)
+
+def rms(audio: np.ndarray) -> float:
+    return float(np.sqrt(np.mean(audio ** 2)))
+
+class TestSpeechPreprocessor(unittest.TestCase):
+    def test_with_every_stage_off_the_output_is_the_delayed_input(self):
+        rng = np.random.default_rng(0)
+        audio = (rng.standard_normal(SAMPLE_RATE) * 0.1).astype(np.float32)
+        preprocessor = SpeechPreprocessor(highpass_hz=0, noise_suppression=False, agc=False)
+        output = run_in_blocks(preprocessor, audio, rng.integers(1, 2000, size=1000))
+        delay = preprocessor.hop
+        np.testing.assert_allclose(output[delay:], audio[:output.size - delay], atol=1e-5)
+        self.assertAlmostEqual(preprocessor.delay_s, 0.016)
+
+    def test_high_pass_removes_hum(self):
+        t = np.arange(2 * SAMPLE_RATE) / SAMPLE_RATE
+        hum = (0.3 * np.sin(2 * np.pi * 50 * t)).astype(np.float32)
+        preprocessor = SpeechPreprocessor(noise_suppression=False, agc=False)
+        output = run_in_blocks(preprocessor, hum, [960] * 40)
+        self.assertLess(rms(output[SAMPLE_RATE:]), rms(hum) / 10)
+
+    def test_noise_suppression_keeps_tones_over_steady_noise(self):
+        rng = np.random.default_rng(1)
+        t = np.arange(8 * SAMPLE_RATE) / SAMPLE_RATE
+        noise = (rng.standard_normal(t.size) * 0.03).astype(np.float32)
+        bursts = (t % 2) > 1.5
+        tone = (0.2 * np.sin(2 * np.pi * 440 * t) * bursts).astype(np.float32)
+        preprocessor = SpeechPreprocessor(agc=False)
+        output = run_in_blocks(preprocessor, noise + tone, [960] * 200)[preprocessor.hop:]
+        later = t[:output.size] > 3
+        noise_only = later & ((t[:output.size] % 2) < 1.4)
+        tone_only = later & ((t[:output.size] % 2) > 1.55)
+        self.assertLess(rms(output[noise_only]), rms(noise) / 5)
+        self.assertGreater(rms(output[tone_only]), 0.8 * rms(tone[:output.size][tone_only]))
+
+    def test_agc_levels_quiet_speech_without_pumping_up_noise(self):
+        rng = np.random.default_rng(2)
+        t = np.arange(10 * SAMPLE_RATE) / SAMPLE_RATE
+        quiet_speech = (0.01 * np.sin(2 * np.pi * 300 * t) * ((t % 2) > 1.0)).astype(np.float32)
+        hiss = (rng.standard_normal(t.size) * 0.001).astype(np.float32)
+        preprocessor = SpeechPreprocessor()
+        output = run_in_blocks(preprocessor, quiet_speech + hiss, [960] * 200)[preprocessor.hop:]
+        last_burst = t[:output.size] > 9.2
+        self.assertGreater(rms(output[last_burst]), 5 * rms(quiet_speech[:output.size][last_burst]))
+        self.assertLessEqual(preprocessor.gain, preprocessor.max_gain)
+
+        # Noise alone afterwards leaves the gain where speech put it.
+        gain = preprocessor.gain
+        run_in_blocks(preprocessor, (rng.standard_normal(3 * SAMPLE_RATE) * 0.001).astype(np.float32), [960] * 50)
+        self.assertAlmostEqual(preprocessor.gain, gain)
+
+class TestASRProcessorPreprocessing(unittest.TestCase):
+    def test_preprocessing_runs_ahead_of_vad(self):
+        processor = make_processor(preprocess={"enabled": True, "highpass_hz": 0, "noise_suppression": False, "agc": False})
+        processor._feed(speech(120))
+        # The front end passes on 7 hops (112 ms) of the 120 ms, which VAD takes as 3 whole frames.
+        self.assertEqual(processor.audio_buffer.size, 3 * 16 * 30)
+        self.assertAlmostEqual(processor.preprocessor.pending_s, 0.024)
+        self.assertIsNone(make_processor(preprocess={"enabled": False}).preprocessor)
+
+if __name__ == '__main__':
+    unittest.main()
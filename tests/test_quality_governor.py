@@ -0,0 +1,78 @@
+import unittest
+
+from inputs.quality_governor import QualityGovernor
+from tests.test_asr_processor import make_processor, speech
+
+class TestQualityGovernor(unittest.TestCase):
+    def test_steps_down_when_decoding_falls_behind(self):
+        governor = QualityGovernor(target_latency_s=1.0, window_s=2.0)
+        # Within a window nothing changes.
+        self.assertFalse(governor.record(1.0, 0.9, 0.2, now=governor.changed_at + 1.0))
+        self.assertEqual(governor.tier.name, "full")
+        # RTF 0.9 over the window.
+        self.assertTrue(governor.record(1.0, 0.9, 0.2, now=governor.changed_at + 2.0))
+        self.assertEqual(governor.tier.name, "no_confirm")
+        # Fast decodes that still lag past the target also step down.
+        self.assertTrue(governor.record(2.0, 0.2, 1.5, now=governor.changed_at + 2.0))
+        self.assertEqual(governor.tier.name, "large_chunk")
+        self.assertEqual(governor.stats()["lag_ms"], 1500)
+
+    def test_steps_up_only_after_holding_the_tier(self):
+        governor = QualityGovernor(target_latency_s=1.0, window_s=2.0, hold_s=10.0)
+        start = governor.changed_at
+        governor.record(2.0, 1.8, 0.1, now=start + 2.0)
+        self.assertEqual(governor.index, 1)
+        for second in (4.0, 6.0, 8.0, 10.0):
+            self.assertFalse(governor.record(2.0, 0.2, 0.1, now=start + second))
+        self.assertTrue(governor.record(2.0, 0.2, 0.1, now=start + 12.0))
+        self.assertEqual(governor.tier.name, "full")
+        self.assertEqual(governor.changes, 2)
+
+    def test_lowest_tier_and_silent_windows(self):
+        governor = QualityGovernor(window_s=2.0, lowest_tier="no_confirm")
+        start = governor.changed_at
+        for window in range(1, 4):
+            governor.record(1.0, 2.0, 3.0, now=start + 2.0 * window)
+        self.assertEqual(governor.tier.name, "no_confirm")
+        # Windows without decoded audio keep the tier.
+        self.assertFalse(governor.record(0.0, 0.0, 0.0, now=start + 30.0))
+        self.assertEqual(governor.tier.name, "no_confirm")
+        with self.assertRaises(ValueError):
+            QualityGovernor(lowest_tier="kws_only")
+
+class TestGovernedProcessor(unittest.TestCase):
+    def test_tier_changes_are_published_and_applied(self):
+        processor = make_processor(quality_governor={"target_latency_ms": 500, "window_s": 0.0})
+        processor.last_captured_at = 0.0  # Captured long ago: every decode lags.
+        processor.audio_buffer = speech(90)
+        results = processor._decode_pending()
+        self.assertEqual(results[-1][0], "asr_quality_tier")
+        self.assertEqual(results[-1][1], "no_confirm")
+        self.assertEqual(results[-1][2]["tier_index"], 1)
+
+        processor.audio_buffer = speech(90)
+        processor._decode_pending()
+        self.assertEqual(processor.governor.tier.name, "large_chunk")
+        self.assertEqual(processor.decode_chunk_samples, 2 * processor.base_decode_chunk_samples)
+
+    def test_lowest_tier_drops_the_backlog(self):
+        processor = make_processor(quality_governor={"target_latency_ms": 300, "window_s": 60.0})
+        processor.governor.index = 3
+        processor.speech_clock.add(16 * 2000)
+        processor.audio_buffer = speech(2000)
+        processor._decode_pending()
+        # Only the newest 300 ms reached the recognizer, on a fresh stream.
+        fed = processor.stream.accept_waveform.call_args[0][1]
+        self.assertEqual(fed.size, 16 * 300)
+        self.assertAlmostEqual(processor.stream_origin_s, 1.7)
+        self.assertAlmostEqual(processor.governor.dropped_s, 1.7)
+        self.assertEqual(processor.utterance_id, 1)
+
+        # A backlog within the target is decoded whole.
+        processor.audio_buffer = speech(300)
+        processor._decode_pending()
+        self.assertEqual(processor.stream.accept_waveform.call_args[0][1].size, 16 * 300)
+        self.assertAlmostEqual(processor.governor.dropped_s, 1.7)
+
+if __name__ == '__main__':
+    unittest.main()
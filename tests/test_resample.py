@@ -0,0 +1,37 @@
+import unittest
+import numpy as np
+
+from inputs.utils.resample import PolyphaseResampler, downmix
+
+def tone(frequency, rate, seconds=1.0, amplitude=0.5):
+    t = np.arange(int(rate * seconds)) / rate
+    return (amplitude * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+class TestResample(unittest.TestCase):
+    def test_downmix_averages_channels(self):
+        block = np.array([[1.0, 0.0], [0.5, 0.5]], dtype=np.float32)
+        np.testing.assert_allclose(downmix(block), [0.5, 0.5])
+        self.assertEqual(downmix(block[:, :1]).shape, (2,))
+
+    def test_tone_survives_resampling(self):
+        for rate in (44100, 48000):
+            resampler = PolyphaseResampler(rate, 16000)
+            output = resampler.process(tone(1000, rate))
+            self.assertEqual(output.size, 16000)
+            n = np.arange(output.size)
+            expected = 0.5 * np.sin(2 * np.pi * 1000 * (n / 16000 - resampler.delay_s))
+            self.assertLess(np.abs(output[500:-500] - expected[500:-500]).max(), 1e-3)
+
+    def test_content_above_output_nyquist_is_removed(self):
+        output = PolyphaseResampler(48000, 16000).process(tone(10000, 48000))
+        self.assertLess(np.abs(output[500:]).max(), 1e-3)
+
+    def test_blocks_match_one_shot(self):
+        signal = np.random.default_rng(0).standard_normal(44100).astype(np.float32)
+        one_shot = PolyphaseResampler(44100, 16000).process(signal)
+        resampler = PolyphaseResampler(44100, 16000)
+        blocked = np.concatenate([resampler.process(signal[i:i + 1000]) for i in range(0, signal.size, 1000)])
+        np.testing.assert_allclose(blocked, one_shot, atol=1e-6)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import asyncio
+import unittest
+import numpy as np
+
+from core.event_bus import EventBus
+from inputs.isolated_asr_processor import IsolatedASRProcessor
+from inputs.shared_audio import SharedAudioRing
+
+class EchoProcessor:
+    """Stands in for ASRProcessor in the worker: every non-silent chunk is due and transcribes to its peak."""
+
+    def __init__(self, event_bus, **kwargs):
+        self.audio = None
+
+    def _feed(self, samples, captured_at=None):
+        self.audio = samples
+        self.captured_at = captured_at
+        return bool(np.any(samples))
+
+    def _decode_pending(self):
+        return [("transcription_received", f"peak {self.audio.max():.1f}", {"captured_at": self.captured_at})]
+
+    def _take_confirmations(self):
+        return []
+
+    def _take_status_change(self):
+        return None
+
+class TestSharedAudioRing(unittest.TestCase):
+    def setUp(self):
+        self.writer = SharedAudioRing.create(8)
+        self.reader = SharedAudioRing.attach(self.writer.name, 8)
+
+    def tearDown(self):
+        self.reader.close()
+        self.writer.close()
+        self.writer.unlink()
+
+    def test_read_wraps_around(self):
+        self.writer.write(np.arange(6, dtype=np.float32))
+        np.testing.assert_array_equal(self.reader.read(), np.arange(6))
+        self.writer.write(np.arange(6, 11, dtype=np.float32))
+        np.testing.assert_array_equal(self.reader.read(), np.arange(6, 11))
+        self.assertEqual(self.reader.read().size, 0)
+
+    def test_lagging_reader_skips_ahead(self):
+        self.writer.write(np.arange(5, dtype=np.float32))
+        self.writer.write(np.arange(5, 12, dtype=np.float32))
+        np.testing.assert_array_equal(self.reader.read(), np.arange(4, 12))
+        self.assertEqual(self.reader.dropped_samples, 4)
+
+class TestIsolatedASRProcessor(unittest.TestCase):
+    def test_worker_events_are_republished(self):
+        async def run_test():
+            event_bus = EventBus()
+            ready = await event_bus.subscribe("asr_ready")
+            transcriptions = await event_bus.subscribe("transcription_received")
+            processor = IsolatedASRProcessor(event_bus, model_config={}, model_dir="", processor_class=EchoProcessor)
+            processor._start_worker()
+            forward_task = asyncio.create_task(processor._forward_events())
+            try:
+                await asyncio.wait_for(ready.get(), timeout=30)
+                processor.write_audio(np.full(480, 0.5, dtype=np.float32))
+                event = await asyncio.wait_for(transcriptions.get(), timeout=30)
+                self.assertEqual(event.payload, "peak 0.5")
+                self.assertIsNotNone(event.meta["captured_at"])
+                await processor.stop()
+                await asyncio.wait_for(forward_task, timeout=10)
+            finally:
+                await processor._shutdown_worker()
+
+        asyncio.run(run_test())
+
+if __name__ == '__main__':
+    unittest.main()
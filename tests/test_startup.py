@@ -0,0 +1,36 @@
+import time
+import unittest
+from unittest.mock import patch
+
+from core.startup import StartupTimeline, startup_phase
+import vts_main
+
+class TestStartupTimeline(unittest.TestCase):
+
+    def test_records_phases(self):
+        timeline = StartupTimeline()
+        with timeline.phase("vts connect"):
+            time.sleep(0.01)
+        with startup_phase(timeline, "asr model load"):
+            pass
+        with startup_phase(None, "not recorded"):
+            pass
+        timeline.finish()
+
+        result = timeline.to_dict()
+        self.assertEqual([p['name'] for p in result['phases']], ["vts connect", "asr model load"])
+        self.assertGreaterEqual(result['phases'][0]['duration_s'], 0.01)
+        self.assertGreaterEqual(result['total_s'], result['phases'][0]['duration_s'])
+        self.assertIn("vts connect", timeline.summary())
+
+class TestEntryPointArguments(unittest.TestCase):
+
+    def test_launcher_arguments_are_accepted(self):
+        # run_fast.bat, run_accurate.bat and test.bat
+        for argv, mode, test in ((["--mode", "fast"], "fast", False), (["--mode", "accurate"], "accurate", False), (["--test"], "fast", True)):
+            with patch("sys.argv", ["vts_main.py", *argv]):
+                args = vts_main.parse_args()
+            self.assertEqual((args.mode, args.test), (mode, test))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+from agents.vts_client import RequestTemplate, VTSClient
+from tests.fake_vts_server import FakeVTSServer
+
+class TestVTSClient(unittest.TestCase):
+
+    def test_template_renders_the_request(self):
+        template = RequestTemplate("HotkeyTriggerRequest", {"hotkeyID": "hotkey_angry"})
+        message = json.loads(template.render("1f"))
+        self.assertEqual(message, {
+            "apiName": "VTubeStudioPublicAPI",
+            "apiVersion": "1.0",
+            "requestID": "1f",
+            "messageType": "HotkeyTriggerRequest",
+            "data": {"hotkeyID": "hotkey_angry"},
+        })
+
+    def test_responses_are_matched_by_request_id(self):
+        async def run_test():
+            with tempfile.TemporaryDirectory() as tmp:
+                async with FakeVTSServer(concurrent=True) as server:
+                    server.delays["CurrentModelRequest"] = 0.2
+                    client = VTSClient("127.0.0.1", server.port, os.path.join(tmp, "token.txt"))
+                    await client.connect()
+
+                    # The slow request is answered last; each caller still gets its own response.
+                    slow = asyncio.create_task(client.request("CurrentModelRequest"))
+                    await asyncio.sleep(0.02)
+                    fast = await client.send_template(RequestTemplate("HotkeyTriggerRequest", {"hotkeyID": "hotkey_angry"}))
+                    self.assertFalse(slow.done())
+                    self.assertEqual(fast["messageType"], "HotkeyTriggerResponse")
+                    self.assertEqual((await slow)["messageType"], "CurrentModelResponse")
+
+                    stats = client.stats()
+                    self.assertEqual((stats["requests"], stats["responses"], stats["max_in_flight"]), (2, 2, 2))
+                    self.assertEqual(stats["in_flight"], 0)
+                    await client.close()
+                    self.assertFalse(client.connected)
+
+        asyncio.run(run_test())
+
+    def test_events_and_closed_connection(self):
+        async def run_test():
+            with tempfile.TemporaryDirectory() as tmp:
+                server = await FakeVTSServer(concurrent=True).start()
+                events = []
+                async def on_event(message):
+                    events.append(message["messageType"])
+                client = VTSClient("127.0.0.1", server.port, os.path.join(tmp, "token.txt"), on_event=on_event)
+                await client.connect()
+                await server.push_event("ModelLoadedEvent", {"modelLoaded": True, "modelID": "model_2"})
+                await client.request("CurrentModelRequest")
+                self.assertEqual(events, ["ModelLoadedEvent"])
+
+                # Requests in flight fail as soon as the connection goes away.
+                server.delays["CurrentModelRequest"] = 5.0
+                pending = asyncio.create_task(client.request("CurrentModelRequest"))
+                await asyncio.sleep(0.05)
+                await server.stop()
+                with self.assertRaises(ConnectionError):
+                    await asyncio.wait_for(pending, timeout=2)
+                self.assertFalse(client.connected)
+                with self.assertRaises(ConnectionError):
+                    await client.request("CurrentModelRequest")
+                await client.close()
+
+        asyncio.run(run_test())
+
+    def test_malformed_messages_are_skipped(self):
+        async def run_test():
+            with tempfile.TemporaryDirectory() as tmp:
+                async with FakeVTSServer() as server:
+                    client = VTSClient("127.0.0.1", server.port, os.path.join(tmp, "token.txt"))
+                    await client.connect()
+                    for raw in ("not json", "[1, 2]", '{"requestID": [1], "messageType": 3}', '{"messageType": 3}'):
+                        await server.push_raw(raw)
+                    # Responses are still dispatched afterwards.
+                    self.assertEqual((await client.request("CurrentModelRequest"))["messageType"], "CurrentModelResponse")
+                    self.assertEqual(client.stats()["malformed"], 4)
+                    await client.close()
+
+        asyncio.run(run_test())
+
+    def test_authenticate_saves_and_reuses_token(self):
+        async def run_test():
+            with tempfile.TemporaryDirectory() as tmp:
+                token_file = os.path.join(tmp, "token.txt")
+                async with FakeVTSServer() as server:
+                    for _ in range(2):
+                        client = VTSClient("127.0.0.1", server.port, token_file)
+                        await client.connect()
+                        self.assertTrue(await client.authenticate())
+                        await client.close()
+                    self.assertEqual(len(server.requests_of("AuthenticationTokenRequest")), 1)
+                    self.assertEqual(len(server.requests_of("AuthenticationRequest")), 2)
+                with open(token_file, encoding="utf-8") as f:
+                    self.assertEqual(f.read(), "fake-token")
+
+        asyncio.run(run_test())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,37 +1,121 @@
 
 import asyncio
+import os
+import tempfile
+import time
 import unittest
-from unittest.mock import AsyncMock, MagicMock, patch
 
 from agents.vts_output_agent import VTSWebSocketAgent
-from core.event_bus import Event, EventBus
+from core.event_bus import EventBus
+from tests.fake_vts_server import FakeVTSServer
 
 class TestVTSOutputAgent(unittest.TestCase):
 
-    @patch('pyvts.vts')
-    def test_trigger_hotkey(self, mock_vts):
+    def test_trigger_hotkey(self):
         async def run_test():
-            event_bus = EventBus()
-            mock_vts_instance = MagicMock()
-            mock_vts_instance.request = AsyncMock(return_value={'data': {'hotkeyID': 'hotkey_1'}})
-            mock_vts.return_value = mock_vts_instance
+            with tempfile.TemporaryDirectory() as tmp:
+                async with FakeVTSServer() as server:
+                    event_bus = EventBus()
+                    agent = VTSWebSocketAgent("127.0.0.1", server.port, os.path.join(tmp, "token.txt"), event_bus)
+                    await agent.connect(max_retries=1)
+                    await agent.authenticate()
 
-            agent = VTSWebSocketAgent("host", 1234, "token_file", event_bus)
+                    # Run the agent in a background task
+                    agent_task = asyncio.create_task(agent.run())
 
-            # Run the agent in a background task
-            agent_task = asyncio.create_task(agent.run())
+                    # Publish a hotkey trigger event
+                    await event_bus.publish("hotkey_triggered", "hotkey_angry")
+                    await asyncio.sleep(0.1)
+                    requests = server.requests_of("HotkeyTriggerRequest")
+                    self.assertEqual(len(requests), 1)
+                    self.assertEqual(requests[0][1]["data"], {"hotkeyID": "hotkey_angry"})
 
-            # Publish a hotkey trigger event
-            hotkey_queue = await event_bus.subscribe("hotkey_triggered")
-            await event_bus.publish("hotkey_triggered", "hotkey_1")
+                    # Triggers carrying the keyword's spoken end time are timed.
+                    await event_bus.publish("hotkey_triggered", "hotkey_angry", meta={"spoken_end": time.monotonic() - 0.1})
+                    await asyncio.sleep(0.1)
+                    self.assertEqual(agent.trigger_latency.count, 1)
+                    self.assertGreaterEqual(agent.trigger_latency.max_ms, 100)
+                    # Each request carries its own requestID.
+                    self.assertEqual(len({message["requestID"] for _, message in server.requests_of("HotkeyTriggerRequest")}), 2)
 
-            # Give the agent time to process
-            await asyncio.sleep(0.1)
+                    agent_task.cancel()
+                    await agent.disconnect()
 
-            # Check that the vts request was called
-            mock_vts_instance.request.assert_called()
+        asyncio.run(run_test())
+
+    def test_model_events_are_dispatched(self):
+        async def run_test():
+            with tempfile.TemporaryDirectory() as tmp:
+                async with FakeVTSServer(model_id="model_2") as server:
+                    event_bus = EventBus()
+                    agent = VTSWebSocketAgent("127.0.0.1", server.port, os.path.join(tmp, "token.txt"), event_bus)
+                    model_queue = await event_bus.subscribe("vts_model_changed")
+                    await agent.connect(max_retries=1)
+
+                    response = await agent.get_hotkey_list()
+                    self.assertEqual(response['messageType'], 'HotkeysInCurrentModelResponse')
+                    self.assertEqual(agent.current_model_id, 'model_2')
+                    # Triggers of the model's hotkeys are encoded ahead of use.
+                    self.assertEqual(list(agent.hotkey_requests), ["hotkey_angry"])
+
+                    # Events are read while no request is in flight.
+                    await server.push_event("ModelLoadedEvent", {"modelLoaded": True, "modelID": "model_3"})
+                    event = await asyncio.wait_for(model_queue.get(), timeout=1)
+                    self.assertEqual(event.payload['modelID'], 'model_3')
+                    await agent.disconnect()
+
+        asyncio.run(run_test())
+
+    def test_trigger_is_not_held_up_by_parameter_frame(self):
+        async def run_test():
+            with tempfile.TemporaryDirectory() as tmp:
+                async with FakeVTSServer(concurrent=True) as server:
+                    server.delays["InjectParameterDataRequest"] = 0.3
+                    agent = VTSWebSocketAgent("127.0.0.1", server.port, os.path.join(tmp, "token.txt"), EventBus())
+                    await agent.connect(max_retries=1)
+
+                    frame = asyncio.create_task(agent.inject_parameters({"MouthOpen": 0.5}))
+                    await asyncio.sleep(0.05)
+                    # The next frame is dropped while one is unanswered...
+                    self.assertFalse(await agent.inject_parameters({"MouthOpen": 0.6}))
+                    # ...but a trigger goes out and is answered at once.
+                    started = time.monotonic()
+                    self.assertTrue(await agent.trigger_hotkey("hotkey_angry"))
+                    self.assertLess(time.monotonic() - started, 0.2)
+                    self.assertTrue(await frame)
+                    self.assertEqual(agent.stats()["max_in_flight"], 2)
+                    await agent.disconnect()
+
+        asyncio.run(run_test())
+
+    def test_expression_state_skips_redundant_requests(self):
+        async def run_test():
+            with tempfile.TemporaryDirectory() as tmp:
+                async with FakeVTSServer() as server:
+                    agent = VTSWebSocketAgent("127.0.0.1", server.port, os.path.join(tmp, "token.txt"), EventBus())
+                    await agent.connect(max_retries=1)
+                    await agent.authenticate()
+                    server.expression_states["SignAngry.exp3.json"] = True
+                    await agent.sync_expression_states()
+
+                    # Already on: "angry angry angry" sends nothing.
+                    on = {"expression": "SignAngry.exp3.json", "action": "on", "auto_off_s": 0.05}
+                    for _ in range(3):
+                        await agent.apply_trigger("hotkey_angry", on)
+                    self.assertEqual(server.requests_of("ExpressionActivationRequest"), [])
+                    self.assertEqual(agent.requests_skipped, 3)
+
+                    # The auto-off timer turns it off once.
+                    await asyncio.sleep(0.15)
+                    self.assertFalse(server.expression_states["SignAngry.exp3.json"])
+                    await agent.apply_trigger("hotkey_angry", {"expression": "SignAngry.exp3.json", "action": "off"})
+                    self.assertEqual(len(server.requests_of("ExpressionActivationRequest")), 1)
 
-            agent_task.cancel()
+                    # Toggles are always sent, and tracked.
+                    await agent.apply_trigger("hotkey_angry", {"expression": "SignAngry.exp3.json", "action": "toggle"})
+                    self.assertEqual(len(server.requests_of("HotkeyTriggerRequest")), 1)
+                    self.assertTrue(agent.expression_states["SignAngry.exp3.json"])
+                    await agent.disconnect()
 
         asyncio.run(run_test())
 
@@ -1,36 +1,48 @@
 import asyncio
+import os
 import sys
-import yaml
 from loguru import logger
 
 from PyQt6.QtWidgets import QApplication
 
 from ui.main_window import MainWindow
 from core.application_core import ApplicationCore
+from core.config_loader import ConfigLoader
+from core.config_store import ConfigStore
+from core.diagnostics import DEFAULT_PROFILE_S, capture_profile
 
-def load_initial_config():
+CONFIG_PATH = "vts_config.yaml"
+
+def load_initial_config(config_store: ConfigStore):
     try:
-        with open("vts_config.yaml", 'r') as f:
-            return yaml.safe_load(f)
+        return config_store.load()
     except Exception as e:
         logger.error(f"Failed to load initial config: {e}")
         return None
 
 class AppUI:
-    def __init__(self):
+    def __init__(self, recognition_mode: str = "fast", test_mode: bool = False):
         self.main_window = MainWindow()
+        self.main_window.mode_selector.setCurrentText(recognition_mode)
+        self.test_mode = test_mode
         self.app_core_task = None
+        self.app_core = None
         self.current_language = "en"
+        self.expressions = {}
+        self.config_store = ConfigStore(os.path.join(ConfigLoader.get_base_path(), CONFIG_PATH))
 
         # Connect signals
         self.main_window.start_button.clicked.connect(self._start_button_clicked)
         self.main_window.stop_button.clicked.connect(self._stop_button_clicked)
+        self.main_window.profile_button.clicked.connect(self._profile_button_clicked)
         self.main_window.language_selector.currentTextChanged.connect(self._language_changed)
+        self.main_window.keyword_editor.itemChanged.connect(self._keyword_edited)
 
         # Initial UI setup
-        initial_config = load_initial_config()
-        if initial_config:
-            self.main_window.populate_keyword_editor(initial_config.get('expressions', {}))
+        self.config = load_initial_config(self.config_store) or {}
+        if self.config:
+            self.expressions = self.config.get('expressions') or {}
+            self.main_window.populate_keyword_editor(self.expressions)
         
         self.main_window.show()
 
@@ -39,6 +51,23 @@ class AppUI:
         self.current_language = language
         self.main_window.retranslate_ui(language)
 
+    def _keyword_edited(self, item):
+        expressions = self.main_window.read_keyword_editor(self.expressions)
+        if expressions == self.expressions:
+            return
+        logger.info(f"--- UI: Keywords edited in row {item.row()} ---")
+        self.expressions = expressions
+        asyncio.create_task(self._save_expressions(expressions))
+
+    async def _save_expressions(self, expressions: dict):
+        if self.app_core:
+            await self.app_core.apply_expression_config(expressions)
+            config = self.app_core.config
+        else:
+            config = self.config
+            config['expressions'] = expressions
+        await self.config_store.save(config)
+
     def _start_button_clicked(self):
         logger.info("--- UI: Start button clicked ---")
         self.app_core_task = asyncio.create_task(self.start_application())
@@ -48,6 +77,22 @@ class AppUI:
         if self.app_core_task:
             self.app_core_task.cancel()
 
+    def _profile_button_clicked(self):
+        logger.info("--- UI: Profile button clicked ---")
+        asyncio.create_task(self._capture_profile())
+
+    async def _capture_profile(self):
+        self.main_window.profile_button.setEnabled(False)
+        self.main_window.append_log(f"Profiling all threads for {DEFAULT_PROFILE_S:.0f} s...")
+        try:
+            result = await asyncio.to_thread(capture_profile, DEFAULT_PROFILE_S)
+            self.main_window.append_log(f"Profile written to {result['path']} ({result['samples']} samples).")
+        except Exception as e:
+            logger.error(f"Profiling failed: {e}")
+            self.main_window.append_log(f"[ERROR] Profiling failed: {e}")
+        finally:
+            self.main_window.profile_button.setEnabled(True)
+
     async def start_application(self):
         self.main_window.set_status(app="Starting...")
         self.main_window.start_button.setEnabled(False)
@@ -57,10 +102,12 @@ class AppUI:
 
         recognition_mode = self.main_window.mode_selector.currentText()
         app_core = ApplicationCore(
-            config_path="vts_config.yaml",
+            config_path=CONFIG_PATH,
+            test_mode=self.test_mode,
             recognition_mode=recognition_mode,
             language=self.current_language
         )
+        self.app_core = app_core
 
         # Setup listeners on the running instance
         transcription_queue = await app_core.event_bus.subscribe("transcription_received")
@@ -68,6 +115,7 @@ class AppUI:
         vts_status_queue = await app_core.event_bus.subscribe("vts_status_update")
         asr_status_queue = await app_core.event_bus.subscribe("asr_status_update")
         asr_ready_queue = await app_core.event_bus.subscribe("asr_ready")
+        expressions_queue = await app_core.event_bus.subscribe("expressions_reloaded")
 
         listener_tasks = [
             asyncio.create_task(self._handle_transcription_events(transcription_queue)),
@@ -75,6 +123,7 @@ class AppUI:
             asyncio.create_task(self._handle_vts_status_events(vts_status_queue)),
             asyncio.create_task(self._handle_asr_status_events(asr_status_queue)),
             asyncio.create_task(self._handle_asr_ready_events(asr_ready_queue)),
+            asyncio.create_task(self._handle_expressions_events(expressions_queue)),
         ]
 
         try:
@@ -87,6 +136,9 @@ class AppUI:
         finally:
             for task in listener_tasks:
                 task.cancel()
+            if app_core.config:
+                self.config = app_core.config
+            self.app_core = None
             self.main_window.set_status(app="Stopped", vts="Disconnected", asr="Idle")
             self.main_window.start_button.setEnabled(True)
             self.main_window.mode_selector.setEnabled(True)
@@ -97,7 +149,11 @@ class AppUI:
         while True:
             try:
                 event = await queue.get()
-                self.main_window.append_log(f"Heard: {event.payload}")
+                meta = event.meta or {}
+                if meta.get("source"):
+                    self.main_window.append_log(f"Chat ({meta['source']}) {meta.get('user', '')}: {event.payload}")
+                elif event.payload: # A hybrid-mode confirmation can come back empty.
+                    self.main_window.append_log(f"Heard: {event.payload}")
                 queue.task_done()
             except asyncio.CancelledError:
                 break
@@ -136,4 +192,14 @@ class AppUI:
                 self.main_window.set_status(app="Running")
                 queue.task_done()
             except asyncio.CancelledError:
-                break
\ No newline at end of file
+                break
+
+    async def _handle_expressions_events(self, queue: asyncio.Queue):
+        while True:
+            try:
+                event = await queue.get()
+                self.expressions = event.payload
+                self.main_window.populate_keyword_editor(event.payload)
+                queue.task_done()
+            except asyncio.CancelledError:
+                break
@@ -0,0 +1,84 @@
+from collections import deque
+from PyQt6.QtCore import QAbstractListModel, QModelIndex, Qt
+from PyQt6.QtGui import QPainter
+from PyQt6.QtWidgets import QListView, QAbstractItemView
+
+DEFAULT_MAX_LINES = 5000
+
+class LogModel(QAbstractListModel):
+    """
+    List model over a capped ring of log lines. `append` only buffers; `flush`
+    applies everything buffered with at most one remove and one insert
+    notification, so the view re-lays out once per flush rather than per line.
+    """
+
+    def __init__(self, max_lines: int = DEFAULT_MAX_LINES, parent=None):
+        super().__init__(parent)
+        self.max_lines = max_lines
+        self._lines = deque(maxlen=max_lines)
+        self._pending = []
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._lines)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and 0 <= index.row() < len(self._lines):
+            return self._lines[index.row()]
+        return None
+
+    def append(self, text: str):
+        self._pending.append(text)
+
+    def has_pending(self) -> bool:
+        return bool(self._pending)
+
+    def flush(self) -> int:
+        """Moves buffered lines into the model. Returns how many were added."""
+        if not self._pending:
+            return 0
+        pending = self._pending[-self.max_lines:]
+        self._pending = []
+
+        overflow = min(len(self._lines), len(self._lines) + len(pending) - self.max_lines)
+        if overflow > 0:
+            self.beginRemoveRows(QModelIndex(), 0, overflow - 1)
+            for _ in range(overflow):
+                self._lines.popleft()
+            self.endRemoveRows()
+
+        first = len(self._lines)
+        self.beginInsertRows(QModelIndex(), first, first + len(pending) - 1)
+        self._lines.extend(pending)
+        self.endInsertRows()
+        return len(pending)
+
+class LogView(QListView):
+    """Read-only view for LogModel that follows new lines while scrolled to the bottom."""
+
+    def __init__(self, model: LogModel, parent=None):
+        super().__init__(parent)
+        self.placeholder_text = ""
+        self.setModel(model)
+        # Every row has the same height, which lets the view skip measuring rows it doesn't show.
+        self.setUniformItemSizes(True)
+        self.setWordWrap(False)
+        self.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+
+    def setPlaceholderText(self, text: str):
+        self.placeholder_text = text
+        self.viewport().update()
+
+    def flush(self):
+        scrollbar = self.verticalScrollBar()
+        at_bottom = scrollbar.value() >= scrollbar.maximum()
+        if self.model().flush() and at_bottom:
+            self.scrollToBottom()
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self.model().rowCount() == 0 and self.placeholder_text:
+            painter = QPainter(self.viewport())
+            painter.setPen(self.palette().placeholderText().color())
+            painter.drawText(self.viewport().rect().adjusted(4, 4, -4, -4),
+                             Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop, self.placeholder_text)
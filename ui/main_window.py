@@ -1,16 +1,34 @@
 from PyQt6.QtWidgets import (
-    QMainWindow, QVBoxLayout, QHBoxLayout, QWidget, QTextEdit, QTableWidget, 
+    QMainWindow, QVBoxLayout, QHBoxLayout, QWidget, QTableWidget,
     QTableWidgetItem, QLabel, QPushButton, QHeaderView, QComboBox
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QTimer
+import math
 import os
 from core.config_loader import ConfigLoader
+from ui.log_view import LogModel, LogView
+
+# Log lines and status changes are applied at most this often.
+UI_FLUSH_INTERVAL_MS = 50
+
+def parse_cooldown(text: str):
+    """Seconds in a cooldown cell, as an int when whole. Raises ValueError for anything but a finite number >= 0."""
+    cooldown_s = float(text.strip())
+    if not math.isfinite(cooldown_s) or cooldown_s < 0:
+        raise ValueError(f"{text!r} is not a cooldown in seconds")
+    return int(cooldown_s) if cooldown_s.is_integer() else cooldown_s
 
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
 
         self.translations = self._load_translations()
+        self.keyword_editor_files = []
+        self._pending_status = {}
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(UI_FLUSH_INTERVAL_MS)
+        self._flush_timer.timeout.connect(self.flush_pending_updates)
 
         self.central_widget = QWidget()
         self.setCentralWidget(self.central_widget)
@@ -40,7 +58,7 @@ class MainWindow(QMainWindow):
         # Mode Selector
         self.mode_label = QLabel()
         self.mode_selector = QComboBox()
-        self.mode_selector.addItems(["fast", "accurate"])
+        self.mode_selector.addItems(["fast", "accurate", "hybrid"])
         top_layout.addWidget(self.mode_label)
         top_layout.addWidget(self.mode_selector)
         
@@ -64,11 +82,13 @@ class MainWindow(QMainWindow):
         controls_layout.addWidget(self.start_button)
         controls_layout.addWidget(self.stop_button)
         controls_layout.addStretch()
+        self.profile_button = QPushButton()
+        controls_layout.addWidget(self.profile_button)
         self.main_layout.addLayout(controls_layout)
 
         # Transcription Log
-        self.transcription_log = QTextEdit()
-        self.transcription_log.setReadOnly(True)
+        self.log_model = LogModel(parent=self)
+        self.transcription_log = LogView(self.log_model)
         self.main_layout.addWidget(self.transcription_log)
 
         # Keyword Editor
@@ -89,6 +109,7 @@ class MainWindow(QMainWindow):
         self.mode_label.setText(tr("mode_label", "Recognition Mode:"))
         self.start_button.setText(tr("start_button", "Start Application"))
         self.stop_button.setText(tr("stop_button", "Stop Application"))
+        self.profile_button.setText(tr("profile_button", "Profile (10 s)"))
         self.transcription_log.setPlaceholderText(tr("transcription_placeholder", "Live Transcription Output..."))
         self.keyword_editor.setHorizontalHeaderLabels([
             tr("header_expression", "Expression Name"), 
@@ -98,14 +119,31 @@ class MainWindow(QMainWindow):
         self.language_label.setText(tr("language_label", "Language:"))
 
     def append_log(self, text: str):
-        self.transcription_log.append(text)
+        self.log_model.append(text)
+        self._schedule_flush()
 
     def set_status(self, vts: str = None, asr: str = None, app: str = None):
-        if vts: self.vts_status_label.setText(f"VTS Status: {vts}")
-        if asr: self.asr_status_label.setText(f"ASR Status: {asr}")
-        if app: self.app_status_label.setText(f"App Status: {app}")
+        # Only the latest value per label survives until the next flush.
+        if vts: self._pending_status['vts'] = vts
+        if asr: self._pending_status['asr'] = asr
+        if app: self._pending_status['app'] = app
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def flush_pending_updates(self):
+        self.transcription_log.flush()
+        status, self._pending_status = self._pending_status, {}
+        if 'vts' in status: self.vts_status_label.setText(f"VTS Status: {status['vts']}")
+        if 'asr' in status: self.asr_status_label.setText(f"ASR Status: {status['asr']}")
+        if 'app' in status: self.app_status_label.setText(f"App Status: {status['app']}")
 
     def populate_keyword_editor(self, expressions: dict):
+        # Repopulating must not be mistaken for user edits.
+        self.keyword_editor.blockSignals(True)
+        self.keyword_editor_files = list(expressions.keys())
         self.keyword_editor.setRowCount(len(expressions))
         row = 0
         for exp_file, exp_data in expressions.items():
@@ -113,3 +151,30 @@ class MainWindow(QMainWindow):
             self.keyword_editor.setItem(row, 1, QTableWidgetItem(", ".join(exp_data.get('keywords', []))))
             self.keyword_editor.setItem(row, 2, QTableWidgetItem(str(exp_data.get('cooldown_s', 'N/A'))))
             row += 1
+        self.keyword_editor.blockSignals(False)
+
+    def read_keyword_editor(self, expressions: dict) -> dict:
+        """Returns a copy of `expressions` with the values currently shown in the keyword table."""
+        updated = {}
+        for row, exp_file in enumerate(self.keyword_editor_files):
+            exp_data = dict(expressions.get(exp_file, {}))
+            name_item = self.keyword_editor.item(row, 0)
+            keywords_item = self.keyword_editor.item(row, 1)
+            cooldown_item = self.keyword_editor.item(row, 2)
+            if name_item and name_item.text().strip():
+                exp_data['name'] = name_item.text().strip()
+            if keywords_item:
+                exp_data['keywords'] = [k.strip() for k in keywords_item.text().split(',') if k.strip()]
+            shown_cooldown = str(exp_data.get('cooldown_s', 'N/A'))
+            if cooldown_item and cooldown_item.text() != shown_cooldown:
+                try:
+                    exp_data['cooldown_s'] = parse_cooldown(cooldown_item.text())
+                except ValueError:
+                    # Put the previous value back and say why, rather than dropping the edit silently.
+                    self.append_log(f"Invalid cooldown '{cooldown_item.text()}' for {exp_data.get('name', exp_file)}: "
+                                    f"enter a number of seconds, such as 1.5. Keeping {shown_cooldown}.")
+                    self.keyword_editor.blockSignals(True)
+                    cooldown_item.setText(shown_cooldown)
+                    self.keyword_editor.blockSignals(False)
+            updated[exp_file] = exp_data
+        return updated
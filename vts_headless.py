@@ -0,0 +1,72 @@
+import argparse
+import asyncio
+import multiprocessing
+import signal
+import sys
+from loguru import logger
+
+from core.app_controller import AppController
+from core.control_api import ControlAPI
+from core.logging_setup import configure_logging
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the VTS Voice Controller without a UI, driven by a localhost control API.")
+    parser.add_argument("--config", default="vts_config.yaml")
+    parser.add_argument("--host", default="127.0.0.1", help="Address of the control API. Keep it on localhost; the API has no authentication.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--mode", choices=["fast", "accurate", "hybrid"], default="fast")
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--test", action="store_true", help="Use the simulated test input instead of the microphone.")
+    parser.add_argument("--no-autostart", action="store_true", help="Wait for POST /start instead of starting immediately.")
+    parser.add_argument("--uvloop", action="store_true", help="Run on uvloop if it is installed.")
+    parser.add_argument("--log-json", action="store_true", help="Also write structured JSON log records to logs/vts_controller.jsonl.")
+    return parser.parse_args()
+
+async def run_headless(args):
+    controller = AppController(args.config, recognition_mode=args.mode, language=args.language, test_mode=args.test)
+    api = ControlAPI(controller, host=args.host, port=args.port)
+    await api.start()
+
+    stop_requested = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_requested.set)
+        except (NotImplementedError, RuntimeError):
+            pass  # Windows: Ctrl+C surfaces as KeyboardInterrupt instead.
+
+    if not args.no_autostart:
+        await controller.start()
+
+    try:
+        await stop_requested.wait()
+    finally:
+        logger.info("Shutting down headless controller...")
+        await controller.stop()
+        await api.close()
+
+def main():
+    args = parse_args()
+
+    configure_logging("logs", structured=args.log_json)
+
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+
+    if args.uvloop:
+        try:
+            import uvloop
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+            logger.info("Using uvloop event loop.")
+        except ImportError:
+            logger.warning("uvloop is not installed. Falling back to the default asyncio event loop.")
+
+    asyncio.run(run_headless(args))
+
+if __name__ == "__main__":
+    # Required for the spawned ASR worker process in frozen builds.
+    multiprocessing.freeze_support()
+    try:
+        main()
+    except KeyboardInterrupt:
+        logger.info("Program terminated by user.")
@@ -0,0 +1,34 @@
+import argparse
+import json
+from loguru import logger
+
+from core.config_loader import ConfigLoader
+from inputs.inference_host import DEFAULT_ADDRESS, KEY_FILE, host_stats, run_inference_host
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Serve ASR to every controller on this machine, loading each model once.")
+    parser.add_argument("--config", default="vts_config.yaml", help="Takes the address and key from asr_settings.inference_host.")
+    parser.add_argument("--address", help=f"host:port to listen on (default {DEFAULT_ADDRESS}). Other than localhost needs --authkey.")
+    parser.add_argument("--authkey", help=f"Key controllers must present (default: the random key in {KEY_FILE}, created on first use).")
+    parser.add_argument("--stats", action="store_true", help="Print the running host's sessions, loaded models and memory, then exit.")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    settings = (ConfigLoader.load_yaml(args.config).get("asr_settings") or {}).get("inference_host") or {}
+    address = args.address or settings.get("address", DEFAULT_ADDRESS)
+    authkey = args.authkey or settings.get("authkey")
+
+    if args.stats:
+        print(json.dumps(host_stats(address, authkey), indent=2))
+        return
+    try:
+        run_inference_host(address, authkey)
+    except ValueError as e:
+        logger.error(str(e))
+        raise SystemExit(2)
+    except KeyboardInterrupt:
+        logger.info("Inference host stopped.")
+
+if __name__ == "__main__":
+    main()
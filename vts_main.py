@@ -1,23 +1,40 @@
+import time
+_ENTRY_STARTED = time.perf_counter()
+
+import argparse
 import asyncio
+import multiprocessing
+import json
 import sys
-import os
 from loguru import logger
-from qasync import QEventLoop
-from PyQt6.QtWidgets import QApplication
 
-from ui.app_ui import AppUI
+def parse_args():
+    parser = argparse.ArgumentParser(description="VTS Voice Controller")
+    parser.add_argument("--startup-benchmark", action="store_true",
+                        help="Print the time to the first shown window as JSON and exit.")
+    parser.add_argument("--mode", choices=["fast", "accurate", "hybrid"], default="fast",
+                        help="Recognition mode preselected in the window.")
+    parser.add_argument("--test", action="store_true",
+                        help="Use the simulated test input instead of the microphone.")
+    parser.add_argument("--log-json", action="store_true",
+                        help="Also write structured JSON log records to logs/vts_controller.jsonl.")
+    return parser.parse_args()
 
 def main():
+    args = parse_args()
+
     # --- Setup Logging ---
-    if not os.path.exists("logs"):
-        os.mkdir("logs")
-    log_path = os.path.join("logs", "vts_controller.log")
-    logger.add(log_path, rotation="10 MB", retention="7 days", level="INFO", backtrace=True, diagnose=True)
+    from core.logging_setup import configure_logging
+    configure_logging("logs", structured=args.log_json)
 
     # --- Set up the asyncio event loop for qasync ---
+    # Qt is imported here rather than at module level so tools importing this module stay light.
+    from qasync import QEventLoop
+    from PyQt6.QtWidgets import QApplication
+
     if sys.platform == 'win32':
         asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
-    
+
     app = QApplication.instance()
     if app is None:
         app = QApplication(sys.argv)
@@ -25,12 +42,24 @@ def main():
     asyncio.set_event_loop(loop)
 
     # --- Create and run the application ---
-    app_ui = AppUI()
-    
+    from ui.app_ui import AppUI
+    app_ui = AppUI(recognition_mode=args.mode, test_mode=args.test)
+    time_to_window = time.perf_counter() - _ENTRY_STARTED
+    logger.info(f"Main window shown {time_to_window:.3f} s after startup.")
+
+    if args.startup_benchmark:
+        def report_and_exit():
+            print(json.dumps({"time_to_window_s": round(time_to_window, 4)}), flush=True)
+            loop.stop()
+        # Let the loop process the first paint before reporting.
+        loop.call_soon(report_and_exit)
+
     with loop:
         loop.run_forever()
 
 if __name__ == "__main__":
+    # Required for the spawned ASR worker process in frozen builds.
+    multiprocessing.freeze_support()
     try:
         main()
     except KeyboardInterrupt:
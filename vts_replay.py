@@ -0,0 +1,155 @@
+import argparse
+import asyncio
+import json
+import sys
+import time
+import wave
+from loguru import logger
+
+from core.event_bus import Event, EventBus
+from core.intent_resolver import MAX_BATCH, KeywordIntentResolver
+from core.journal import AUDIO_EVENT_TYPE, EXPRESSION_MAP_EVENT_TYPE, RATE_LIMITS_EVENT_TYPE, JournalReader
+
+TRANSCRIPTION_EVENTS = ("transcription_received", "transcription_partial")
+# Transcriptions recorded this close together were published in one burst
+# (e.g. chat lines from one read) and dequeued by the live resolver as one batch.
+BATCH_WINDOW_S = 0.01
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Replay an event journal through the keyword resolver, and optionally into VTube Studio.")
+    parser.add_argument("journal", help="A .vtsj file written with journal.enabled in vts_config.yaml.")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed relative to the recording; 0 replays as fast as possible.")
+    parser.add_argument("--vts", action="store_true", help="Send the replayed triggers to VTube Studio, using vts_settings from --config.")
+    parser.add_argument("--config", default="vts_config.yaml")
+    parser.add_argument("--export-audio", metavar="WAV", help="Write the journal's audio to a WAV file, e.g. for tests/benchmarks/replay_harness.py.")
+    parser.add_argument("--triggers", action="store_true", help="List every recorded and replayed trigger in the report.")
+    parser.add_argument("--check", action="store_true", help="Exit with status 1 if the replayed triggers differ from the recorded ones.")
+    return parser.parse_args()
+
+def batches(records, window_s: float = BATCH_WINDOW_S):
+    """
+    Groups consecutive transcriptions of one type recorded within `window_s`
+    of the first into a batch, as resolve_intent would have dequeued them.
+    Every other record is a batch of its own.
+    """
+    batch = []
+    for record in records:
+        if batch and not (record.event_type in TRANSCRIPTION_EVENTS and record.event_type == batch[0].event_type
+                          and record.at - batch[0].at <= window_s and len(batch) < MAX_BATCH):
+            yield batch
+            batch = []
+        batch.append(record)
+    if batch:
+        yield batch
+
+async def replay(reader: JournalReader, speed: float = 1.0, vts_agent=None) -> dict:
+    """
+    Feeds the journal's transcriptions to a fresh KeywordIntentResolver in
+    their recorded order, timing and batches, with the recorded expression
+    maps and rate limits, and compares the triggers it resolves with the
+    recorded ones. The resolver's clock follows the recorded times, so
+    cooldowns and rate limits come out the same at any speed.
+    """
+    event_bus = EventBus()
+    recorded_at = None
+    resolver = KeywordIntentResolver(event_bus, {}, clock=lambda: recorded_at)
+    trigger_queue = await event_bus.subscribe("hotkey_triggered")
+    recorded, replayed = [], []
+    counts = {"records": 0, "transcriptions": 0, "audio_blocks": 0}
+    first_at = None
+    started = time.monotonic()
+
+    for batch in batches(reader):
+        record = batch[-1]
+        counts["records"] += len(batch)
+        if first_at is None:
+            first_at = batch[0].at
+        if speed > 0:
+            await asyncio.sleep(max(0.0, started + (record.at - first_at) / speed - time.monotonic()))
+        recorded_at = record.at
+        offset_s = round(record.at - first_at, 3)
+
+        if record.event_type == EXPRESSION_MAP_EVENT_TYPE:
+            resolver.update_expression_map(record.payload)
+        elif record.event_type == RATE_LIMITS_EVENT_TYPE:
+            for source, limit in record.payload.items():
+                resolver.set_rate_limit(source, limit["triggers_per_s"], limit["burst"])
+        elif record.event_type == "hotkey_triggered":
+            recorded.append({"at_s": offset_s, "hotkey": record.payload, "keyword": (record.meta or {}).get("keyword")})
+        elif record.event_type == AUDIO_EVENT_TYPE:
+            counts["audio_blocks"] += 1
+        elif record.event_type in TRANSCRIPTION_EVENTS:
+            counts["transcriptions"] += len(batch)
+            events = [Event(batched.event_type, batched.payload, batched.meta) for batched in batch]
+            await resolver.resolve_batch(events, partial=record.event_type == "transcription_partial")
+            while not trigger_queue.empty():
+                trigger = trigger_queue.get_nowait()
+                meta = trigger.meta or {}
+                replayed.append({"at_s": offset_s, "hotkey": trigger.payload, "keyword": meta.get("keyword")})
+                if vts_agent:
+                    # Recorded spoken-end times mean nothing to this session's latency histogram.
+                    await vts_agent.apply_trigger(trigger.payload, {key: value for key, value in meta.items() if key != "spoken_end"})
+
+    recorded_hotkeys = [trigger["hotkey"] for trigger in recorded]
+    replayed_hotkeys = [trigger["hotkey"] for trigger in replayed]
+    first_difference = next((index for index, pair in enumerate(zip(recorded_hotkeys, replayed_hotkeys)) if pair[0] != pair[1]),
+                            None if len(recorded_hotkeys) == len(replayed_hotkeys) else min(len(recorded_hotkeys), len(replayed_hotkeys)))
+    return {
+        **counts,
+        "recorded_s": round(recorded_at - first_at, 3) if first_at is not None else 0.0,
+        "replay_s": round(time.monotonic() - started, 3),
+        "recorded_triggers": recorded,
+        "replayed_triggers": replayed,
+        "matches": first_difference is None,
+        "first_difference": first_difference,
+    }
+
+def export_audio(reader: JournalReader, path: str) -> int:
+    """Writes the journal's audio blocks, back to back, as a mono 16-bit WAV. Returns the number of samples."""
+    samples = 0
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(reader.sample_rate)
+        for record in reader:
+            if record.event_type == AUDIO_EVENT_TYPE:
+                wav.writeframes(record.payload)
+                samples += len(record.payload) // 2
+    return samples
+
+async def run_replay(args) -> dict:
+    reader = JournalReader(args.journal)
+    if args.export_audio:
+        samples = export_audio(reader, args.export_audio)
+        logger.info(f"Wrote {samples / reader.sample_rate:.1f} s of journaled audio to {args.export_audio}")
+
+    vts_agent = None
+    if args.vts:
+        from agents.vts_output_agent import VTSWebSocketAgent
+        from core.config_loader import ConfigLoader
+        vts_settings = ConfigLoader.load_yaml(args.config)["vts_settings"]
+        vts_agent = VTSWebSocketAgent(vts_settings["host"], vts_settings["port"], vts_settings["token_file"], EventBus())
+        await vts_agent.connect()
+        await vts_agent.authenticate()
+        await vts_agent.sync_expression_states()
+    try:
+        report = await replay(reader, args.speed, vts_agent)
+    finally:
+        if vts_agent:
+            await vts_agent.disconnect()
+    if not args.triggers:
+        report["recorded_triggers"] = len(report["recorded_triggers"])
+        report["replayed_triggers"] = len(report["replayed_triggers"])
+    return report
+
+def main():
+    args = parse_args()
+    # Resolver logging goes to stderr so stdout stays machine-readable.
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    report = asyncio.run(run_replay(args))
+    print(json.dumps(report, indent=2))
+    sys.exit(1 if args.check and not report["matches"] else 0)
+
+if __name__ == "__main__":
+    main()